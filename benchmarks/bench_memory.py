@@ -0,0 +1,84 @@
+"""Measures the memory a parsed Podcast keeps alive after construction.
+
+    python benchmarks/bench_memory.py [number_of_items]
+
+Sizes are Python allocations traced by tracemalloc, libxml2 memory held
+by lxml trees is not included.
+"""
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from pypodcastparser.Podcast import Podcast  # noqa: E402
+
+ITEM = """
+        <item>
+            <title>Episode {0}</title>
+            <guid isPermaLink="false">guid-{0}</guid>
+            <pubDate>Mon, 30 May 2022 04:05:03 GMT</pubDate>
+            <description>Description of episode {0} {1}</description>
+            <enclosure length="123456" type="audio/mpeg" url="https://example.com/{0}.mp3"/>
+            <itunes:duration>1:02:03</itunes:duration>
+            <itunes:explicit>no</itunes:explicit>
+        </item>"""
+
+
+def make_feed(number_of_items):
+    items = "".join(ITEM.format(i, "lorem ipsum " * 20) for i in range(number_of_items))
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:itunes="http://www.itunes.com/dtds/podcast-1.0.dtd">
+    <channel>
+        <title>Memory benchmark</title>
+        <pubDate>Mon, 30 May 2022 04:05:03 GMT</pubDate>{items}
+    </channel>
+</rss>""".encode()
+
+
+def retained_size(feed_content, **kwargs):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    podcast = Podcast(feed_content, **kwargs)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del podcast
+    return after - before
+
+
+def per_item_size(feed_content, number_of_items):
+    """Average memory held by one parsed Item"""
+    podcast = Podcast(feed_content, engine="iterparse", lazy=True)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = list(podcast.items)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del items
+    return (after - before) / number_of_items
+
+
+def main(number_of_items=1000):
+    # Keep our own reference so the retained bytes are not counted twice
+    feed_content = make_feed(number_of_items)
+    print(f"{number_of_items} items, feed size {len(feed_content) / 1024:.0f} KiB")
+    cases = [
+        ("soup, retain_source=True", dict(engine="soup", retain_source=True)),
+        ("soup, retain_source=False", dict(engine="soup", retain_source=False)),
+        ("iterparse, retain_source=True", dict(engine="iterparse", retain_source=True)),
+        ("iterparse, retain_source=False", dict(engine="iterparse")),
+    ]
+    for name, kwargs in cases:
+        size = retained_size(feed_content, **kwargs)
+        print(f"{name:32} {size / 1024:10.0f} KiB retained")
+    size = per_item_size(feed_content, number_of_items)
+    print(f"{'per Item':32} {size:10.0f} bytes")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
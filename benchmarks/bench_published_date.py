@@ -0,0 +1,125 @@
+"""Compares Item pubDate parsing against the previous implementation.
+
+    python benchmarks/bench_published_date.py
+
+Prints the median time per date of each format and the speedup, the
+formats differ a lot, e.g. "+0000 EST" still takes the tolerant path.
+"""
+import datetime
+import os
+import re
+import statistics
+import sys
+import timeit
+
+import pytz
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from pypodcastparser.PubDate import (  # noqa: E402
+    common_timezones,
+    offset_map,
+    parse_published_date,
+)
+
+DATES = [
+    "Mon, 30 May 2022 04:05:03 GMT",
+    "Fri, 21 Mar 2008 09:51:00 EDT",
+    "Mon, 22 May 2023 14:00:00 +1000",
+    "Thu, 06 Jul 2023 01:00:00 PDT",
+    "Tue, 24 Jan 2023 02:40:00 +0000",
+    "Tue, 24 Jan 2023 02:40:00 -0500",
+    "Wed, 5 Apr 2023 10:00 EST",
+    "Mon, 19 Jul 2021 16:14:29 +0000 EST",
+]
+
+# The list the previous implementation searched, not PubDate's frozenset
+legacy_pytz_timezone_list = [tz for tz in pytz.all_timezones]
+
+
+def legacy_parse_published_date(published_date):
+    """Item.set_published_date before the PubDate module, kept as a baseline"""
+    deconstructed_date = published_date.split(" ")
+    if len(deconstructed_date) < 4:
+        raise AttributeError
+    published_date_timezone = ""
+    if re.match("^[a-zA-Z]{3}$", deconstructed_date[-1]):
+        published_date_timezone = deconstructed_date[-1]
+        deconstructed_date.pop()
+    else:
+        for offset, tz in offset_map.items():
+            if offset in published_date:
+                published_date_timezone = tz
+                deconstructed_date.pop()
+                break
+    if not published_date_timezone:
+        published_date_timezone = "EST"
+    regex_array = [
+        r"^[a-zA-Z]{3},$",
+        r"^\d{1,2}$",
+        r"^[a-zA-Z]{3}$",
+        r"^\d{4}$",
+        r"^\d\d:\d\d",
+    ]
+    new_array = []
+    for array_index, array_value in enumerate(regex_array):
+        if re.match(deconstructed_date[array_index], array_value):
+            new_array.append(array_value)
+        else:
+            for inner_index, inner_value in enumerate(deconstructed_date):
+                if re.match(regex_array[array_index], inner_value):
+                    new_array.append(inner_value)
+                    break
+    date_string = " ".join(new_array[:5])
+    time = date_string.split(":")
+    if len(time) == 2:
+        minutes = time[1].split(" ")
+        minutes[0] += ":00"
+        time[0] += ":" + minutes[0]
+    else:
+        time[0] += ":" + time[1]
+        time[0] += ":" + time[2][:2]
+    published_date = datetime.datetime.strptime(time[0], "%a, %d %b %Y %H:%M:%S")
+    if published_date_timezone not in ["ET", "EST", "EDT"]:
+        if published_date_timezone in legacy_pytz_timezone_list:
+            current_timezone = pytz.timezone(published_date_timezone)
+        else:
+            current_timezone = pytz.timezone(
+                common_timezones.get(published_date_timezone)
+            )
+        date_in_current_timezone = current_timezone.localize(published_date)
+        published_date = str(
+            date_in_current_timezone.astimezone(pytz.timezone("US/Eastern")).replace(
+                tzinfo=None
+            )
+        )
+    return published_date
+
+
+def run(parse, date, number, repeat):
+    """Returns the median seconds per parse of date"""
+    times = timeit.repeat(lambda: parse(date), number=number, repeat=repeat)
+    return statistics.median(times) / number
+
+
+def main(number=2000, repeat=15):
+    print(f"{'date':40} {'previous':>10} {'now':>10} {'speedup':>8}")
+    legacy_total = fast_total = 0
+    for date in DATES:
+        assert legacy_parse_published_date(date) == parse_published_date(date), date
+        legacy = run(legacy_parse_published_date, date, number, repeat)
+        fast = run(parse_published_date, date, number, repeat)
+        legacy_total += legacy
+        fast_total += fast
+        print(
+            f"{date:40} {legacy * 1e6:7.2f} us {fast * 1e6:7.2f} us"
+            f" {legacy / fast:7.1f}x"
+        )
+    print(
+        f"{'sum of all dates':40} {legacy_total * 1e6:7.2f} us {fast_total * 1e6:7.2f} us"
+        f" {legacy_total / fast_total:7.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Synthetic podcast feeds for the benchmarks.
+
+Feeds are generated from a seed so two runs of the suite parse the same
+bytes. A field mix controls how often items carry the inputs that are
+expensive to parse.
+"""
+import random
+
+SIZES = (10, 1000, 10000, 100000)
+
+# Share of items with a malformed pubDate, transcripts per item and the
+# size in bytes of the content:encoded CDATA
+MIXES = {
+    "plain": dict(bad_dates=0.0, transcripts=0, content_size=0),
+    "bad_dates": dict(bad_dates=0.5, transcripts=0, content_size=0),
+    "transcripts": dict(bad_dates=0.0, transcripts=4, content_size=0),
+    "large_content": dict(bad_dates=0.0, transcripts=0, content_size=20000),
+    "mixed": dict(bad_dates=0.1, transcripts=1, content_size=2000),
+}
+
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+ZONES = ("GMT", "EST", "EDT", "PDT", "PST", "+0000", "-0500", "+1000", "+0530")
+
+# Dates the fast path rejects, some still recoverable by the tolerant parser
+BAD_DATES = (
+    "Mon, 30 May 2022 04:05 GMT",
+    "30 May 2022 04:05:03 GMT",
+    "Mon, 30 May 2022 04:05:03 +0000 GMT",
+    "Monday, 30 May 2022 04:05:03 GMT",
+    "2022-05-30T04:05:03Z",
+    "Mon, 30 May 2022",
+    "",
+)
+
+ITEM = """
+        <item>
+            <title>Episode {index}</title>
+            <guid isPermaLink="false">guid-{index}</guid>
+            <pubDate>{pub_date}</pubDate>
+            <description>Description of episode {index}</description>
+            <enclosure length="{length}" type="audio/mpeg" url="https://example.com/{index}.mp3"/>
+            <itunes:duration>{duration}</itunes:duration>
+            <itunes:episode>{index}</itunes:episode>
+            <itunes:explicit>no</itunes:explicit>{transcripts}{content}
+        </item>"""
+
+TRANSCRIPT = """
+            <podcast:transcript url="https://example.com/{index}/{number}.srt" type="application/srt" language="en"/>"""
+
+CONTENT = """
+            <content:encoded><![CDATA[{0}]]></content:encoded>"""
+
+
+def pub_date(rng, bad_dates=0.0):
+    """Returns a pubDate, malformed with probability bad_dates"""
+    if rng.random() < bad_dates:
+        return rng.choice(BAD_DATES)
+    return "{}, {:02d} {} {} {:02d}:{:02d}:{:02d} {}".format(
+        rng.choice(WEEKDAYS),
+        rng.randint(1, 28),
+        rng.choice(MONTHS),
+        rng.randint(2005, 2024),
+        rng.randint(0, 23),
+        rng.randint(0, 59),
+        rng.randint(0, 59),
+        rng.choice(ZONES),
+    )
+
+
+def duration(rng):
+    """Returns an itunes:duration in one of the formats seen in feeds"""
+    seconds = rng.randint(30, 4 * 3600)
+    form = rng.randrange(4)
+    if form == 0:
+        return str(seconds)
+    if form == 1:
+        return "{}:{:02d}".format(seconds // 60, seconds % 60)
+    if form == 2:
+        return "{}:{:02d}:{:02d}".format(seconds // 3600, seconds // 60 % 60, seconds % 60)
+    return "{:02d}:{:02d}:{:02d}".format(seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+
+def generate_feed(number_of_items, bad_dates=0.0, transcripts=0, content_size=0, seed=0):
+    """Returns the bytes of an rss feed with number_of_items items
+
+    Args:
+        number_of_items (int): Number of <item> elements
+        bad_dates (float): Share of items with a malformed pubDate
+        transcripts (int): podcast:transcript elements per item
+        content_size (int): Bytes of content:encoded CDATA per item, 0 for none
+        seed (int): Seed of the random values
+    """
+    rng = random.Random(seed)
+    filler = ("lorem ipsum <b>dolor</b> sit amet " * (content_size // 32 + 1))[:content_size]
+    items = []
+    for index in range(number_of_items):
+        items.append(
+            ITEM.format(
+                index=index,
+                pub_date=pub_date(rng, bad_dates),
+                length=rng.randint(10 ** 5, 10 ** 8),
+                duration=duration(rng),
+                transcripts="".join(
+                    TRANSCRIPT.format(index=index, number=number)
+                    for number in range(transcripts)
+                ),
+                content=CONTENT.format(filler) if content_size else "",
+            )
+        )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:itunes="http://www.itunes.com/dtds/podcast-1.0.dtd"
+    xmlns:content="http://purl.org/rss/1.0/modules/content/"
+    xmlns:podcast="https://podcastindex.org/namespace/1.0">
+    <channel>
+        <title>Benchmark feed</title>
+        <link>https://example.com</link>
+        <language>en</language>
+        <description>Synthetic feed with {number_of_items} items</description>
+        <pubDate>Mon, 30 May 2022 04:05:03 GMT</pubDate>
+        <itunes:author>Benchmark</itunes:author>
+        <itunes:category text="Technology"/>
+        <itunes:owner><itunes:name>Owner</itunes:name></itunes:owner>{"".join(items)}
+    </channel>
+</rss>""".encode()
@@ -0,0 +1,221 @@
+"""Benchmark suite for parse time and peak memory on generated feeds.
+
+    python benchmarks/suite.py [--sizes 10,1000] [--mixes plain,mixed]
+        [--repeat 3] [--output results.json] [--compare previous.json]
+
+Every benchmark is timed as the best of --repeat runs. Peak memory is the
+tracemalloc peak of a separate run, libxml2 memory is not included.
+Results are written as JSON so two runs can be compared with --compare.
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from lxml import etree  # noqa: E402
+
+from feeds import MIXES, SIZES, duration, generate_feed, pub_date  # noqa: E402
+from pypodcastparser import DateBatch  # noqa: E402
+from pypodcastparser.Item import Item  # noqa: E402
+from pypodcastparser.Podcast import Podcast  # noqa: E402
+from pypodcastparser.StreamParser import ElementTag  # noqa: E402
+from pypodcastparser.Stats import ParseStats  # noqa: E402
+from pypodcastparser.sinks.sqlite import SqliteSink  # noqa: E402
+
+# Number of tags fed to the single setter benchmarks
+SETTER_CALLS = 10000
+
+# Item fields of the projected parse benchmark
+PROJECTION = ("guid", "enclosure_url")
+
+
+def best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def peak_memory(func):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def tags(name, values):
+    return [ElementTag(etree.fromstring(f"<{name}>{value}</{name}>")) for value in values]
+
+
+def bench_setters(mix_name, repeat):
+    """Times Item.set_published_date, Item.set_itunes_duration and, with
+    numpy, normalize_published_dates on the same dates"""
+    rng = random.Random(0)
+    bad_dates = MIXES[mix_name]["bad_dates"]
+    date_strings = [pub_date(rng, bad_dates) for _ in range(SETTER_CALLS)]
+    date_tags = tags("pubDate", date_strings)
+    duration_tags = tags("duration", [duration(rng) for _ in range(SETTER_CALLS)])
+    item = Item.__new__(Item)
+
+    def published_dates():
+        for tag in date_tags:
+            item.set_published_date(tag)
+
+    def durations():
+        for tag in duration_tags:
+            item.set_itunes_duration(tag)
+
+    benchmarks = [
+        ("Item.set_published_date", published_dates),
+        ("Item.set_itunes_duration", durations),
+    ]
+    if DateBatch.numpy is not None:
+        benchmarks.append(
+            (
+                "normalize_published_dates",
+                lambda: DateBatch.normalize_published_dates(date_strings),
+            )
+        )
+    for name, func in benchmarks:
+        seconds = best_time(func, repeat)
+        yield dict(benchmark=name, mix=mix_name, items=SETTER_CALLS, seconds=seconds)
+
+
+def bench_feed(number_of_items, mix_name, repeat):
+    """Times Podcast construction, serialization and parse + to_dict end to end"""
+    feed_content = generate_feed(number_of_items, **MIXES[mix_name])
+    common = dict(mix=mix_name, items=number_of_items, feed_bytes=len(feed_content))
+    for engine in Podcast.ENGINES:
+        seconds = best_time(lambda: Podcast(feed_content, engine=engine), repeat)
+        yield dict(common, benchmark=f"Podcast[{engine}]", seconds=seconds)
+        seconds = best_time(
+            lambda: Podcast(feed_content, engine=engine, item_fields=PROJECTION), repeat
+        )
+        yield dict(common, benchmark=f"Podcast[{engine},guid+enclosure]", seconds=seconds)
+    seconds = best_time(
+        lambda: Podcast(feed_content, engine="iterparse", stats=ParseStats()), repeat
+    )
+    yield dict(common, benchmark="Podcast[iterparse,stats]", seconds=seconds)
+
+    podcast = Podcast(feed_content, engine="iterparse")
+    seconds = best_time(podcast.to_dict, repeat)
+    yield dict(common, benchmark="Podcast.to_dict", seconds=seconds)
+    seconds = best_time(lambda: json.dumps(podcast.to_dict(), default=str), repeat)
+    yield dict(common, benchmark="json.dumps(to_dict)", seconds=seconds)
+    seconds = best_time(lambda: podcast.to_json(default=str), repeat)
+    yield dict(common, benchmark="Podcast.to_json", seconds=seconds)
+    with open(os.devnull, "w") as devnull:
+        seconds = best_time(lambda: podcast.write_json(devnull, default=str), repeat)
+    yield dict(common, benchmark="Podcast.write_json", seconds=seconds)
+    seconds = best_time(lambda: [item.to_dict() for item in podcast.items], repeat)
+    yield dict(common, benchmark="Item.to_dict rows", seconds=seconds)
+    seconds = best_time(podcast.to_columns, repeat)
+    yield dict(common, benchmark="Podcast.to_columns", seconds=seconds)
+
+    def write_sqlite():
+        with SqliteSink(":memory:") as sink:
+            sink.write(podcast, key="benchmark")
+
+    seconds = best_time(write_sqlite, repeat)
+    yield dict(common, benchmark="SqliteSink.write", seconds=seconds)
+    del podcast
+
+    for engine in Podcast.ENGINES:
+
+        def end_to_end():
+            Podcast(feed_content, engine=engine).to_dict()
+
+        seconds = best_time(end_to_end, repeat)
+        peak = peak_memory(end_to_end)
+        yield dict(
+            common, benchmark=f"end_to_end[{engine}]", seconds=seconds, peak_bytes=peak
+        )
+
+
+def metadata():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except OSError:
+        commit = None
+    return dict(
+        commit=commit or None,
+        python=platform.python_version(),
+        platform=platform.platform(),
+        date=datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+    )
+
+
+def result_key(result):
+    return (result["benchmark"], result["mix"], result["items"])
+
+
+def print_result(result, previous=None):
+    line = "{:34} {:14} {:>7} {:10.4f}s".format(
+        result["benchmark"], result["mix"], result["items"], result["seconds"]
+    )
+    if "peak_bytes" in result:
+        line += " {:9.1f} MiB peak".format(result["peak_bytes"] / 2 ** 20)
+    if previous is not None:
+        line += " {:6.2f}x".format(previous["seconds"] / result["seconds"])
+    print(line, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(str(size) for size in SIZES))
+    parser.add_argument("--mixes", default=",".join(MIXES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of a previous run")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    mixes = args.mixes.split(",")
+    for mix_name in mixes:
+        if mix_name not in MIXES:
+            parser.error(f"unknown mix {mix_name}, choose from {', '.join(MIXES)}")
+
+    previous = {}
+    if args.compare:
+        with open(args.compare) as compare_file:
+            previous = {result_key(r): r for r in json.load(compare_file)["results"]}
+
+    results = []
+    for mix_name in mixes:
+        runs = [bench_setters(mix_name, args.repeat)]
+        runs += [bench_feed(size, mix_name, args.repeat) for size in sizes]
+        for run in runs:
+            for result in run:
+                results.append(result)
+                print_result(result, previous.get(result_key(result)))
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(dict(metadata=metadata(), results=results), output_file, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import collections
+import concurrent.futures
+import itertools
+import os
+
+from pypodcastparser.Error import InvalidPodcastFeed
+from pypodcastparser.Podcast import Podcast
+
+
+def parse_feed(feed_content, **options):
+    """Parses a single feed into its to_dict() payload
+
+    Args:
+        feed_content (bytes): An rss string
+        **options: Keyword arguments for Podcast
+
+    Returns:
+        The to_dict() payload, or the InvalidPodcastFeed raised while
+        parsing the feed
+    """
+    try:
+        return Podcast(feed_content, **options).to_dict()
+    except InvalidPodcastFeed as e:
+        return e
+
+
+def _parse_chunk(chunk, options):
+    return [(index, parse_feed(feed_content, **options)) for index, feed_content in chunk]
+
+
+def _chunks(feeds, chunksize):
+    indexed = enumerate(feeds)
+    while True:
+        chunk = list(itertools.islice(indexed, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parse_many(
+    feeds, workers=None, chunksize=1, ordered=True, engine="iterparse", **options
+):
+    """Parses many feeds across a pool of worker processes
+
+    Feeds are read from the iterable as workers free up, only a few chunks
+    per worker are in flight at any time so a generator of feeds is never
+    read into memory all at once.
+
+    Args:
+        feeds (iterable): rss strings as bytes
+        workers (int): Number of worker processes, defaults to the number
+        of CPUs. 0 parses in the calling process.
+        chunksize (int): Number of feeds sent to a worker at a time
+        ordered (bool): Yield results in input order, otherwise in the
+        order they complete
+        engine (str): Podcast parse engine, the iterparse engine is
+        the fastest when only the parsed values are needed
+        **options: Other keyword arguments for Podcast
+
+    Yields:
+        (index, result) tuples where index is the position of the feed in
+        feeds and result is its to_dict() payload or the InvalidPodcastFeed
+        it raised. Any other exception is raised from parse_many.
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    options["engine"] = engine
+    chunks = _chunks(feeds, chunksize)
+
+    if workers == 0:
+        for chunk in chunks:
+            yield from _parse_chunk(chunk, options)
+        return
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    max_pending = workers * 2
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+
+        def submit(chunk):
+            return executor.submit(_parse_chunk, chunk, options)
+
+        if ordered:
+            pending = collections.deque(
+                submit(chunk) for chunk in itertools.islice(chunks, max_pending)
+            )
+            while pending:
+                results = pending.popleft().result()
+                for chunk in itertools.islice(chunks, 1):
+                    pending.append(submit(chunk))
+                yield from results
+        else:
+            pending = {
+                submit(chunk) for chunk in itertools.islice(chunks, max_pending)
+            }
+            while pending:
+                done, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    results = future.result()
+                    for chunk in itertools.islice(chunks, 1):
+                        pending.add(submit(chunk))
+                    yield from results
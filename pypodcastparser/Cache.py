@@ -0,0 +1,188 @@
+import collections
+import hashlib
+import os
+import pickle
+import tempfile
+
+try:
+    from importlib.metadata import PackageNotFoundError, version
+except ImportError:
+    PackageNotFoundError = Exception
+    version = None
+
+from pypodcastparser.Podcast import Podcast
+
+
+# Bump when a change to the parser changes the attributes of a parsed
+# Podcast, so results cached by an older parser are not returned
+CACHE_VERSION = 6
+
+
+def parser_version():
+    """Returns the version parse results are cached under"""
+    installed = None
+    if version is not None:
+        try:
+            installed = version("pypodcastparser-ihr")
+        except PackageNotFoundError:
+            pass
+    return f"{CACHE_VERSION}:{installed}"
+
+
+PARSER_VERSION = parser_version()
+
+
+def cache_key(feed_content, **options):
+    """Returns the key of the parse result of feed_content with options
+
+    The key covers the feed bytes, the parser version and the Podcast
+    keyword arguments.
+    """
+    options = sorted(
+        # Sets repr in hash order, which differs between processes
+        (name, sorted(value) if isinstance(value, (set, frozenset)) else value)
+        for name, value in options.items()
+    )
+    key = hashlib.sha256(feed_content)
+    key.update(f"\0{PARSER_VERSION}\0{options!r}".encode("utf-8"))
+    return key.hexdigest()
+
+
+class MemoryBackend(object):
+    """Keeps serialized parse results in memory, least recently used first
+    out once they take more than max_bytes
+
+    Args:
+        max_bytes (int): Total size of the serialized results to keep
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = collections.OrderedDict()
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        """Stores value and returns the number of entries evicted"""
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous)
+        if len(value) > self.max_bytes:
+            return 0
+        self.entries[key] = value
+        self.size += len(value)
+        evicted = 0
+        while self.size > self.max_bytes:
+            _, old = self.entries.popitem(last=False)
+            self.size -= len(old)
+            evicted += 1
+        return evicted
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class DiskBackend(object):
+    """Keeps serialized parse results as files in a directory
+
+    Args:
+        directory (str): Where to store the results, created if missing
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".pickle")
+
+    def get(self, key):
+        try:
+            with open(self.path(key), "rb") as result_file:
+                return result_file.read()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, value):
+        """Stores value and returns the number of entries evicted"""
+        # Write to a temporary file first so readers never see a partial result
+        fd, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as result_file:
+                result_file.write(value)
+            os.replace(temporary_path, self.path(key))
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+        return 0
+
+    def clear(self):
+        for file_name in os.listdir(self.directory):
+            if file_name.endswith(".pickle"):
+                os.unlink(os.path.join(self.directory, file_name))
+
+    def __len__(self):
+        return sum(1 for f in os.listdir(self.directory) if f.endswith(".pickle"))
+
+
+class ParseCache(object):
+    """Caches parsed Podcast objects by the hash of their feed bytes
+
+    Results are parsed with retain_source=False and stored pickled, a hit
+    unpickles a new Podcast without touching the xml parser. Its
+    feed_content and soup are None.
+
+    Args:
+        backend: MemoryBackend, DiskBackend or any object with the same get
+        and set methods. Defaults to a 64 MiB MemoryBackend.
+
+    Attributes:
+        hits (int): Parses answered from the cache
+        misses (int): Parses that had to parse the feed
+        evictions (int): Results dropped by the backend to make room
+    """
+
+    def __init__(self, backend=None):
+        self.backend = MemoryBackend() if backend is None else backend
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def parse(self, feed_content, **options):
+        """Returns Podcast(feed_content, **options), from the cache if possible
+
+        InvalidPodcastFeed errors are not cached.
+        """
+        if options.get("lazy") or options.get("item_filter") is not None:
+            raise ValueError("lazy and item_filter podcasts can not be cached")
+        if options.get("retain_source"):
+            raise ValueError("cached podcasts do not retain their source")
+        options.pop("retain_source", None)
+        # Only parses that miss the cache are recorded
+        stats = options.pop("stats", None)
+
+        key = cache_key(feed_content, **options)
+        cached = self.backend.get(key)
+        if cached is not None:
+            self.hits += 1
+            return pickle.loads(cached)
+
+        self.misses += 1
+        podcast = Podcast(feed_content, retain_source=False, stats=stats, **options)
+        value = pickle.dumps(podcast, protocol=pickle.HIGHEST_PROTOCOL)
+        self.evictions += self.backend.set(key, value)
+        return podcast
+
+    @property
+    def stats(self):
+        """Counters as a dict"""
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
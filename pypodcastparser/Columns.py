@@ -0,0 +1,249 @@
+"""Columnar export of episodes for analytics
+
+    from pypodcastparser.Columns import EpisodeColumns
+
+    columns = EpisodeColumns()
+    for feed_content in feeds:
+        columns.append(Podcast(feed_content, engine="iterparse"))
+    batch = columns.to_arrow()  # needs pyarrow
+
+Item attributes are appended column by column straight into buffers, no
+dict is built per episode. Integer columns are array.array buffers with a
+validity mask and low cardinality strings are dictionary encoded.
+"""
+import array
+import itertools
+import operator
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class IntColumn(object):
+    """Nullable int64 column
+
+    Values that are not ints or strings of an int are stored as null.
+
+    Attributes:
+        values (array.array): The values, 0 where null
+        valid (bytearray): 1 where the value is not null
+        null_count (int): Number of nulls
+    """
+
+    __slots__ = ("values", "valid", "null_count")
+
+    def __init__(self):
+        self.values = array.array("q")
+        self.valid = bytearray()
+        self.null_count = 0
+
+    def extend(self, values):
+        values = list(values)
+        valid = bytes(map(operator.is_not, values, itertools.repeat(None)))
+        try:
+            # Converting a whole list of ints happens in C
+            converted = array.array("q", [0 if v is None else v for v in values])
+        except (TypeError, OverflowError):
+            self._extend_slow(values)
+        else:
+            self.values.extend(converted)
+            self.valid += valid
+            self.null_count += len(valid) - sum(valid)
+
+    def _extend_slow(self, values):
+        append_value = self.values.append
+        append_valid = self.valid.append
+        for value in values:
+            if type(value) is not int:
+                try:
+                    value = int(value)
+                except (TypeError, ValueError):
+                    value = None
+            if value is not None:
+                try:
+                    append_value(value)
+                    append_valid(1)
+                    continue
+                except OverflowError:
+                    pass
+            append_value(0)
+            append_valid(0)
+            self.null_count += 1
+
+    def to_pylist(self):
+        if not self.null_count:
+            return self.values.tolist()
+        return [v if ok else None for v, ok in zip(self.values, self.valid)]
+
+    def to_arrow(self):
+        if self.null_count:
+            return pyarrow.array(self.to_pylist(), type=pyarrow.int64())
+        # Copied, an array.array that exports its buffer can not grow
+        data = pyarrow.py_buffer(self.values.tobytes())
+        return pyarrow.Array.from_buffers(pyarrow.int64(), len(self.values), [None, data])
+
+    def __len__(self):
+        return len(self.values)
+
+
+class DictionaryColumn(object):
+    """Dictionary encoded string column
+
+    Attributes:
+        indices (IntColumn): Index of each value in dictionary, null for None
+        dictionary (list): Distinct values, each batch of new values is
+        added in sorted order
+    """
+
+    __slots__ = ("indices", "dictionary", "codes")
+
+    def __init__(self):
+        self.indices = IntColumn()
+        self.dictionary = []
+        self.codes = {}
+
+    def extend(self, values):
+        values = list(values)
+        codes = self.codes
+        new_values = set(values).difference(codes)
+        new_values.discard(None)
+        dictionary = self.dictionary
+        for value in sorted(new_values):
+            codes[value] = len(dictionary)
+            dictionary.append(str(value))
+        self.indices.extend(map(codes.get, values))
+
+    def to_pylist(self):
+        dictionary = self.dictionary
+        return [None if i is None else dictionary[i] for i in self.indices.to_pylist()]
+
+    def to_arrow(self):
+        return pyarrow.DictionaryArray.from_arrays(
+            self.indices.to_arrow(),
+            pyarrow.array(self.dictionary, type=pyarrow.string()),
+        )
+
+    def __len__(self):
+        return len(self.indices)
+
+
+class StringColumn(object):
+    """Nullable string column
+
+    Attributes:
+        values (list): The values, None where null. Values are appended as
+        they are, so they may be bs4.NavigableString when the source was
+        retained.
+    """
+
+    __slots__ = ("values",)
+
+    def __init__(self):
+        self.values = []
+
+    def extend(self, values):
+        self.values.extend(values)
+
+    def to_pylist(self):
+        return list(self.values)
+
+    def to_arrow(self):
+        return pyarrow.array(self.values, type=pyarrow.string())
+
+    def __len__(self):
+        return len(self.values)
+
+
+class EpisodeColumns(object):
+    """Episode attributes of one or more podcasts, stored by column
+
+    Args:
+        columns (iterable): Names of the columns to collect, from COLUMNS.
+        All of them if None.
+
+    Attributes:
+        columns (dict): Column name -> IntColumn, DictionaryColumn or
+        StringColumn, in COLUMNS order. The podcast_index column holds the
+        position of each episode's podcast in the order they were appended.
+        podcast_count (int): Number of podcasts appended
+    """
+
+    # Column name -> column class, the item attribute has the same name
+    COLUMNS = {
+        "podcast_index": IntColumn,
+        "guid": StringColumn,
+        "title": StringColumn,
+        "description": StringColumn,
+        "enclosure_url": StringColumn,
+        "enclosure_type": DictionaryColumn,
+        "enclosure_length": IntColumn,
+        "itunes_duration": IntColumn,
+        "itunes_episode_type": DictionaryColumn,
+        "itunes_season": StringColumn,
+        "itunes_episode": StringColumn,
+        "itunes_image": StringColumn,
+        "time_published": IntColumn,
+    }
+
+    def __init__(self, columns=None):
+        if columns is None:
+            names = list(self.COLUMNS)
+        else:
+            names = [name for name in self.COLUMNS if name in set(columns)]
+            unknown = set(columns) - set(names)
+            if unknown:
+                raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+        self.columns = {name: self.COLUMNS[name]() for name in names}
+        self.podcast_count = 0
+
+    def append(self, podcast):
+        """Appends the items of a podcast and returns self"""
+        items = podcast.items
+        for name, column in self.columns.items():
+            if name == "podcast_index":
+                column.extend([self.podcast_count] * len(items))
+            else:
+                column.extend(map(operator.attrgetter(name), items))
+        self.podcast_count += 1
+        return self
+
+    def to_pydict(self):
+        """Returns column name -> list of values, e.g. for a DataFrame"""
+        return {name: column.to_pylist() for name, column in self.columns.items()}
+
+    def to_arrow(self):
+        """Returns the columns as a pyarrow.RecordBatch
+
+        The batch holds a copy, more podcasts can be appended afterwards.
+
+        Raises:
+            ImportError: pyarrow is not installed
+        """
+        if pyarrow is None:
+            raise ImportError("Arrow output needs the pyarrow package")
+        return pyarrow.RecordBatch.from_arrays(
+            [column.to_arrow() for column in self.columns.values()],
+            names=list(self.columns),
+        )
+
+    def write_parquet(self, where, **options):
+        """Writes the columns to a Parquet file
+
+        Args:
+            where (str or file-like object): Destination
+            **options: Keyword arguments for pyarrow.parquet.write_table
+
+        Raises:
+            ImportError: pyarrow is not installed
+        """
+        batch = self.to_arrow()
+        from pyarrow import parquet
+
+        parquet.write_table(pyarrow.Table.from_batches([batch]), where, **options)
+
+    def __len__(self):
+        if not self.columns:
+            return 0
+        return len(next(iter(self.columns.values())))
@@ -0,0 +1,286 @@
+"""Normalizes the pubDate strings of many items at once with NumPy
+
+    from pypodcastparser.DateBatch import normalize_published_dates
+
+    dates = normalize_published_dates(
+        [item.published_date_string for item in podcast.items]
+    )
+
+Well formed RFC 822 dates ("Mon, 30 May 2022 04:05:03 GMT") are decoded
+from a character matrix with array operations, one timezone at a time.
+Anything else goes through the same per item functions Item uses, so the
+results always agree with Item.time_published and Item.published_date.
+"""
+import collections
+import email.utils
+import functools
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from pypodcastparser.PubDate import EASTERN_TIMEZONES, MONTHS, parse_published_date
+from pypodcastparser.Timezone import (
+    EASTERN_UTC_OFFSETS,
+    EASTERN_UTC_TRANSITIONS,
+    offset_map,
+    resolve_timezone,
+)
+
+
+PublishedDates = collections.namedtuple(
+    "PublishedDates", ["utc", "eastern", "utc_valid", "eastern_valid"]
+)
+PublishedDates.__doc__ = """Normalized pubDates, one element per input string
+
+Attributes:
+    utc (numpy.ndarray): datetime64[s] UTC times, the Item.time_published
+    epoch seconds. NaT where time_published would be None.
+    eastern (numpy.ndarray): datetime64[s] US/Eastern wall times, the
+    Item.published_date value. NaT where the date could not be parsed.
+    utc_valid (numpy.ndarray): bool mask of the valid utc values
+    eastern_valid (numpy.ndarray): bool mask of the valid eastern values
+"""
+
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+# Layout of "Mon, 30 May 2022 04:05:03 GMT" or "... +0000"
+WIDTH = 31
+SEPARATORS = {3: ",", 4: " ", 7: " ", 11: " ", 16: " ", 19: ":", 22: ":", 25: " "}
+ZONE_START = 26
+
+ONE_DAY = 86400
+
+
+def _key(codes, start, width=3):
+    """Packs width characters per row of a code point matrix into one int"""
+    key = numpy.zeros(len(codes), dtype=numpy.uint64)
+    for position in range(start, start + width):
+        key = (key << numpy.uint64(21)) | codes[:, position].astype(numpy.uint64)
+    return key
+
+
+def _name_key(name):
+    key = 0
+    for character in name:
+        key = (key << 21) | ord(character)
+    return key
+
+
+def _number(digits, start, width):
+    value = digits[:, start]
+    for position in range(start + 1, start + width):
+        value = value * 10 + digits[:, position]
+    return value
+
+
+def _seconds(values):
+    return numpy.asarray(values, dtype=numpy.int64).astype("timedelta64[s]")
+
+
+@functools.lru_cache(maxsize=None)
+def _eastern_transitions():
+    return (
+        numpy.array(EASTERN_UTC_TRANSITIONS, dtype="datetime64[s]"),
+        _seconds([offset.total_seconds() for offset in EASTERN_UTC_OFFSETS]),
+    )
+
+
+@functools.lru_cache(maxsize=512)
+def _zone_arrays(zone):
+    """Returns the transitions of a Zone as arrays, see Zone.to_utc"""
+    info_ids = {}
+    return (
+        numpy.array(zone.local_starts, dtype="datetime64[s]"),
+        numpy.array(zone.local_ends, dtype="datetime64[s]"),
+        numpy.array(zone.utc_transitions, dtype="datetime64[s]"),
+        numpy.array(
+            [info_ids.setdefault(info, len(info_ids)) for info in zone.transition_info]
+        ),
+        _seconds([offset.total_seconds() for offset in zone.utc_offsets]),
+    )
+
+
+def _zone_to_utc(zone, local):
+    """Vectorized Zone.to_utc, returns (utc, mask of the converted values)"""
+    if zone.utc_offset is not None:
+        return local - _seconds(zone.utc_offset.total_seconds()), numpy.ones(len(local), bool)
+    if zone.local_starts is None:
+        return local, numpy.zeros(len(local), bool)
+    starts, ends, utc_transitions, info_ids, utc_offsets = _zone_arrays(zone)
+    i = numpy.searchsorted(starts, local, side="right") - 1
+    previous = numpy.maximum(i - 1, 0)
+    # Non-existent or ambiguous local times are left to pytz
+    converted = (local < ends[i]) & ~((i > 0) & (local < ends[previous]))
+    day = _seconds(ONE_DAY)
+    before = numpy.maximum(numpy.searchsorted(utc_transitions, local - day, side="right") - 1, 0)
+    after = numpy.maximum(numpy.searchsorted(utc_transitions, local + day, side="right") - 1, 0)
+    info = info_ids[i]
+    converted &= (info == info_ids[before]) | (info == info_ids[after])
+    return local - utc_offsets[i], converted
+
+
+def _utc_to_eastern(utc):
+    transitions, offsets = _eastern_transitions()
+    i = numpy.maximum(numpy.searchsorted(transitions, utc, side="right") - 1, 0)
+    return utc + offsets[i]
+
+
+def _decode(strings):
+    """Decodes the well formed dates
+
+    Returns:
+        (local, zones, fast), local datetime64 times and zone tokens of the
+        rows where fast is True
+    """
+    count = len(strings)
+    lengths = numpy.fromiter(map(len, strings), dtype=numpy.int64, count=count)
+    codes = numpy.array(strings, dtype=f"U{WIDTH}").view(numpy.uint32).reshape(count, WIDTH)
+
+    # Pad single digit days to two digits
+    one_digit_day = codes[:, 6] == ord(" ")
+    if one_digit_day.any():
+        padded = numpy.concatenate(
+            [codes[:, :5], numpy.full((count, 1), ord("0"), numpy.uint32), codes[:, 5:-1]],
+            axis=1,
+        )
+        codes = numpy.where(one_digit_day[:, None], padded, codes)
+        lengths = lengths + one_digit_day
+
+    named_zone = lengths == WIDTH - 2
+    fast = named_zone | (lengths == WIDTH)
+    for position, separator in SEPARATORS.items():
+        fast &= codes[:, position] == ord(separator)
+
+    digits = codes.astype(numpy.int64) - ord("0")
+    digit_positions = [5, 6, 12, 13, 14, 15, 17, 18, 20, 21, 23, 24]
+    fast &= ((digits[:, digit_positions] >= 0) & (digits[:, digit_positions] <= 9)).all(axis=1)
+
+    letters = codes[:, ZONE_START : ZONE_START + 3]
+    offset_digits = digits[:, ZONE_START + 1 : WIDTH]
+    sign = codes[:, ZONE_START]
+    fast &= numpy.where(
+        named_zone,
+        ((letters >= ord("A")) & (letters <= ord("Z"))).all(axis=1),
+        ((sign == ord("+")) | (sign == ord("-")))
+        & ((offset_digits >= 0) & (offset_digits <= 9)).all(axis=1),
+    )
+
+    fast &= numpy.isin(_key(codes, 0), [_name_key(day) for day in WEEKDAYS])
+    month_keys = numpy.array([_name_key(name) for name in MONTHS], dtype=numpy.uint64)
+    month_order = numpy.argsort(month_keys)
+    month_key = _key(codes, 8)
+    found = numpy.minimum(
+        numpy.searchsorted(month_keys[month_order], month_key), len(month_keys) - 1
+    )
+    fast &= month_keys[month_order][found] == month_key
+    month = numpy.array(list(MONTHS.values()))[month_order][found]
+
+    day = _number(digits, 5, 2)
+    year = _number(digits, 12, 4)
+    hour = _number(digits, 17, 2)
+    minute = _number(digits, 20, 2)
+    second = _number(digits, 23, 2)
+    # Two digit years are remapped by email.utils, leave them to it
+    fast &= (year >= 100) & (year < 9999)
+    fast &= (hour < 24) & (minute < 60) & (second < 60) & (day >= 1)
+
+    first_of_month = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+    next_month = first_of_month + numpy.timedelta64(1, "M")
+    days_in_month = next_month.astype("datetime64[D]") - first_of_month.astype("datetime64[D]")
+    fast &= day <= days_in_month.astype(numpy.int64)
+
+    local = first_of_month.astype("datetime64[s]") + _seconds(
+        (day - 1) * ONE_DAY + hour * 3600 + minute * 60 + second
+    )
+    zones = (
+        numpy.ascontiguousarray(codes[:, ZONE_START:WIDTH]).view(f"U{WIDTH - ZONE_START}").ravel()
+    )
+    return local, zones, fast
+
+
+def _time_published(date_string):
+    """Item.set_time_published for one string, None when it fails"""
+    try:
+        return email.utils.mktime_tz(email.utils.parsedate_tz(date_string))
+    except Exception:
+        return None
+
+
+def _published_date(date_string):
+    """Item.set_published_date for one string, None when it fails"""
+    try:
+        published_date = parse_published_date(date_string)
+    except Exception:
+        return None
+    if isinstance(published_date, str):
+        published_date = published_date.replace(" ", "T")
+    return numpy.datetime64(published_date, "s")
+
+
+def normalize_published_dates(date_strings):
+    """Normalizes many item pubDate strings at once
+
+    Args:
+        date_strings (iterable): pubDate strings, None for missing dates
+
+    Returns:
+        A PublishedDates
+
+    Raises:
+        ImportError: numpy is not installed
+    """
+    if numpy is None:
+        raise ImportError("Batch date normalization needs the numpy package")
+    strings = [s if isinstance(s, str) else "" for s in date_strings]
+    count = len(strings)
+    utc = numpy.full(count, numpy.datetime64("NaT", "s"))
+    eastern = utc.copy()
+    utc_done = numpy.zeros(count, bool)
+    eastern_done = numpy.zeros(count, bool)
+
+    if count:
+        local, zones, fast = _decode(strings)
+        rows = numpy.flatnonzero(fast)
+        zone_names, zone_index = numpy.unique(zones[rows], return_inverse=True)
+        for position, token in enumerate(zone_names):
+            token = str(token)
+            zone_rows = rows[zone_index == position]
+            zone_local = local[zone_rows]
+
+            parsed = email.utils.parsedate_tz("Thu, 01 Jan 1970 00:00:00 " + token)
+            if parsed is not None and parsed[9] is not None:
+                # Without an offset email.utils falls back to local time
+                utc[zone_rows] = zone_local - _seconds(parsed[9])
+                utc_done[zone_rows] = True
+
+            if token[0] in "+-":
+                # parse_published_date reads dates with offsets it does
+                # not know as Eastern time
+                name = offset_map.get(token, "EST")
+            else:
+                name = token
+            if name in EASTERN_TIMEZONES:
+                eastern[zone_rows] = zone_local
+                eastern_done[zone_rows] = True
+                continue
+            try:
+                zone = resolve_timezone(name)
+            except Exception:
+                continue
+            zone_utc, converted = _zone_to_utc(zone, zone_local)
+            zone_rows = zone_rows[converted]
+            eastern[zone_rows] = _utc_to_eastern(zone_utc[converted])
+            eastern_done[zone_rows] = True
+
+    for row in numpy.flatnonzero(~utc_done):
+        time_published = _time_published(strings[row] or None)
+        if time_published is not None:
+            utc[row] = numpy.datetime64(time_published, "s")
+    for row in numpy.flatnonzero(~eastern_done):
+        published_date = _published_date(strings[row] or None)
+        if published_date is not None:
+            eastern[row] = published_date
+
+    return PublishedDates(utc, eastern, ~numpy.isnat(utc), ~numpy.isnat(eastern))
@@ -0,0 +1,76 @@
+"""Aggregated diagnostics of how item pubDates were parsed
+
+Each Item records the outcome of parsing its pubDate, see the outcomes in
+PubDate. After a feed is parsed, Podcast logs one summary of the outcome
+counts to the "pypodcastparser.dates" logger at INFO:
+
+    logging.getLogger("pypodcastparser.dates").setLevel(logging.INFO)
+
+With DEBUG enabled, up to SAMPLES randomly chosen items per outcome other
+than fast are logged with their raw pubDate as well. Nothing is counted or
+formatted unless the logger is enabled for INFO.
+"""
+import collections
+import logging
+import random
+
+from pypodcastparser.PubDate import FAST
+
+
+LOGGER = logging.getLogger("pypodcastparser.dates")
+
+# Items logged per outcome when DEBUG is enabled
+SAMPLES = 3
+
+
+def published_date_outcomes(items):
+    """Returns a Counter of the published_date_outcome of items
+
+    Items without a pubDate are not counted.
+    """
+    counts = collections.Counter(item.published_date_outcome for item in items)
+    counts.pop(None, None)
+    return counts
+
+
+def log_published_dates(podcast, samples=SAMPLES):
+    """Logs the pubDate outcomes of a parsed podcast's items
+
+    Items of a lazy Podcast are not parsed yet, only the items already read
+    are counted.
+
+    Args:
+        podcast (Podcast): The parsed podcast
+        samples (int): Items logged per outcome other than fast when DEBUG
+        is enabled, 0 to never log single items
+    """
+    if not LOGGER.isEnabledFor(logging.INFO):
+        return
+    if podcast.lazy:
+        items = podcast.items.materialized
+    else:
+        items = podcast.items
+    counts = dict(published_date_outcomes(items))
+    feed = podcast.link or podcast.title
+    LOGGER.info(
+        "Published dates of %s: %s",
+        feed,
+        counts,
+        extra={"feed": feed, "published_date_outcomes": counts},
+    )
+    if not samples or not LOGGER.isEnabledFor(logging.DEBUG):
+        return
+    cases = collections.defaultdict(list)
+    for item in items:
+        outcome = item.published_date_outcome
+        if outcome is not None and outcome != FAST:
+            cases[outcome].append(item)
+    for outcome, outcome_items in cases.items():
+        for item in random.sample(outcome_items, min(samples, len(outcome_items))):
+            LOGGER.debug(
+                "Published date %r of %s parsed %s: %s",
+                item.published_date_string,
+                feed,
+                outcome,
+                item.published_date,
+            )
@@ -0,0 +1,303 @@
+from bs4 import Tag
+
+from pypodcastparser.Error import ParseError
+from pypodcastparser.StreamParser import ElementTag
+
+
+ITUNES = "http://www.itunes.com/dtds/podcast-1.0.dtd"
+CONTENT = "http://purl.org/rss/1.0/modules/content/"
+PODCAST = "https://podcastindex.org/namespace/1.0"
+IHR = "http://iheart.com/rss/ihr"
+
+# Prefix conventionally bound to each namespace, used when a feed declares
+# a known prefix with a misspelled or outdated namespace URI
+PREFIX_NAMESPACES = {
+    "itunes": ITUNES,
+    "content": CONTENT,
+    "podcast": PODCAST,
+    "ihr": IHR,
+}
+
+# Namespace URIs seen in the wild, mapped to the canonical URI
+NAMESPACE_ALIASES = {
+    ITUNES: ITUNES,
+    "https://www.itunes.com/dtds/podcast-1.0.dtd": ITUNES,
+    "http://www.itunes.com/DTDs/Podcast-1.0.dtd": ITUNES,
+    "https://www.itunes.com/DTDs/Podcast-1.0.dtd": ITUNES,
+    CONTENT: CONTENT,
+    "https://purl.org/rss/1.0/modules/content/": CONTENT,
+    PODCAST: PODCAST,
+    "https://github.com/Podcastindex-org/podcast-namespace/blob/main/docs/1.0.md": PODCAST,
+    IHR: IHR,
+    "https://iheart.com/rss/ihr": IHR,
+}
+
+
+def canonical_namespace(namespace, prefix):
+    """Returns the canonical namespace URI of a tag
+
+    Tags without a namespace belong to RSS itself and map to None. Unknown
+    URIs fall back to the conventional namespace of their prefix, e.g.
+    itunes:author bound to a mistyped URI is still an iTunes tag.
+    """
+    if namespace is None:
+        return None
+    canonical = NAMESPACE_ALIASES.get(namespace)
+    if canonical is not None:
+        return canonical
+    return PREFIX_NAMESPACES.get(prefix, namespace)
+
+
+def find_children(tag, namespace, name):
+    """Returns the direct child tags of tag in namespace called name"""
+    return [
+        c
+        for c in tag.children
+        if isinstance(c, (Tag, ElementTag))
+        and c.name == name
+        and canonical_namespace(c.namespace, c.prefix) == namespace
+    ]
+
+
+def find_child(tag, namespace, name):
+    """Returns the first direct child tag of tag in namespace called name"""
+    for c in tag.children:
+        if (
+            isinstance(c, (Tag, ElementTag))
+            and c.name == name
+            and canonical_namespace(c.namespace, c.prefix) == namespace
+        ):
+            return c
+    return None
+
+
+def sets(*fields, source=None):
+    """Declares the attributes a handler populates, see TagRegistry.project
+
+    Handlers without the declaration populate the attribute named after the
+    method, e.g. set_title sets title. source names the attribute a setter
+    called without a tag derives its fields from, ErrorCollector records
+    it as the raw value of a failure.
+    """
+
+    def declare(method):
+        method.fields = fields
+        method.source = source
+        return method
+
+    return declare
+
+
+def handler_fields(method):
+    """Returns the attributes a handler populates"""
+    fields = getattr(method, "fields", None)
+    if fields is None:
+        fields = (method.__name__.split("_", 1)[1],)
+    return fields
+
+
+class ErrorCollector(object):
+    """Calls setters and records their failures instead of raising
+
+    The attributes a failed setter populates are put back to the values
+    they had before it was called, so no half parsed value is kept.
+
+    Args:
+        errors (list): Receives a ParseError per failed setter
+        item_index (int): Recorded with each error, None for show level
+        setters
+        call (callable): Calls the setters, e.g. ParseStats.call. They are
+        called directly if None.
+    """
+
+    __slots__ = ("errors", "item_index", "inner")
+
+    def __init__(self, errors, item_index=None, call=None):
+        self.errors = errors
+        self.item_index = item_index
+        self.inner = call
+
+    def call(self, method, *args):
+        """Calls method(*args), returns None when it raises
+
+        method is a setter function called with (obj, tag) or a bound
+        method called without arguments.
+        """
+        obj = args[0] if args else method.__self__
+        fields = handler_fields(method)
+        before = [getattr(obj, field, None) for field in fields]
+        try:
+            if self.inner is None:
+                return method(*args)
+            return self.inner(method, *args)
+        except Exception as e:
+            for field, value in zip(fields, before):
+                setattr(obj, field, value)
+            raw_value = None
+            if len(args) > 1:
+                try:
+                    raw_value = args[1].string
+                except Exception:
+                    pass
+            elif getattr(method, "source", None) is not None:
+                raw_value = getattr(obj, method.source, None)
+            if raw_value is not None:
+                # A NavigableString would keep the parse tree alive
+                raw_value = str(raw_value)
+            self.errors.append(
+                ParseError(
+                    handler_fields(method)[0],
+                    self.item_index,
+                    raw_value,
+                    str(e) or type(e).__name__,
+                )
+            )
+            return None
+
+
+class TagRegistry(object):
+    """Maps (namespace URI, local name) of child tags to setter functions
+
+    Registries are built once per class. Every tag that may only be handled
+    once gets its own bit, so a parse tracks the tags it has already seen
+    in a single int.
+
+    Args:
+        entries (iterable): (namespace, name, method) or
+        (namespace, name, method, many) tuples, see register
+
+    Attributes:
+        handlers (dict): (namespace, name) -> (bit, method), bit is 0 for
+        tags that may repeat
+    """
+
+    # Distinct (namespace, prefix, name) triples remembered by lookup
+    MAX_RESOLVED = 4096
+    # Distinct field sets remembered by project
+    MAX_PROJECTIONS = 64
+
+    def __init__(self, entries=()):
+        self.handlers = {}
+        self._next_bit = 1
+        self._resolved = {}
+        self._projections = {}
+        for entry in entries:
+            self.register(*entry)
+
+    def register(self, namespace, name, method, many=False):
+        """Registers method(obj, tag) as the handler of a tag
+
+        Args:
+            namespace (str): Namespace URI of the tag, None for plain RSS tags
+            name (str): Local name of the tag
+            method (function): Called with the parsed object and the tag
+            many (bool): The tag may repeat, otherwise only the first
+            occurrence is handled
+        """
+        key = (NAMESPACE_ALIASES.get(namespace, namespace), name)
+        previous = self.handlers.get(key)
+        if many:
+            bit = 0
+        elif previous is not None and previous[0]:
+            bit = previous[0]
+        else:
+            bit = self._next_bit
+            self._next_bit <<= 1
+        self.handlers[key] = (bit, method)
+        self._resolved.clear()
+        self._projections.clear()
+
+    def copy(self):
+        """Returns a registry with the same handlers, for subclasses"""
+        registry = TagRegistry()
+        registry.handlers = dict(self.handlers)
+        registry._next_bit = self._next_bit
+        return registry
+
+    @property
+    def fields(self):
+        """Attributes populated by the registered handlers"""
+        return frozenset(
+            field for _, method in self.handlers.values() for field in handler_fields(method)
+        )
+
+    def project(self, fields):
+        """Returns a registry with only the handlers that populate fields
+
+        Tags of the other handlers are skipped without being read.
+
+        Args:
+            fields (iterable): Attribute names, see the fields property
+
+        Raises:
+            ValueError: A field is not populated by any handler
+        """
+        fields = frozenset(fields)
+        projected = self._projections.get(fields)
+        if projected is not None:
+            return projected
+        unknown = fields - self.fields
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        projected = self.copy()
+        projected.handlers = {
+            key: handler
+            for key, handler in self.handlers.items()
+            if not fields.isdisjoint(handler_fields(handler[1]))
+        }
+        if len(self._projections) < self.MAX_PROJECTIONS:
+            self._projections[fields] = projected
+        return projected
+
+    def lookup(self, tag):
+        """Returns (bit, method) for a tag, None when it is not registered"""
+        key = (tag.namespace, tag.prefix, tag.name)
+        try:
+            return self._resolved[key]
+        except KeyError:
+            pass
+        handler = self.handlers.get(
+            (canonical_namespace(tag.namespace, tag.prefix), tag.name)
+        )
+        if len(self._resolved) < self.MAX_RESOLVED:
+            self._resolved[key] = handler
+        return handler
+
+    def dispatch(self, obj, children):
+        """Calls the registered handler of each tag in children on obj"""
+        lookup = self.lookup
+        seen = 0
+        for c in children:
+            if not isinstance(c, (Tag, ElementTag)):
+                continue
+            handler = lookup(c)
+            if handler is None:
+                continue
+            bit, method = handler
+            # Skip duplicated tag on invalid feeds
+            if bit:
+                if seen & bit:
+                    continue
+                seen |= bit
+            method(obj, c)
+
+    def dispatch_with(self, obj, children, call):
+        """dispatch that calls each handler through call(method, obj, tag)
+
+        Args:
+            call (callable): e.g. ParseStats.call or ErrorCollector.call
+        """
+        lookup = self.lookup
+        seen = 0
+        for c in children:
+            if not isinstance(c, (Tag, ElementTag)):
+                continue
+            handler = lookup(c)
+            if handler is None:
+                continue
+            bit, method = handler
+            if bit:
+                if seen & bit:
+                    continue
+                seen |= bit
+            call(method, obj, c)
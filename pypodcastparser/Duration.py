@@ -0,0 +1,88 @@
+"""Parses itunes:duration values into seconds
+
+Feeds write durations as bare seconds ("2785"), M:S ("46:25"), H:M:S
+("0:46:25"), any of those with fractional seconds ("2785.5") or as ISO 8601
+durations ("PT46M25S"). Plain M:S and H:M:S values are split with str.partition,
+everything else is matched by one precompiled regex. Fractions of a second
+are dropped.
+"""
+import re
+
+
+CLOCK_RE = re.compile(r"\s*(?:(?:(\d+):)?(\d+):)?(\d+)(?:[.,]\d*)?\s*")
+ISO_8601_RE = re.compile(
+    r"\s*P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)(?:[.,]\d*)?S)?)?\s*", re.IGNORECASE
+)
+
+# Largest duration that fits an int64 array
+MAX_DURATION = 2 ** 63 - 1
+
+
+def parse_duration(value):
+    """Returns a duration in whole seconds
+
+    Args:
+        value (str): An itunes:duration value
+
+    Returns:
+        The duration as an int, None when value is None or not a duration
+    """
+    if value is None:
+        return None
+    if value.isascii():
+        if value.isdigit():
+            return int(value)
+        first, colon, rest = value.partition(":")
+        if colon and first.isdigit():
+            second, colon, third = rest.partition(":")
+            if not colon:
+                if rest.isdigit():
+                    return int(first) * 60 + int(rest)
+            elif second.isdigit() and third.isdigit():
+                return (int(first) * 60 + int(second)) * 60 + int(third)
+    match = CLOCK_RE.fullmatch(value)
+    if match is not None:
+        hours, minutes, seconds = match.groups()
+        duration = int(seconds)
+        if minutes is not None:
+            duration += int(minutes) * 60
+        if hours is not None:
+            duration += int(hours) * 3600
+        return duration
+    match = ISO_8601_RE.fullmatch(value)
+    if match is not None and any(match.groups()):
+        days, hours, minutes, seconds = (int(part or 0) for part in match.groups())
+        return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+    return None
+
+
+def parse_durations(values, out=None, missing=-1):
+    """Parses many itunes:duration values into a numpy int64 array
+
+    Args:
+        values (iterable): itunes:duration values, None for missing ones
+        out (numpy.ndarray): int64 array to fill, a new one if None. It must
+        have room for every value.
+        missing (int): Stored for values that are not durations
+
+    Returns:
+        The filled array
+
+    Raises:
+        ImportError: numpy is not installed
+    """
+    # Imported here so parsing items does not import numpy
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Batch duration parsing needs the numpy package") from None
+    durations = [parse_duration(value) for value in values]
+    parsed = numpy.fromiter(
+        (missing if d is None or d > MAX_DURATION else d for d in durations),
+        dtype=numpy.int64,
+        count=len(durations),
+    )
+    if out is None:
+        return parsed
+    out[: len(parsed)] = parsed
+    return out
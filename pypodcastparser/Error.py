@@ -1,2 +1,19 @@
+import collections
+
+
 class InvalidPodcastFeed(ValueError):
     pass
+
+
+ParseError = collections.namedtuple(
+    "ParseError", ["field", "item_index", "raw_value", "reason"]
+)
+ParseError.__doc__ = """A setter that failed on a Podcast parsed with strict=False
+
+Attributes:
+    field (str): The attribute the setter populates, e.g. "published_date"
+    item_index (int): Position of the item in Podcast.items, None for show
+    level fields
+    raw_value (str): Text of the tag, None when it has none
+    reason (str): The error message
+"""
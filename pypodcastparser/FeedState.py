@@ -0,0 +1,260 @@
+import collections
+import hashlib
+import re
+
+from lxml import etree
+
+from pypodcastparser.StreamParser import ElementTag
+
+
+ITEM_START_RE = re.compile(rb"<item[\s>]|<!\[CDATA\[|<!--")
+ITEM_END_RE = re.compile(rb"</item>|<item[\s>]|<!\[CDATA\[|<!--")
+
+# Sections whose text is not markup, opening -> closing
+SECTION_ENDS = {b"<![CDATA[": b"]]>", b"<!--": b"-->"}
+
+IncrementalResult = collections.namedtuple(
+    "IncrementalResult", ["podcast", "added", "changed", "removed", "state"]
+)
+IncrementalResult.__doc__ = """Result of Podcast.parse_incremental
+
+Attributes:
+    podcast (Podcast): Show level fields, items holds the added and changed
+    items. None when the feed content did not change at all.
+    added (list): Item objects that were not in the previous state
+    changed (list): Item objects whose xml differs from the previous state
+    removed (list): Keys of the items that are no longer in the feed
+    state (FeedState): State to pass to the next parse_incremental call
+"""
+
+
+def content_hash(feed_content):
+    """Returns the hex digest identifying a feed's raw bytes"""
+    return hashlib.sha256(feed_content).hexdigest()
+
+
+def fingerprint(raw):
+    """Returns the digest identifying the raw bytes of an item"""
+    return hashlib.sha256(raw).digest()[:8]
+
+
+def item_fingerprint(tag):
+    """Returns a digest of the serialized xml of a parsed item tag"""
+    if isinstance(tag, ElementTag):
+        raw = etree.tostring(tag.element, with_tail=False)
+    else:
+        raw = str(tag).encode("utf-8")
+    return fingerprint(raw)
+
+
+def item_spans(feed_content):
+    """Returns the (start, end) byte offsets of every <item> element
+
+    The items are located with plain byte searches so unchanged items can
+    be recognized without parsing them. CDATA sections and comments are
+    skipped. Returns None when an item can not be delimited safely, e.g.
+    when a section or an item is not terminated or items are nested.
+    """
+    spans = []
+    start = None
+    position = 0
+    while True:
+        pattern = ITEM_START_RE if start is None else ITEM_END_RE
+        match = pattern.search(feed_content, position)
+        if match is None:
+            return spans if start is None else None
+        token = match.group()
+        closing = SECTION_ENDS.get(token)
+        if closing is not None:
+            end = feed_content.find(closing, match.end())
+            if end < 0:
+                return None
+            position = end + len(closing)
+        elif token == b"</item>":
+            spans.append((start, match.end()))
+            start = None
+            position = match.end()
+        elif start is None:
+            start = match.start()
+            position = match.end()
+        else:
+            return None
+
+
+def cut_unchanged_items(feed_content, state):
+    """Removes the items whose raw bytes did not change from a feed
+
+    Args:
+        feed_content (bytes): An rss string
+        state (FeedState): The previous state, None for the first parse
+
+    Returns:
+        (content, raw_fingerprints, unchanged) where content is the feed
+        without the unchanged items, raw_fingerprints lists the raw
+        fingerprints of the items left in content in order and unchanged
+        lists (key, raw fingerprint) of the items that were removed. None
+        when the items can not be located.
+    """
+    spans = item_spans(feed_content)
+    if spans is None:
+        return None
+    if state is None:
+        previous_keys = {}
+    else:
+        previous_keys = {v: k for k, v in state.raw_fingerprints.items()}
+    view = memoryview(feed_content)
+    pieces = []
+    raw_fingerprints = []
+    unchanged = []
+    last = 0
+    for start, end in spans:
+        raw_fingerprint = fingerprint(view[start:end])
+        key = previous_keys.pop(raw_fingerprint, None)
+        if key is None:
+            raw_fingerprints.append(raw_fingerprint)
+            continue
+        pieces.append(view[last:start])
+        last = end
+        unchanged.append((key, raw_fingerprint))
+    if not unchanged:
+        return feed_content, raw_fingerprints, unchanged
+    pieces.append(view[last:])
+    return b"".join(pieces), raw_fingerprints, unchanged
+
+
+def item_key(guid, fingerprint):
+    """Returns the key an item is tracked by, its guid when it has one"""
+    if guid is not None:
+        return str(guid)
+    return "fingerprint:" + fingerprint.hex()
+
+
+class FeedState(object):
+    """What parse_incremental remembers about a feed between polls
+
+    Args:
+        content_hash (str): content_hash of the last parsed feed
+        fingerprints (dict): Item key -> fingerprint of its parsed xml
+        newest_time_published (int): Newest item time_published seen so far
+        raw_fingerprints (dict): Item key -> fingerprint of its raw bytes,
+        only used to cut unchanged items before parsing. Items that could
+        not be delimited by byte search have none.
+
+    Items are keyed by guid, items without a guid are keyed by their
+    fingerprint so any change to them shows up as a removal and an addition.
+    """
+
+    __slots__ = (
+        "content_hash",
+        "fingerprints",
+        "newest_time_published",
+        "raw_fingerprints",
+    )
+
+    def __init__(
+        self,
+        content_hash=None,
+        fingerprints=None,
+        newest_time_published=None,
+        raw_fingerprints=None,
+    ):
+        self.content_hash = content_hash
+        self.fingerprints = {} if fingerprints is None else fingerprints
+        self.newest_time_published = newest_time_published
+        self.raw_fingerprints = {} if raw_fingerprints is None else raw_fingerprints
+
+    @property
+    def guids(self):
+        """Keys of the items of the last parsed feed"""
+        return list(self.fingerprints)
+
+    def to_dict(self):
+        """Create a JSON serializable dict representation of the state"""
+        return {
+            "content_hash": self.content_hash,
+            "fingerprints": {k: v.hex() for k, v in self.fingerprints.items()},
+            "newest_time_published": self.newest_time_published,
+            "raw_fingerprints": {
+                k: v.hex() for k, v in self.raw_fingerprints.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, state_dict):
+        """Rebuild a state from the output of to_dict"""
+        return cls(
+            content_hash=state_dict["content_hash"],
+            fingerprints={
+                k: bytes.fromhex(v) for k, v in state_dict["fingerprints"].items()
+            },
+            newest_time_published=state_dict["newest_time_published"],
+            raw_fingerprints={
+                k: bytes.fromhex(v)
+                for k, v in state_dict.get("raw_fingerprints", {}).items()
+            },
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, FeedState):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"<FeedState {len(self.fingerprints)} items {self.content_hash}>"
+
+
+class ItemDiff(object):
+    """Item filter for Podcast that only lets new and changed items through
+
+    Items are always compared by the fingerprint of their parsed xml, raw
+    fingerprints are only carried along for the next cut_unchanged_items.
+
+    Args:
+        state (FeedState): State of the previous parse, None for the first
+        raw_fingerprints (iterable): Raw fingerprints of the items the
+        parser will see, in order. None when the items were not delimited.
+        unchanged (iterable): (key, raw fingerprint) of unchanged items that
+        were cut from the document before parsing
+
+    Attributes:
+        fingerprints (dict): Item key -> fingerprint of the unchanged items
+        and the items seen so far
+        raw_fingerprints (dict): Item key -> raw fingerprint, for the items
+        whose raw bytes are known
+        keys (list): Keys of the items let through, in feed order
+        changed_keys (set): Keys of the items that were let through because
+        their fingerprint changed
+        calls (int): Number of items the filter was called for
+    """
+
+    def __init__(self, state=None, raw_fingerprints=None, unchanged=()):
+        self.previous = {} if state is None else state.fingerprints
+        self.expected = None if raw_fingerprints is None else iter(raw_fingerprints)
+        self.raw_fingerprints = dict(unchanged)
+        self.fingerprints = {key: self.previous[key] for key in self.raw_fingerprints}
+        self.changed_keys = set()
+        self.keys = []
+        self.calls = 0
+
+    def __call__(self, guid, tag):
+        self.calls += 1
+        fingerprint = item_fingerprint(tag)
+        raw_fingerprint = None if self.expected is None else next(self.expected, None)
+        key = item_key(guid, fingerprint)
+        if key in self.fingerprints:
+            # Duplicated item on invalid feeds, the first one wins
+            return False
+        self.fingerprints[key] = fingerprint
+        if raw_fingerprint is not None:
+            self.raw_fingerprints[key] = raw_fingerprint
+        previous = self.previous.get(key)
+        if previous == fingerprint:
+            return False
+        if previous is not None:
+            self.changed_keys.add(key)
+        self.keys.append(key)
+        return True
+
+    def removed(self):
+        """Keys of previous items that were not seen"""
+        return [key for key in self.previous if key not in self.fingerprints]
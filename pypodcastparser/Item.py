@@ -1,104 +1,40 @@
-from bs4 import Tag
-
 import datetime
-from datetime import timezone
 import email.utils
-import re
+import json
 import pytz
-import logging
 
+from pypodcastparser.Dispatch import (
+    CONTENT,
+    IHR,
+    ITUNES,
+    PODCAST,
+    ErrorCollector,
+    TagRegistry,
+    sets,
+)
+from pypodcastparser.Duration import parse_duration
 from pypodcastparser.Error import InvalidPodcastFeed
-
-
-LOGGER = logging.getLogger(__name__)
-
-
-pytz_timezone_list = [tz for tz in pytz.all_timezones]
-
-common_timezones = {
-    "IDLW": "Pacific/Midway",
-    "NUT": "Pacific/Niue",
-    "MART": "Pacific/Marquesas",
-    "AKST": "America/Anchorage",
-    "MST": "America/Denver",
-    "EST": "America/New_York",
-    "VET": "America/Caracas",
-    "BRT": "America/Sao_Paulo",
-    "GST": "Asia/Dubai",
-    "AZOT": "Atlantic/Azores",
-    "MSK": "Europe/Moscow",
-    "PKT": "Asia/Karachi",
-    "NPT": "Asia/Kathmandu",
-    "MMT": "Asia/Rangoon",
-    "ICT": "Asia/Bangkok",
-    "AWST": "Australia/Perth",
-    "ACWST": "Australia/Eucla",
-    "GMT": "GMT",
-    "ACST": "Australia/Adelaide",
-    "AEDT": "Australia/Sydney",
-    "CHAST": "Pacific/Chatham",
-    "NZDT": "Pacific/Auckland",
-    "LINT": "Pacific/Kiritimati",
-    "UTC": "UTC",
-    "CET": "Europe/Berlin",
-    "EET": "Africa/Cairo",
-    "EAT": "Africa/Addis_Ababa",
-    "IST": "Asia/Kolkata",
-    "BST": "Europe/London",
-    "JST": "Asia/Tokyo",
-    "ACT": "Australia/ACT",
-    "SST": "Pacific/Pago_Pago",
-    "NST": "America/St_Johns",
-    "HST": "America/Adak",
-    "AST": "America/Puerto_Rico",
-    "PST": "US/Pacific",
-    "CST": "US/Central",
-    "CAT": "Africa/Maputo",
-    "AEST": "Australia/Sydney",
-    "PDT": "America/Los_Angeles",
-    "NZST": "Pacific/Auckland",
-}
-
-# Map of timezone offsets to timezone abbreviations
-offset_map = {
-    "-1200": "IDLW",
-    "-1100": "NUT",
-    "-1000": "HST",
-    "-0930": "MART",
-    "-0900": "AKST",
-    "-0800": "PST",
-    "-0700": "MST",
-    "-0600": "CST",
-    "-0500": "EST",
-    "-0430": "VET",
-    "-0400": "AST",
-    "-0330": "NST",
-    "-0300": "BRT",
-    "-0200": "GST",
-    "-0100": "AZOT",
-    "-0000": "GMT",
-    "+0000": "GMT",
-    "+0100": "CET",
-    "+0200": "EET",
-    "+0300": "MSK",
-    "+0400": "GST",
-    "+0500": "PKT",
-    "+0545": "NPT",
-    "+0600": "BST",
-    "+0630": "MMT",
-    "+0700": "ICT",
-    "+0800": "AWST",
-    "+0845": "ACWST",
-    "+0900": "JST",
-    "+0930": "ACST",
-    "+1000": "AEST",
-    "+1030": "ACST",
-    "+1100": "AEDT",
-    "+1200": "NZST",
-    "+1245": "CHAST",
-    "+1300": "NZDT",
-    "+1400": "LINT",
-}
+from pypodcastparser.PubDate import (  # noqa: F401
+    MISSING,
+    NOW,
+    common_timezones,
+    offset_map,
+    parse_published_date,
+    parse_published_date_outcome,
+    pytz_timezone_list,
+)
+
+
+def detach_strings(obj):
+    """Replaces bs4.NavigableString attribute values with plain strings
+
+    A NavigableString links back to its parent tag, so holding on to one
+    keeps the whole parse tree alive.
+    """
+    for key in obj.__slots__:
+        value = getattr(obj, key, None)
+        if isinstance(value, str) and type(value) is not str:
+            setattr(obj, key, str(value))
 
 
 class Item(object):
@@ -108,7 +44,16 @@ class Item(object):
     iTunes Podcast Specs http://www.apple.com/itunes/podcasts/specs.html
 
     Args:
-        soup (bs4.BeautifulSoup): BeautifulSoup object representing a rss item
+        soup (bs4.BeautifulSoup): BeautifulSoup object representing a rss item,
+        or an ElementTag when parsed with the iterparse engine
+        retain_source (bool): Keep soup after the attributes have been populated
+        fields (iterable): Only populate these attributes, the tags of the
+        others are skipped. All attributes are populated if None.
+        stats (ParseStats): Records the calls and time of each setter
+        errors (list): Setters that fail append a ParseError here instead
+        of raising InvalidPodcastFeed
+        index (int): Position of the item in its podcast, recorded with
+        the errors
 
     Note:
         All attributes with empty or non-existent element
@@ -126,7 +71,8 @@ class Item(object):
         itunes_episode (int): Episode number in season
         itunes_season (int): Podcast season
         itunes_block (bool): It this Item blocked from itunes
-        itunes_duration (str): Duration of enclosure
+        itunes_duration (int): Duration of enclosure in seconds, None when
+        it is missing or not a duration
         itunes_explicit (str): Is this item explicit.
         Should only be yes or clean.
         itunes_image (str): URL of item cover art
@@ -135,12 +81,47 @@ class Item(object):
         itunes_summary (str): The summary of the item
         content_encoded(str): The encoded content of the item
         published_date (str): Date item was published
+        published_date_outcome (str): How published_date was parsed, one
+        of the outcomes in PubDate, None when there is no pubDate
         title (str): The title of item.
         interactive(bool): This item is interactive
         is_interactive (boolean): Is an iheart podcast interactive
     """
 
-    def __init__(self, soup):
+    __slots__ = (
+        "soup",
+        "author",
+        "description",
+        "enclosure_url",
+        "enclosure_type",
+        "enclosure_length",
+        "content_encoded",
+        "guid",
+        "itunes_author_name",
+        "itunes_episode_type",
+        "itunes_block",
+        "itunes_duration",
+        "itunes_season",
+        "itunes_episode",
+        "itunes_explicit",
+        "itunes_image",
+        "itunes_order",
+        "itunes_subtitle",
+        "itunes_summary",
+        "published_date",
+        "published_date_string",
+        "published_date_outcome",
+        "title",
+        "date_time",
+        "time_published",
+        "interactive",
+        "is_interactive",
+        "podcast_transcript",
+    )
+
+    def __init__(
+        self, soup, retain_source=True, fields=None, stats=None, errors=None, index=None
+    ):
         self.soup = soup
 
         # Initialize attributes as they might not be populated
@@ -164,56 +145,37 @@ class Item(object):
         self.itunes_summary = None
         self.published_date = None
         self.published_date_string = None
+        self.published_date_outcome = None
         self.title = None
         self.date_time = None
         self.interactive = None
         self.is_interactive = None
         self.podcast_transcript = None
-        self.transcriptionList = []
-
-        tag_methods = {
-            (None, "title"): self.set_title,
-            (None, "author"): self.set_author,
-            (None, "description"): self.set_description,
-            (None, "guid"): self.set_guid,
-            (None, "pubDate"): self.set_published_date,
-            (None, "enclosure"): self.set_enclosure,
-            (None, "is_interactive"): self.is_interactive,
-            ("content", "encoded"): self.set_content_encoded,
-            ("itunes", "author"): self.set_itunes_author_name,
-            ("itunes", "episode"): self.set_itunes_episode,
-            ("itunes", "episodeType"): self.set_itunes_episode_type,
-            ("itunes", "block"): self.set_itunes_block,
-            ("itunes", "season"): self.set_itunes_season,
-            ("itunes", "duration"): self.set_itunes_duration,
-            ("itunes", "explicit"): self.set_itunes_explicit,
-            ("itunes", "image"): self.set_itunes_image,
-            ("podcast", "transcript"): self.set_podcast_transcript,
-            ("itunes", "order"): self.set_itunes_order,
-            ("itunes", "subtitle"): self.set_itunes_subtitle,
-            ("itunes", "summary"): self.set_itunes_summary,
-            ("ihr", "interactive"): self.set_interactive,
-        }
 
         # Populate attributes based on feed content
-        for c in self.soup.children:
-            if not isinstance(c, Tag):
-                continue
-            try:
-                # Using get instead of pop since there can be multiple transcript tags (meaning we don't want to get rid of method after use)
-                if c.name == "transcript":
-                    tag_method = tag_methods.get((c.prefix, c.name))
-                else:
-                    # Pop method to skip duplicated tag on invalid feeds
-                    tag_method = tag_methods.pop((c.prefix, c.name))
-            except (AttributeError, KeyError):
-                continue
-
-            tag_method(c)
-
-        self.set_time_published()
-        self.set_dates_published()
-
+        tag_methods = self.tag_methods
+        if fields is not None:
+            tag_methods = tag_methods.project(fields)
+        if stats is None and errors is None:
+            tag_methods.dispatch(self, self.soup.children)
+            self.set_time_published()
+            self.set_dates_published()
+        else:
+            call = None
+            if stats is not None:
+                stats.items += 1
+                call = stats.call
+            if errors is not None:
+                call = ErrorCollector(errors, index, call).call
+            tag_methods.dispatch_with(self, self.soup.children, call)
+            call(self.set_time_published)
+            call(self.set_dates_published)
+
+        if not retain_source:
+            self.soup = None
+            detach_strings(self)
+
+    @sets("time_published", source="published_date_string")
     def set_time_published(self):
         if self.published_date_string is None:
             self.time_published = None
@@ -228,6 +190,7 @@ class Item(object):
                 f"Invalid Podcast Feed, episode level pubDate: {self.published_date_string}, could not be parsed"
             )
 
+    @sets("date_time", source="published_date_string")
     def set_dates_published(self):
         if self.time_published is None:
             self.date_time = None
@@ -261,6 +224,10 @@ class Item(object):
 
         return item
 
+    def to_json(self, default=None):
+        """Returns json.dumps(self.to_dict(), default=default)"""
+        return json.dumps(self.to_dict(), default=default)
+
     def set_rss_element(self):
         """Set each of the basic rss elements."""
         self.set_enclosure()
@@ -287,6 +254,7 @@ class Item(object):
                 "Invalid Podcast Feed, episode level description could not be parsed"
             )
 
+    @sets("content_encoded", "description")
     def set_content_encoded(self, tag):
         """Parses content_encoded and set value."""
         try:
@@ -300,6 +268,7 @@ class Item(object):
                 "Invalid Podcast Feed, episode level content_encoded could not be parsed"
             )
 
+    @sets("enclosure_url", "enclosure_type", "enclosure_length")
     def set_enclosure(self, tag):
         """Parses enclosure_url, enclosure_type then set values."""
         try:
@@ -328,110 +297,26 @@ class Item(object):
             )
 
     # TODO convert to one timezone
+    @sets(
+        "published_date",
+        "published_date_string",
+        "published_date_outcome",
+        "time_published",
+        "date_time",
+    )
     def set_published_date(self, tag):
         """Parses published date and set value."""
         try:
             self.published_date = tag.string
             self.published_date_string = tag.string
-
-            deconstructed_date = self.published_date_string.split(" ")
-            if len(deconstructed_date) < 4:
-                raise AttributeError
-
-            published_date_timezone = ""
-            # Check for timezone abbreviation
-            if re.match("^[a-zA-Z]{3}$", deconstructed_date[-1]):
-                published_date_timezone = deconstructed_date[-1]
-                deconstructed_date.pop()
-            else:
-                # Check for specific timezone offsets
-                for offset, tz in offset_map.items():
-                    if offset in self.published_date:
-                        published_date_timezone = tz
-                        deconstructed_date.pop()
-                        break
-            if not published_date_timezone:
-                published_date_timezone = "EST"
-
-            regex_array = [
-                r"^[a-zA-Z]{3},$",  # Raw string, so \ is treated literally
-                r"^\d{1,2}$",
-                r"^[a-zA-Z]{3}$",
-                r"^\d{4}$",
-                r"^\d\d:\d\d",
-            ]
-
-            new_array = []
-            for array_index, array_value in enumerate(regex_array):
-                if re.match(deconstructed_date[array_index], array_value):
-                    new_array.append(array_value)
-                else:
-                    for inner_index, inner_value in enumerate(deconstructed_date):
-                        if re.match(regex_array[array_index], inner_value):
-                            new_array.append(inner_value)
-                            break
-            date_string = (
-                new_array[0]
-                + " "
-                + new_array[1]
-                + " "
-                + new_array[2]
-                + " "
-                + new_array[3]
-                + " "
-                + new_array[4]
+            self.published_date, self.published_date_outcome = parse_published_date_outcome(
+                self.published_date_string
             )
-
-            if len(new_array) != 5:
-                raise AttributeError(
-                    "Error creating new date array. Array is not of length 5 for formatting"
-                )
-
-            time = date_string.split(":")
-            if len(time) == 2:
-                minutes = time[1].split(" ")
-                minutes[0] += ":00"
-                time[0] += ":" + minutes[0]
-                self.published_date = datetime.datetime.strptime(
-                    time[0], "%a, %d %b %Y %H:%M:%S"
-                )
-
-            elif len(time) == 3:
-                time[0] += ":" + time[1]
-                seconds = time[2]
-                seconds_string = seconds[:2]
-                time[0] += ":" + seconds_string
-                self.published_date = datetime.datetime.strptime(
-                    time[0], "%a, %d %b %Y %H:%M:%S"
-                )
-            else:
-                now = datetime.datetime.now(timezone.utc)
-                published_date_timezone = "UTC"
-                self.published_date = datetime.datetime.strptime(
-                    now, "%a, %d %b %Y %H:%M:%S"
-                )
-
-            if published_date_timezone not in ["ET", "EST", "EDT"]:
-                if published_date_timezone in pytz_timezone_list:
-                    current_timezone = pytz.timezone(published_date_timezone)
-                else:
-                    current_timezone = pytz.timezone(
-                        common_timezones.get(published_date_timezone)
-                    )
-
-                date_in_current_timezone = current_timezone.localize(
-                    self.published_date
-                )
-                self.published_date = str(
-                    (
-                        date_in_current_timezone.astimezone(pytz.timezone("US/Eastern"))
-                    ).replace(tzinfo=None)
-                )
-                LOGGER.info("Final Published Date EST: {}".format(self.published_date))
-            else:
-                LOGGER.info("Final Published Date EST: {}".format(self.published_date))
-
         except Exception:
+            if self.published_date_string:
+                self.published_date_outcome = NOW
+            else:
+                self.published_date_outcome = MISSING
             self.published_date = datetime.datetime.now(
                 pytz.timezone("US/Eastern")
             ).strftime("%Y-%m-%d %H:%M:%S")
@@ -483,8 +368,9 @@ class Item(object):
             transcript_dict["type"] = tag.get("type", None)
             transcript_dict["language"] = tag.get("language", None)
             transcript_dict["rel"] = tag.get("rel", None)
-            self.transcriptionList.append(transcript_dict)
-            self.podcast_transcript = self.transcriptionList
+            if self.podcast_transcript is None:
+                self.podcast_transcript = []
+            self.podcast_transcript.append(transcript_dict)
         except AttributeError:
             self.podcast_transcript = None
         except Exception:
@@ -529,39 +415,8 @@ class Item(object):
             self.itunes_block = False
 
     def set_itunes_duration(self, tag):
-        """Parses duration from itunes tags and sets value"""
-        try:
-            # remove milli seconds
-            time_no_mil = tag.string.split(".")
-            t = time_no_mil[0].split(":")
-            duration = 0
-            if len(t) == 3:
-                for i, v in enumerate(t):
-                    if i == 0:
-                        duration += int(t[0]) * 3600
-                    elif i == 1:
-                        duration += int(t[1]) * 60
-                    else:
-                        duration += int(t[2])
-                self.itunes_duration = duration
-
-            elif len(t) == 2:
-                for i, v in enumerate(t):
-                    if i == 0:
-                        duration += int(t[0]) * 60
-                    else:
-                        duration += int(t[1])
-
-                self.itunes_duration = duration
-            else:
-                self.itunes_duration = tag.string
-
-        except AttributeError:
-            self.itunes_duration = None
-        except Exception:
-            raise InvalidPodcastFeed(
-                f"Invalid Podcast Feed, episode level itunes:duration: {tag.string}, could not be parsed"
-            )
+        """Parses duration from itunes tags and sets value in seconds"""
+        self.itunes_duration = parse_duration(tag.string)
 
     def set_itunes_explicit(self, tag):
         """Parses explicit from itunes item tags and sets value"""
@@ -634,6 +489,7 @@ class Item(object):
                 "Invalid Podcast Feed, episode level itunes:summary could not be parsed"
             )
 
+    @sets("interactive", "is_interactive")
     def set_interactive(self, tag):
         """Parses author and set value."""
         try:
@@ -646,3 +502,36 @@ class Item(object):
             raise InvalidPodcastFeed(
                 f"Invalid Podcast Feed, episode level ihr:interactive: {tag.string}, could not be parsed"
             )
+
+    @property
+    def transcriptionList(self):  # noqa: N802, public name kept for compatibility
+        """All transcripts of the item, in document order"""
+        if self.podcast_transcript is None:
+            return []
+        return self.podcast_transcript
+
+    tag_methods = TagRegistry(
+        [
+            (None, "title", set_title),
+            (None, "author", set_author),
+            (None, "description", set_description),
+            (None, "guid", set_guid),
+            (None, "pubDate", set_published_date),
+            (None, "enclosure", set_enclosure),
+            (None, "is_interactive", set_interactive),
+            (CONTENT, "encoded", set_content_encoded),
+            (ITUNES, "author", set_itunes_author_name),
+            (ITUNES, "episode", set_itunes_episode),
+            (ITUNES, "episodeType", set_itunes_episode_type),
+            (ITUNES, "block", set_itunes_block),
+            (ITUNES, "season", set_itunes_season),
+            (ITUNES, "duration", set_itunes_duration),
+            (ITUNES, "explicit", set_itunes_explicit),
+            (ITUNES, "image", set_itunes_image),
+            (PODCAST, "transcript", set_podcast_transcript, True),
+            (ITUNES, "order", set_itunes_order),
+            (ITUNES, "subtitle", set_itunes_subtitle),
+            (ITUNES, "summary", set_itunes_summary),
+            (IHR, "interactive", set_interactive),
+        ]
+    )
@@ -0,0 +1,46 @@
+"""Serializes parsed objects to the JSON json.dumps(obj.to_dict()) produces
+
+Encoding the to_dict() payloads with the C accelerated encoder of the json
+module is as fast as this gets in Python, so whole objects are simply
+json.dumps'd. Podcast.iterencode streams a feed item by item with the
+encoder below, so the to_dict() of a whole Podcast is never built.
+"""
+import json
+from json.encoder import c_make_encoder, encode_basestring_ascii
+
+
+def object_encoder(default=None):
+    """Returns a function encoding a value the way json.dumps does
+
+    Args:
+        default (callable): Called for objects json can not serialize,
+        see json.dumps
+    """
+    if c_make_encoder is None:
+        return json.JSONEncoder(default=default).encode
+    if default is None:
+        default = json.JSONEncoder().default
+    make_chunks = c_make_encoder(
+        {}, default, encode_basestring_ascii, None, ": ", ", ", False, False, True
+    )
+
+    def encode(value):
+        return "".join(make_chunks(value, 0))
+
+    return encode
+
+
+# The encoded "items" key with an empty list, an unescaped quote can not
+# appear inside an encoded string so this only matches the key itself
+EMPTY_ITEMS = '"items": []'
+
+
+def split_items(encoded):
+    """Splits the JSON of a to_dict() with empty items around the list
+
+    Returns:
+        (head, tail), the JSON before and after the empty items list.
+        head ends with '"items": '.
+    """
+    head, tail = encoded.split(EMPTY_ITEMS, 1)
+    return head + EMPTY_ITEMS[:-2], tail
@@ -0,0 +1,86 @@
+from collections.abc import Sequence
+import time
+
+from pypodcastparser.Item import Item
+
+
+class LazyItems(Sequence):
+    """Sequence of Item objects that are only parsed when they are read
+
+    The channel pass records the tag of every item, an Item is built the
+    first time its index is read or the sequence is iterated and is cached
+    from then on. The tag is dropped once its Item exists.
+
+    Args:
+        tags (iterable): bs4.Tag or ElementTag objects representing rss items
+        retain_source (bool): Passed to each Item
+        fields (iterable): Passed to each Item
+        stats (ParseStats): Passed to each Item, its "items" phase includes
+        the time items take to parse when they are read
+        errors (list): Passed to each Item, errors of an item are added when
+        it is read
+    """
+
+    def __init__(
+        self, tags=(), retain_source=True, fields=None, stats=None, errors=None
+    ):
+        self.retain_source = retain_source
+        self.fields = fields
+        self.stats = stats
+        self.errors = errors
+        self._tags = list(tags)
+        self._items = [None] * len(self._tags)
+
+    def append_tag(self, tag):
+        """Records an item tag without parsing it"""
+        self._tags.append(tag)
+        self._items.append(None)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._item(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("item index out of range")
+        return self._item(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self._item(index)
+
+    def _item(self, index):
+        item = self._items[index]
+        if item is None:
+            stats = self.stats
+            if stats is not None:
+                start = time.perf_counter()
+            item = Item(
+                self._tags[index],
+                retain_source=self.retain_source,
+                fields=self.fields,
+                stats=stats,
+                errors=self.errors,
+                index=index,
+            )
+            if stats is not None:
+                stats.add_phase("items", time.perf_counter() - start)
+            self._items[index] = item
+            self._tags[index] = None
+        return item
+
+    @property
+    def materialized(self):
+        """The items that have been parsed so far"""
+        return [item for item in self._items if item is not None]
+
+    @property
+    def materialized_count(self):
+        """Number of items that have been parsed so far"""
+        return len(self) - self._items.count(None)
+
+    def __repr__(self):
+        return f"<LazyItems {self.materialized_count}/{len(self)} parsed>"
@@ -1,9 +1,41 @@
 # -*- coding: utf-8 -*-
-from bs4 import BeautifulSoup, Tag
+from bs4 import BeautifulSoup
 import datetime
 import email.utils
-from pypodcastparser.Item import Item
+import json
+import time
+from pypodcastparser.Diagnostics import log_published_dates
+from pypodcastparser.Dispatch import (
+    IHR,
+    ITUNES,
+    ErrorCollector,
+    TagRegistry,
+    find_child,
+    find_children,
+    sets,
+)
+from pypodcastparser.Item import Item, detach_strings
+from pypodcastparser.LazyItems import LazyItems
 from pypodcastparser.Error import InvalidPodcastFeed
+from pypodcastparser.FeedState import (
+    FeedState,
+    IncrementalResult,
+    ItemDiff,
+    content_hash,
+    cut_unchanged_items,
+)
+from pypodcastparser.Json import object_encoder, split_items
+from pypodcastparser.Prolog import find_document_start, record_recovery, skip_prolog
+from pypodcastparser.Source import decompressed, map_file
+from pypodcastparser.StreamParser import StreamParser
+
+
+def peek_guid(tag):
+    """Returns the guid of an item tag without parsing the item"""
+    for c in tag.children:
+        if getattr(c, "name", None) == "guid" and c.prefix is None:
+            return c.string
+    return None
 
 
 class Podcast:
@@ -20,7 +52,39 @@ class Podcast:
     superseded by the superior PubSubHubbub protocal
 
     Args:
-        feed_content (str): An rss string
+        feed_content (str): An rss string, or a binary file object. The
+        iterparse engine reads file objects in chunks, the soup engine
+        reads them whole.
+        engine (str): "soup" builds a full BeautifulSoup tree, "iterparse"
+        streams the channel with lxml.etree.iterparse and never holds more
+        than one channel element at a time
+        lazy (bool): Only parse an Item when it is read from items
+        max_items (int): Stop creating items once this many have been parsed
+        stop_at_guid (str): Stop creating items at the first item with this
+        guid, the item itself is not included
+        retain_source (bool): Keep feed_content, soup and each Item's soup
+        after the attributes have been populated. Defaults to True for the
+        soup engine and False for the iterparse engine. Nothing in the
+        parsed objects needs them, callers that want the tree later should
+        keep the bytes and parse them again.
+        item_filter (callable): Called with the guid and tag of each item
+        before it is parsed, items it returns False for are skipped
+        fields (iterable): Only populate these attributes, e.g. ["title",
+        "items"]. The tags of the others are skipped without being read.
+        All attributes are populated if None.
+        item_fields (iterable): Only populate these attributes of each Item,
+        e.g. ["guid", "enclosure_url"]. All of them if None.
+        stats (ParseStats): Records the time of each parse phase and the
+        calls and time of each setter of the podcast and its items
+        strict (bool): Raise InvalidPodcastFeed when a show or item level
+        element can not be parsed. When False the error is recorded in
+        errors and parsing goes on, the attributes of the element keep the
+        values they had before it. Feeds without an rss channel raise
+        either way.
+
+    Items past the max_items or stop_at_guid cutoff are skipped without
+    being parsed, but the rest of the channel is still scanned so show
+    level elements that come after the items are populated.
 
     Note:
         All attributes with empty or nonexistent element
@@ -30,11 +94,15 @@ class Podcast:
         because we want to record the literal value of elements.
 
     Attributes:
-        feed_content (bytes): The actual xml of the feed
+        feed_content (bytes): The actual xml of the feed, None when the
+        source is not retained
         soup (bs4.BeautifulSoup): A soup of the xml with items
-        and image removed
+        and image removed, None for the iterparse engine or when the
+        source is not retained
         copyright (str): The feed's copyright
-        items (item): Item objects
+        items (item): Item objects, a LazyItems sequence when lazy
+        items_truncated (bool): Item parsing stopped at max_items or
+        stop_at_guid
         description (str): The feed's description
         image_url (str): Feed image url
         itunes_author_name (str): The podcast's author name for iTunes
@@ -56,11 +124,123 @@ class Podcast:
         title (str): The feed title
         interactive (boolean): Is an iheart podcast interactive
         is_interactive (boolean): Is an iheart podcast interactive
+        errors (list): ParseError of each element that could not be parsed
+        with strict=False, in the order they were found. Errors of lazy
+        items are added when the items are read.
+        prolog_recovery (str): Why the xml document did not start at the
+        first byte, "bom", "whitespace" or "junk", None when it did
     """
 
-    def __init__(self, feed_content):
+    ENGINES = ("soup", "iterparse")
+
+    __slots__ = (
+        "feed_content",
+        "soup",
+        "lazy",
+        "retain_source",
+        "items",
+        "items_truncated",
+        "max_items",
+        "stop_at_guid",
+        "item_filter",
+        "item_fields",
+        "itunes_categories",
+        "itunes_keywords",
+        "copyright",
+        "description",
+        "image_url",
+        "itunes_author_name",
+        "itunes_block",
+        "itunes_complete",
+        "itunes_explicit",
+        "itunes_image",
+        "itunes_new_feed_url",
+        "language",
+        "last_build_date",
+        "link",
+        "published_date",
+        "published_date_string",
+        "summary",
+        "owner_name",
+        "owner_email",
+        "subtitle",
+        "title",
+        "date_time",
+        "time_published",
+        "itunes_type",
+        "interactive",
+        "is_interactive",
+        "prolog_recovery",
+        "strict",
+        "errors",
+        "_stats",
+        "_saw_items",
+    )
+
+    def __init__(
+        self,
+        feed_content,
+        engine="soup",
+        lazy=False,
+        max_items=None,
+        stop_at_guid=None,
+        retain_source=None,
+        item_filter=None,
+        fields=None,
+        item_fields=None,
+        stats=None,
+        strict=True,
+    ):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown parse engine: {engine}")
+        tag_methods = self.tag_methods
+        if fields is not None:
+            fields = frozenset(fields)
+            tag_methods = tag_methods.project(fields)
+        if item_fields is not None:
+            item_fields = frozenset(item_fields)
+            # Fail before parsing on unknown fields
+            Item.tag_methods.project(item_fields)
+        if retain_source is None:
+            retain_source = engine == "soup"
+        self._stats = stats
+        self.strict = strict
+        self.errors = []
+        call = None
+        if stats is not None:
+            stats.feeds += 1
+            start = time.perf_counter()
+            call = stats.call
+        if not strict:
+            call = ErrorCollector(self.errors, call=call).call
+        offset = None
+        if hasattr(feed_content, "read"):
+            if engine == "soup":
+                # BeautifulSoup reads file objects whole anyway
+                feed_content = feed_content.read()
+            elif retain_source:
+                raise ValueError("A streamed feed can not be retained")
+            else:
+                feed_content, self.prolog_recovery = skip_prolog(feed_content)
+                offset = 0
         self.feed_content = feed_content
-        self.items = []
+        self.lazy = lazy
+        self.retain_source = retain_source
+        self.item_fields = item_fields
+        if lazy:
+            self.items = LazyItems(
+                retain_source=retain_source,
+                fields=item_fields,
+                stats=stats,
+                errors=None if strict else self.errors,
+            )
+        else:
+            self.items = []
+        self.items_truncated = False
+        self._saw_items = False
+        self.max_items = max_items
+        self.stop_at_guid = stop_at_guid
+        self.item_filter = item_filter
         self.itunes_categories = []
         self.itunes_keywords = []
 
@@ -89,65 +269,162 @@ class Podcast:
         self.interactive = False
         self.is_interactive = False
 
-        self.set_soup()
-        tag_methods = {
-            (None, "copyright"): self.set_copyright,
-            (None, "description"): self.set_description,
-            (None, "image"): self.set_image,
-            (None, "language"): self.set_language,
-            (None, "lastBuildDate"): self.set_last_build_date,
-            (None, "link"): self.set_link,
-            (None, "pubDate"): self.set_published_date,
-            (None, "title"): self.set_title,
-            (None, "item"): self.add_item,
-            (None, "is_interactive"): self.is_interactive,
-            ("itunes", "author"): self.set_itunes_author_name,
-            ("itunes", "type"): self.set_itunes_type,
-            ("itunes", "block"): self.set_itunes_block,
-            ("itunes", "category"): self.add_itunes_category,
-            ("itunes", "complete"): self.set_itunes_complete,
-            ("itunes", "explicit"): self.set_itunes_explicit,
-            ("itunes", "image"): self.set_itunes_image,
-            ("itunes", "keywords"): self.set_itunes_keywords,
-            ("itunes", "new-feed-url"): self.set_itunes_new_feed_url,
-            ("itunes", "owner"): self.set_owner,
-            ("itunes", "subtitle"): self.set_subtitle,
-            ("itunes", "summary"): self.set_summary,
-            ("ihr", "interactive"): self.set_interactive,
-        }
-        many_tag_methods = set(
-            [(None, "item"), ("itunes", "category"), ("itunes", "keywords")]
-        )
-
-        try:
-            channel = self.soup.rss.channel
-            channel_items = channel.children
-        except AttributeError:
-            raise InvalidPodcastFeed("Invalid Podcast Feed")
-
-        # Populate attributes based on feed content
-        for c in channel_items:
-            if not isinstance(c, Tag):
-                continue
+        if offset is None:
+            offset, self.prolog_recovery = find_document_start(feed_content)
+        record_recovery(self.prolog_recovery)
+        if stats is not None:
+            start = self._add_phase("prolog", start)
+        if engine == "iterparse":
+            self.soup = None
+            stream = StreamParser(self.feed_content, keep_items=lazy, offset=offset)
+            channel_items = stream.channel_tags()
+        else:
+            self.set_soup(offset)
             try:
-                # Pop method to skip duplicated tag on invalid feeds
-                tag_tuple = (c.prefix, c.name)
-                if tag_tuple in many_tag_methods:
-                    tag_method = tag_methods[tag_tuple]
-                else:
-                    tag_method = tag_methods.pop(tag_tuple)
-            except (AttributeError, KeyError):
-                continue
+                channel = self.soup.rss.channel
+                channel_items = channel.children
+            except AttributeError:
+                raise InvalidPodcastFeed("Invalid Podcast Feed")
 
-            tag_method(c)
-
-        if not self.items:
-            for item in self.soup.find_all("item"):
+        # Populate attributes based on feed content
+        if call is None:
+            tag_methods.dispatch(self, channel_items)
+        elif stats is None:
+            tag_methods.dispatch_with(self, channel_items, call)
+        else:
+            start = self._add_phase("tree", start)
+            add_item = self.add_item.__qualname__
+            item_seconds = stats.setter_seconds[add_item]
+            tag_methods.dispatch_with(self, channel_items, call)
+            item_seconds = stats.setter_seconds[add_item] - item_seconds
+            stats.add_phase("items", item_seconds)
+            start = self._add_phase("channel", start + item_seconds)
+
+        # Only fall back when the channel had no items at all, not when
+        # its items were filtered out or cut off
+        if not self._saw_items and (fields is None or "items" in fields):
+            if engine == "iterparse":
+                stray_items = stream.stray_items
+            else:
+                # No limit, add_item applies item_filter before max_items
+                stray_items = self.soup.find_all("item")
+            for item in stray_items:
+                if self.items_truncated:
+                    break
                 self.add_item(item)
+            if stats is not None:
+                start = self._add_phase("stray_items", start)
 
-        self.set_time_published()
-        self.set_dates_published()
-
+        if strict:
+            self.set_time_published()
+            self.set_dates_published()
+        else:
+            call(self.set_time_published)
+            call(self.set_dates_published)
+        log_published_dates(self)
+        if stats is not None:
+            self._add_phase("dates", start)
+            # Not kept with the parsed podcast, lazy items hold their own
+            self._stats = None
+
+        if not retain_source:
+            self.release_source()
+
+    def _add_phase(self, phase, start):
+        """Records the time since start as phase and returns the time now"""
+        now = time.perf_counter()
+        self._stats.add_phase(phase, now - start)
+        return now
+
+    @classmethod
+    def from_fileobj(cls, fileobj, **options):
+        """Parses a feed from a binary file object
+
+        Gzip and zstd compressed content is decompressed as it is read.
+        With engine="iterparse" the parser reads the file in chunks, so the
+        memory used for the raw feed does not grow with its size.
+
+        Args:
+            fileobj: Binary file object positioned at the start of the feed
+            **options: Keyword arguments for Podcast
+
+        Returns:
+            The Podcast
+        """
+        return cls(decompressed(fileobj), **options)
+
+    @classmethod
+    def from_file(cls, path, memory_map=False, **options):
+        """Parses a feed stored in a file, see from_fileobj
+
+        Args:
+            path (str): Path of the feed file
+            memory_map (bool): Read the file through a memory map instead
+            of read calls
+            **options: Keyword arguments for Podcast
+
+        Returns:
+            The Podcast
+        """
+        with open(path, "rb") as feed_file:
+            mapped = map_file(feed_file) if memory_map else None
+            if mapped is None:
+                return cls.from_fileobj(feed_file, **options)
+            with mapped:
+                return cls.from_fileobj(mapped, **options)
+
+    @classmethod
+    def parse_incremental(cls, feed_content, state=None):
+        """Parses only the items that changed since a previous parse
+
+        Items are matched by guid and compared by a fingerprint of their
+        parsed xml. Items whose raw bytes did not change are cut out of the
+        feed before it is parsed, so steady state polls only parse the
+        channel and the new items. Feeds whose items can not be delimited
+        without parsing, e.g. because of an unterminated CDATA section, are
+        parsed in full.
+
+        Args:
+            feed_content (bytes): An rss string
+            state (FeedState): The state returned by the previous call,
+            None to treat every item as added
+
+        Returns:
+            An IncrementalResult
+        """
+        new_hash = content_hash(feed_content)
+        if state is not None and state.content_hash == new_hash:
+            return IncrementalResult(None, [], [], [], state)
+
+        cut = cut_unchanged_items(feed_content, state)
+        if cut is not None:
+            content, raw_fingerprints, unchanged = cut
+            diff = ItemDiff(state, raw_fingerprints, unchanged)
+            podcast = cls(content, engine="iterparse", item_filter=diff)
+            if diff.calls != len(raw_fingerprints):
+                # The parser did not see the items the byte scan found
+                cut = None
+        if cut is None:
+            diff = ItemDiff(state)
+            podcast = cls(feed_content, engine="iterparse", item_filter=diff)
+        podcast.item_filter = None
+
+        added = []
+        changed = []
+        newest = None if state is None else state.newest_time_published
+        for key, item in zip(diff.keys, podcast.items):
+            if key in diff.changed_keys:
+                changed.append(item)
+            else:
+                added.append(item)
+            if item.time_published is not None:
+                if newest is None or item.time_published > newest:
+                    newest = item.time_published
+
+        new_state = FeedState(new_hash, diff.fingerprints, newest, diff.raw_fingerprints)
+        return IncrementalResult(podcast, added, changed, diff.removed(), new_state)
+
+    @sets("time_published", source="published_date_string")
     def set_time_published(self):
         if self.published_date_string is None:
             self.time_published = None
@@ -160,6 +437,7 @@ class Podcast:
         except Exception:
             raise InvalidPodcastFeed("Invalid Podcast Feed, show level pubDate could not be parsed")
 
+    @sets("date_time", source="published_date_string")
     def set_dates_published(self):
         if self.time_published is None:
             self.date_time = None
@@ -173,14 +451,14 @@ class Podcast:
 
     def to_dict(self):
         """Create dict representation of Podcast object."""
+        return self._to_dict([item.to_dict() for item in self.items])
+
+    def _to_dict(self, items):
         podcast_dict = {}
         podcast_dict["copyright"] = self.copyright
         podcast_dict["description"] = self.description
         podcast_dict["image_url"] = self.image_url
-        podcast_dict["items"] = []
-        for item in self.items:
-            item_dict = item.to_dict()
-            podcast_dict["items"].append(item_dict)
+        podcast_dict["items"] = items
         podcast_dict["itunes_author_name"] = self.itunes_author_name
         podcast_dict["itunes_block"] = self.itunes_block
         podcast_dict["itunes_categories"] = self.itunes_categories
@@ -201,20 +479,101 @@ class Podcast:
         podcast_dict["itunes_type"] = self.itunes_type
         return podcast_dict
 
-    def set_soup(self):
-        """Sets soup"""
-        if self.feed_content.startswith(b"<?xml"):
-            self.soup = BeautifulSoup(self.feed_content, features="lxml-xml")
-        else:
-            c = self.feed_content
-            try:
-                recovered_content = c[c.index(b"<?xml") :]
-                self.soup = BeautifulSoup(recovered_content, features="lxml-xml")
-            except Exception:
-                self.soup = BeautifulSoup(self.feed_content, features="lxml-xml")
+    def iterencode(self, default=None):
+        """Yields the JSON of to_dict() in chunks, one chunk per item
 
+        The concatenated chunks are byte for byte
+        json.dumps(self.to_dict(), default=default).
+        """
+        encode = object_encoder(default)
+        show = encode(self._to_dict([]))
+        if not self.items:
+            yield show
+            return
+        head, tail = split_items(show)
+        yield head + "["
+        separator = ""
+        for item in self.items:
+            yield separator + encode(item.to_dict())
+            separator = ", "
+        yield "]" + tail
+
+    def to_json(self, default=None):
+        """Returns json.dumps(self.to_dict(), default=default)"""
+        return json.dumps(self.to_dict(), default=default)
+
+    def write_json(self, fp, default=None):
+        """Writes the JSON of to_dict() to a text file-like object
+        item by item"""
+        for chunk in self.iterencode(default):
+            fp.write(chunk)
+
+    def to_columns(self, columns=None):
+        """Returns the episode attributes as an EpisodeColumns
+
+        Args:
+            columns (iterable): Names of the columns to collect, see
+            EpisodeColumns.COLUMNS. All of them if None.
+        """
+        # Imported here, Columns imports pyarrow when it is installed
+        from pypodcastparser.Columns import EpisodeColumns
+
+        return EpisodeColumns(columns).append(self)
+
+    def release_source(self):
+        """Drops the raw feed and parse tree so they can be garbage collected
+
+        Items of a lazy Podcast keep their own tag until they are parsed.
+        """
+        self.feed_content = None
+        self.soup = None
+        detach_strings(self)
+        if not self.lazy:
+            for item in self.items:
+                item.soup = None
+                detach_strings(item)
+
+    def set_soup(self, offset=None):
+        """Sets soup
+
+        Args:
+            offset (int): Where the xml document starts in feed_content,
+            found with find_document_start if None
+        """
+        if offset is None:
+            offset, _ = find_document_start(self.feed_content)
+        content = self.feed_content
+        if offset:
+            # BeautifulSoup only takes the markup as a whole bytes object
+            content = content[offset:]
+        self.soup = BeautifulSoup(content, features="lxml-xml")
+
+    @sets("items")
     def add_item(self, tag):
-        item = Item(tag)
+        self._saw_items = True
+        if self.items_truncated:
+            return
+        if self.max_items is not None and len(self.items) >= self.max_items:
+            self.items_truncated = True
+            return
+        if self.stop_at_guid is not None or self.item_filter is not None:
+            guid = peek_guid(tag)
+            if self.stop_at_guid is not None and self.stop_at_guid == guid:
+                self.items_truncated = True
+                return
+            if self.item_filter is not None and not self.item_filter(guid, tag):
+                return
+        if self.lazy:
+            self.items.append_tag(tag)
+            return
+        item = Item(
+            tag,
+            retain_source=self.retain_source,
+            fields=self.item_fields,
+            stats=self._stats,
+            errors=None if self.strict else self.errors,
+            index=len(self.items),
+        )
         self.items.append(item)
 
     def set_copyright(self, tag):
@@ -235,6 +594,7 @@ class Podcast:
         except Exception:
             raise InvalidPodcastFeed("Invalid Podcast Feed, show level description could not be parsed")
 
+    @sets("image_url")
     def set_image(self, tag):
         """Parses image element and set values"""
         try:
@@ -276,6 +636,7 @@ class Podcast:
         else:
             self.itunes_block = False
 
+    @sets("itunes_categories")
     def add_itunes_category(self, tag):
         """Parses and adds itunes category"""
         category_text = tag.get("text")
@@ -285,13 +646,8 @@ class Podcast:
             self.itunes_categories.append(category_text)
 
         # get subcategories
-        for content in tag.contents:
-            if (
-                isinstance(content, Tag)
-                and content.prefix == "itunes"
-                and content.name == "category"
-            ):
-                self.add_itunes_category(content)
+        for content in find_children(tag, ITUNES, "category"):
+            self.add_itunes_category(content)
 
     def set_itunes_complete(self, tag):
         """Parses complete from itunes tags and sets value"""
@@ -375,6 +731,7 @@ class Podcast:
         except Exception:
             raise InvalidPodcastFeed("Invalid Podcast Feed, show level link could not be parsed")
 
+    @sets("published_date", "published_date_string", "time_published", "date_time")
     def set_published_date(self, tag):
         """Parses published date and set value"""
         try:
@@ -394,14 +751,15 @@ class Podcast:
         except Exception:
             raise InvalidPodcastFeed(f"Invalid Podcast Feed, show level pubDate: {tag.string}, could not be parsed")
 
+    @sets("owner_name", "owner_email")
     def set_owner(self, tag):
         """Parses owner name and email then sets value"""
         try:
-            self.owner_name = tag.find("itunes:name", recursive=False).string
+            self.owner_name = find_child(tag, ITUNES, "name").string
         except AttributeError:
             self.owner_name = None
         try:
-            self.owner_email = tag.find("itunes:email", recursive=False).string
+            self.owner_email = find_child(tag, ITUNES, "email").string
         except AttributeError:
             self.owner_email = None
         except Exception:
@@ -434,6 +792,7 @@ class Podcast:
         except Exception:
             raise InvalidPodcastFeed("Invalid Podcast Feed, show level title could not be parsed")
 
+    @sets("interactive", "is_interactive")
     def set_interactive(self, tag):
         """Parses ihr-interactive and set value"""
         try:
@@ -444,3 +803,31 @@ class Podcast:
             self.is_interactive = self.interactive
         except Exception:
             raise InvalidPodcastFeed("Invalid Podcast Feed, show level ihr:interactive could not be parsed")
+
+    tag_methods = TagRegistry(
+        [
+            (None, "copyright", set_copyright),
+            (None, "description", set_description),
+            (None, "image", set_image),
+            (None, "language", set_language),
+            (None, "lastBuildDate", set_last_build_date),
+            (None, "link", set_link),
+            (None, "pubDate", set_published_date),
+            (None, "title", set_title),
+            (None, "item", add_item, True),
+            (None, "is_interactive", set_interactive),
+            (ITUNES, "author", set_itunes_author_name),
+            (ITUNES, "type", set_itunes_type),
+            (ITUNES, "block", set_itunes_block),
+            (ITUNES, "category", add_itunes_category, True),
+            (ITUNES, "complete", set_itunes_complete),
+            (ITUNES, "explicit", set_itunes_explicit),
+            (ITUNES, "image", set_itunes_image),
+            (ITUNES, "keywords", set_itunes_keywords, True),
+            (ITUNES, "new-feed-url", set_itunes_new_feed_url),
+            (ITUNES, "owner", set_owner),
+            (ITUNES, "subtitle", set_subtitle),
+            (ITUNES, "summary", set_summary),
+            (IHR, "interactive", set_interactive),
+        ]
+    )
@@ -0,0 +1,161 @@
+"""Locates the start of the xml document in a feed with a broken prolog
+
+Some publishers serve a BOM or whitespace before the xml declaration, or
+leave HTTP header lines or other junk in front of the document. The start
+of the document is found with one scan of the raw bytes, the parsers then
+read from that offset instead of a copy of the body.
+"""
+import collections
+import threading
+
+UTF8_BOM = b"\xef\xbb\xbf"
+WHITESPACE = b" \t\r\n"
+
+RECOVERY_REASONS = ("bom", "whitespace", "junk")
+
+_recoveries = collections.Counter()
+_lock = threading.Lock()
+
+
+def find_document_start(feed_content):
+    """Returns (offset, reason) of the first byte the xml parser should read
+
+    reason is None when the feed can be parsed as is, otherwise one of
+    "bom", "whitespace" or "junk" (any other bytes, e.g. HTTP headers).
+
+    A document is found at the first "<?xml" declaration, or at the first
+    "<!DOCTYPE" or "<rss" when there is no declaration before them, so a
+    document type declaration and the entities it declares are kept.
+    """
+    if feed_content.startswith(b"<?xml"):
+        return 0, None
+
+    start = 0
+    reason = None
+    if feed_content.startswith(UTF8_BOM):
+        start = len(UTF8_BOM)
+        reason = "bom"
+    length = len(feed_content)
+    position = start
+    while position < length and feed_content[position] in WHITESPACE:
+        position += 1
+    if position > start:
+        reason = "whitespace"
+    if feed_content.startswith(b"<?xml", position):
+        return position, reason
+
+    declaration = feed_content.find(b"<?xml", position)
+    root = feed_content.find(b"<rss", position)
+    doctype = feed_content.find(b"<!DOCTYPE", position, None if root < 0 else root)
+    if doctype >= 0:
+        root = doctype
+    if declaration >= 0 and (root < 0 or declaration < root):
+        return declaration, "junk"
+    if root > position:
+        return root, "junk"
+    # No declaration, the parser copes with a BOM or whitespace before
+    # the root element on its own
+    return 0, None
+
+
+def record_recovery(reason):
+    """Counts a feed whose prolog had to be skipped"""
+    if reason is not None:
+        with _lock:
+            _recoveries[reason] += 1
+
+
+def recovery_counts():
+    """Returns how many feeds needed each kind of prolog recovery"""
+    with _lock:
+        return {reason: _recoveries[reason] for reason in RECOVERY_REASONS}
+
+
+def reset_recovery_counts():
+    with _lock:
+        _recoveries.clear()
+
+
+class BufferReader(object):
+    """Read-only file object over a buffer starting at an offset
+
+    lxml reads the source in chunks, so only one chunk at a time is copied
+    out of the buffer instead of the whole body.
+
+    Args:
+        buffer (bytes): The feed content
+        offset (int): Where reading starts
+    """
+
+    __slots__ = ("view", "position")
+
+    def __init__(self, buffer, offset=0):
+        self.view = memoryview(buffer)
+        self.position = offset
+
+    def read(self, size=-1):
+        start = self.position
+        if size is None or size < 0:
+            end = len(self.view)
+        else:
+            end = min(start + size, len(self.view))
+        self.position = end
+        return self.view[start:end].tobytes()
+
+
+class PrefixedReader(object):
+    """File object reading the rest of a buffer, then the rest of a stream
+
+    Args:
+        head (bytes): Bytes already read from fileobj
+        offset (int): Where reading starts in head
+        fileobj: File object to continue reading from once head is used up
+    """
+
+    __slots__ = ("head", "fileobj")
+
+    def __init__(self, head, offset, fileobj):
+        self.head = BufferReader(head, offset)
+        self.fileobj = fileobj
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            rest = self.fileobj.read()
+            if self.head is None:
+                return rest
+            chunk = self.head.read()
+            self.head = None
+            return chunk + rest
+        if self.head is not None:
+            chunk = self.head.read(size)
+            if chunk or size == 0:
+                return chunk
+            self.head = None
+        return self.fileobj.read(size)
+
+
+PROLOG_SCAN_SIZE = 64 * 1024
+
+
+def skip_prolog(fileobj):
+    """Positions a stream at the start of its xml document
+
+    Only the first PROLOG_SCAN_SIZE bytes are searched, the rest of the
+    stream is not read.
+
+    Returns:
+        (reader, reason), reader reads the document from its first byte and
+        reason is as returned by find_document_start
+    """
+    chunks = []
+    remaining = PROLOG_SCAN_SIZE
+    while remaining > 0:
+        # Streams such as decompressors may return short reads
+        chunk = fileobj.read(remaining)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    head = b"".join(chunks)
+    offset, reason = find_document_start(head)
+    return PrefixedReader(head, offset, fileobj), reason
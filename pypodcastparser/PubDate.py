@@ -0,0 +1,170 @@
+import datetime
+import re
+
+from pypodcastparser.Timezone import (  # noqa: F401
+    common_timezones,
+    offset_map,
+    pytz_timezone_list,
+    resolve_timezone,
+)
+
+
+EASTERN_TIMEZONES = ("ET", "EST", "EDT")
+
+MONTHS = {
+    "Jan": 1,
+    "Feb": 2,
+    "Mar": 3,
+    "Apr": 4,
+    "May": 5,
+    "Jun": 6,
+    "Jul": 7,
+    "Aug": 8,
+    "Sep": 9,
+    "Oct": 10,
+    "Nov": 11,
+    "Dec": 12,
+}
+
+# Well formed RFC 822 dates: "Mon, 30 May 2022 04:05:03 GMT"
+FAST_DATE_RE = re.compile(
+    r"(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun), (\d\d?) (Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)"
+    r" (\d{4}) (\d\d):(\d\d)(?::(\d\d))? ([A-Z]{3}|[+-]\d{4})"
+)
+
+TIMEZONE_ABBREVIATION_RE = re.compile("^[a-zA-Z]{3}$")
+
+DATE_PART_RES = [
+    re.compile(r"^[a-zA-Z]{3},$"),
+    re.compile(r"^\d{1,2}$"),
+    re.compile(r"^[a-zA-Z]{3}$"),
+    re.compile(r"^\d{4}$"),
+    re.compile(r"^\d\d:\d\d"),
+]
+DATE_PART_PATTERNS = [regex.pattern for regex in DATE_PART_RES]
+
+# How parse_published_date_outcome got its result
+FAST = "fast"
+TOLERANT = "tolerant"
+DEFAULT_TIMEZONE = "default_timezone"
+# Items whose pubDate is empty or could not be parsed get the current time
+MISSING = "missing"
+NOW = "now"
+
+
+def parse_published_date(date_string):
+    """Parses an item pubDate and converts it to US/Eastern
+
+    Well formed dates are handled by a single precompiled regex, anything
+    else goes through the tolerant parser.
+
+    Returns:
+        A naive datetime when the date is already in Eastern time, otherwise
+        a "%Y-%m-%d %H:%M:%S" string in Eastern time.
+
+    Raises:
+        Exception: The date could not be parsed
+    """
+    return parse_published_date_outcome(date_string)[0]
+
+
+def parse_published_date_outcome(date_string):
+    """parse_published_date that also tells how the date was parsed
+
+    Returns:
+        (published date, outcome), outcome is FAST for well formed dates,
+        TOLERANT for dates recovered by the tolerant parser and
+        DEFAULT_TIMEZONE when it also had to assume Eastern time
+
+    Raises:
+        Exception: The date could not be parsed
+    """
+    match = FAST_DATE_RE.fullmatch(date_string)
+    if match is not None:
+        day, month, year, hour, minute, second, zone = match.groups()
+        if zone[0] in "+-":
+            zone = offset_map.get(zone)
+        if zone is not None:
+            try:
+                date = datetime.datetime(
+                    int(year),
+                    MONTHS[month],
+                    int(day),
+                    int(hour),
+                    int(minute),
+                    int(second) if second else 0,
+                )
+            except ValueError:
+                pass
+            else:
+                return to_eastern(date, zone), FAST
+    return _parse_tolerant(date_string)
+
+
+def parse_published_date_tolerant(date_string):
+    """Parses an item pubDate that is not a well formed RFC 822 date
+
+    Recovers the date parts from malformed or reordered dates and falls
+    back to Eastern time when no timezone can be found.
+    """
+    return _parse_tolerant(date_string)[0]
+
+
+def _parse_tolerant(date_string):
+    deconstructed_date = date_string.split(" ")
+    if len(deconstructed_date) < 4:
+        raise AttributeError
+
+    published_date_timezone = ""
+    # Check for timezone abbreviation
+    if TIMEZONE_ABBREVIATION_RE.match(deconstructed_date[-1]):
+        published_date_timezone = deconstructed_date[-1]
+        deconstructed_date.pop()
+    else:
+        # Check for specific timezone offsets
+        for offset, tz in offset_map.items():
+            if offset in date_string:
+                published_date_timezone = tz
+                deconstructed_date.pop()
+                break
+    outcome = TOLERANT
+    if not published_date_timezone:
+        published_date_timezone = "EST"
+        outcome = DEFAULT_TIMEZONE
+
+    new_array = []
+    for array_index, array_value in enumerate(DATE_PART_PATTERNS):
+        if re.match(deconstructed_date[array_index], array_value):
+            new_array.append(array_value)
+        else:
+            for inner_value in deconstructed_date:
+                if DATE_PART_RES[array_index].match(inner_value):
+                    new_array.append(inner_value)
+                    break
+    date_string = " ".join(new_array[:5])
+    if len(new_array) < 5:
+        raise AttributeError(
+            "Error creating new date array. Array is not of length 5 for formatting"
+        )
+
+    time = date_string.split(":")
+    if len(time) == 2:
+        minutes = time[1].split(" ")
+        minutes[0] += ":00"
+        time[0] += ":" + minutes[0]
+    elif len(time) == 3:
+        time[0] += ":" + time[1]
+        seconds = time[2]
+        time[0] += ":" + seconds[:2]
+    else:
+        raise ValueError(f"Unexpected time in published date: {date_string}")
+    published_date = datetime.datetime.strptime(time[0], "%a, %d %b %Y %H:%M:%S")
+
+    return to_eastern(published_date, published_date_timezone), outcome
+
+
+def to_eastern(published_date, published_date_timezone):
+    """Converts a naive datetime in the given timezone to US/Eastern"""
+    if published_date_timezone in EASTERN_TIMEZONES:
+        return published_date
+    return str(resolve_timezone(published_date_timezone).to_eastern(published_date))
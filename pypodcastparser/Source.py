@@ -0,0 +1,53 @@
+"""Opening stored feeds as streams the parser reads in chunks
+
+Gzip and zstd compressed feeds are recognized by their magic number and
+decompressed as they are read.
+"""
+import gzip
+import mmap
+
+try:
+    from compression import zstd
+except ImportError:
+    zstd = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from pypodcastparser.Prolog import PrefixedReader
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def decompressed(fileobj):
+    """Returns a file object reading the decompressed content of fileobj
+
+    Uncompressed content is read as is.
+
+    Raises:
+        ValueError: The content is zstd compressed but neither
+        compression.zstd nor the zstandard package is available
+    """
+    magic = fileobj.read(len(ZSTD_MAGIC))
+    stream = PrefixedReader(magic, 0, fileobj)
+    if magic.startswith(GZIP_MAGIC):
+        return gzip.GzipFile(fileobj=stream, mode="rb")
+    if magic == ZSTD_MAGIC:
+        if zstd is not None:
+            return zstd.ZstdFile(stream, mode="rb")
+        if zstandard is not None:
+            return zstandard.ZstdDecompressor().stream_reader(stream)
+        raise ValueError("Reading zstd compressed feeds needs the zstandard package")
+    return stream
+
+
+def map_file(file):
+    """Returns a read only memory map of an open file, None if it is empty"""
+    try:
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        # Empty files can not be mapped
+        return None
@@ -0,0 +1,89 @@
+"""Opt in timing of where a parse spends its time
+
+    from pypodcastparser.Stats import ParseStats
+
+    stats = ParseStats()
+    for feed_content in feeds:
+        Podcast(feed_content, engine="iterparse", stats=stats)
+    print(stats.to_dict())
+
+Podcasts and Items parsed without a stats object skip all of this, the
+only cost is one None check per Podcast and per Item.
+"""
+import collections
+import time
+
+
+class ParseStats(object):
+    """Wall time per parse phase and calls and time per tag setter
+
+    One object can be passed to any number of parses, objects collected
+    separately, e.g. in worker processes, are combined with merge.
+
+    Phases are "prolog" (finding the start of the xml document), "tree"
+    (building the BeautifulSoup tree, the iterparse engine builds elements
+    during the channel pass instead), "channel" (the channel pass without
+    item parsing), "items" (parsing the items found in the channel),
+    "stray_items" (looking for and parsing items outside the channel) and
+    "dates" (deriving time_published and date_time of the show).
+
+    Setters are keyed by their qualified name, e.g. "Item.set_title". Their
+    time includes the setters they cause to run, Podcast.add_item includes
+    the setters of the item it parses.
+
+    Attributes:
+        feeds (int): Podcasts parsed
+        items (int): Items parsed
+        phase_seconds (collections.Counter): Phase -> seconds
+        setter_calls (collections.Counter): Setter -> number of calls
+        setter_seconds (collections.Counter): Setter -> seconds
+    """
+
+    PHASES = ("prolog", "tree", "channel", "items", "stray_items", "dates")
+
+    def __init__(self):
+        self.feeds = 0
+        self.items = 0
+        self.phase_seconds = collections.Counter()
+        self.setter_calls = collections.Counter()
+        self.setter_seconds = collections.Counter()
+
+    def add_phase(self, phase, seconds):
+        self.phase_seconds[phase] += seconds
+
+    def call(self, method, *args):
+        """Calls method(*args) and records it as a setter call"""
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            name = method.__qualname__
+            self.setter_calls[name] += 1
+            self.setter_seconds[name] += time.perf_counter() - start
+
+    def merge(self, other):
+        """Adds the counts and times of another ParseStats, returns self"""
+        self.feeds += other.feeds
+        self.items += other.items
+        self.phase_seconds.update(other.phase_seconds)
+        self.setter_calls.update(other.setter_calls)
+        self.setter_seconds.update(other.setter_seconds)
+        return self
+
+    def __add__(self, other):
+        return ParseStats().merge(self).merge(other)
+
+    def to_dict(self):
+        """Returns the stats as a dict, setters slowest first"""
+        return {
+            "feeds": self.feeds,
+            "items": self.items,
+            "phases": {phase: self.phase_seconds[phase] for phase in self.PHASES},
+            "setters": {
+                name: {"calls": self.setter_calls[name], "seconds": seconds}
+                for name, seconds in self.setter_seconds.most_common()
+            },
+        }
+
+    def __repr__(self):
+        return f"<ParseStats {self.feeds} feeds, {self.items} items>"
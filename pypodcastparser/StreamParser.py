@@ -0,0 +1,186 @@
+from io import BytesIO
+
+from lxml import etree
+
+from pypodcastparser.Error import InvalidPodcastFeed
+from pypodcastparser.Prolog import BufferReader, find_document_start
+
+
+def local_name(element):
+    """Returns the tag name of an lxml element without namespace or prefix.
+
+    Undeclared prefixes (e.g. atom:link without an xmlns:atom) are dropped
+    the same way the lxml-xml BeautifulSoup builder drops them.
+    """
+    tag = element.tag
+    if not isinstance(tag, str):
+        return None
+    if tag[0] == "{":
+        return tag[tag.index("}") + 1 :]
+    return tag.rpartition(":")[2]
+
+
+class ElementTag(object):
+    """Wraps an lxml element with the subset of the bs4.Tag interface used
+    by the Podcast and Item setters.
+
+    Args:
+        element (lxml.etree._Element): The element to wrap
+
+    Attributes:
+        element (lxml.etree._Element): The wrapped element
+        name (str): Tag name without prefix
+        prefix (str): Namespace prefix of the tag
+        namespace (str): Namespace URI of the tag
+    """
+
+    __slots__ = ("element", "name", "prefix", "namespace")
+
+    def __init__(self, element):
+        self.element = element
+        tag = element.tag
+        if tag[0] == "{":
+            self.namespace, self.name = tag[1:].split("}", 1)
+            self.prefix = element.prefix
+        else:
+            self.namespace = None
+            self.name = tag.rpartition(":")[2]
+            self.prefix = None
+
+    @property
+    def string(self):
+        """Mirrors bs4.Tag.string: the only text child, following
+        single-child chains, otherwise None"""
+        element = self.element
+        while True:
+            text = element.text
+            if len(element) == 0:
+                return text
+            if text or len(element) > 1:
+                return None
+            child = element[0]
+            if child.tail:
+                return None
+            if not isinstance(child.tag, str):
+                # Comment or processing instruction
+                return child.text
+            element = child
+
+    @property
+    def children(self):
+        for child in self.element:
+            if isinstance(child.tag, str):
+                yield ElementTag(child)
+
+    @property
+    def contents(self):
+        return list(self.children)
+
+    def get(self, key, default=None):
+        return self.element.get(key, default)
+
+    def __getitem__(self, key):
+        return self.element.attrib[key]
+
+    def _matches(self, name):
+        if self.name == name:
+            return True
+        return self.prefix is not None and f"{self.prefix}:{self.name}" == name
+
+    def find_all(self, name, recursive=False):
+        """Finds children named name or prefix:name"""
+        if recursive:
+            candidates = self.element.iterdescendants()
+        else:
+            candidates = iter(self.element)
+        found = []
+        for element in candidates:
+            if not isinstance(element.tag, str):
+                continue
+            tag = ElementTag(element)
+            if tag._matches(name):
+                found.append(tag)
+        return found
+
+    def find(self, name, recursive=False):
+        """Finds the first child named name or prefix:name"""
+        found = self.find_all(name, recursive=recursive)
+        return found[0] if found else None
+
+
+class StreamParser(object):
+    """Streams the channel of an rss feed with lxml.etree.iterparse
+
+    Only end events are used, each direct child of <channel> is handed out
+    once its subtree is complete and is cleared as soon as the consumer
+    asks for the next one, so the full document tree is never built.
+
+    Args:
+        feed_content (bytes): An rss string, or a file object positioned at
+        the start of the xml document
+        keep_items (bool): Leave <item> subtrees intact after they have been
+        handed out so they can be parsed later
+        offset (int): Where the xml document starts in feed_content, found
+        with find_document_start if None
+
+    Attributes:
+        stray_items (list): ElementTag objects for <item> elements that are
+        not direct children of <channel>
+    """
+
+    def __init__(self, feed_content, keep_items=False, offset=None):
+        self.feed_content = feed_content
+        self.keep_items = keep_items
+        if offset is None:
+            if hasattr(feed_content, "read"):
+                offset = 0
+            else:
+                offset, _ = find_document_start(feed_content)
+        self.offset = offset
+        self.stray_items = []
+
+    def _source(self):
+        if hasattr(self.feed_content, "read"):
+            return self.feed_content
+        if self.offset == 0 and isinstance(self.feed_content, bytes):
+            # BytesIO shares the buffer of a bytes object
+            return BytesIO(self.feed_content)
+        return BufferReader(self.feed_content, self.offset)
+
+    def channel_tags(self):
+        """Yields an ElementTag for each direct child of <rss><channel>"""
+        channel = None
+        events = etree.iterparse(self._source(), events=("end",), recover=True)
+        try:
+            for _, element in events:
+                parent = element.getparent()
+                if channel is None:
+                    channel = self._find_channel(element, parent)
+                if parent is not None and parent is channel:
+                    if isinstance(element.tag, str):
+                        yield ElementTag(element)
+                    if not (self.keep_items and local_name(element) == "item"):
+                        element.clear()
+                    while element.getprevious() is not None:
+                        del channel[0]
+                elif local_name(element) == "item":
+                    self.stray_items.append(ElementTag(element))
+        except etree.XMLSyntaxError:
+            pass
+
+        if channel is None:
+            raise InvalidPodcastFeed("Invalid Podcast Feed")
+
+    @staticmethod
+    def _find_channel(element, parent):
+        """Returns the <channel> element once the first one has been seen"""
+        if local_name(element) == "channel":
+            candidate = element
+        elif parent is not None and local_name(parent) == "channel":
+            candidate = parent
+        else:
+            return None
+        for ancestor in candidate.iterancestors():
+            if local_name(ancestor) == "rss":
+                return candidate
+        return None
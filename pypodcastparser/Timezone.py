@@ -0,0 +1,204 @@
+from bisect import bisect_right
+import datetime
+import functools
+
+import pytz
+
+
+# Set backed so membership checks do not scan ~600 names
+pytz_timezone_list = frozenset(pytz.all_timezones)
+
+common_timezones = {
+    "IDLW": "Pacific/Midway",
+    "NUT": "Pacific/Niue",
+    "MART": "Pacific/Marquesas",
+    "AKST": "America/Anchorage",
+    "MST": "America/Denver",
+    "EST": "America/New_York",
+    "VET": "America/Caracas",
+    "BRT": "America/Sao_Paulo",
+    "GST": "Asia/Dubai",
+    "AZOT": "Atlantic/Azores",
+    "MSK": "Europe/Moscow",
+    "PKT": "Asia/Karachi",
+    "NPT": "Asia/Kathmandu",
+    "MMT": "Asia/Rangoon",
+    "ICT": "Asia/Bangkok",
+    "AWST": "Australia/Perth",
+    "ACWST": "Australia/Eucla",
+    "GMT": "GMT",
+    "ACST": "Australia/Adelaide",
+    "AEDT": "Australia/Sydney",
+    "CHAST": "Pacific/Chatham",
+    "NZDT": "Pacific/Auckland",
+    "LINT": "Pacific/Kiritimati",
+    "UTC": "UTC",
+    "CET": "Europe/Berlin",
+    "EET": "Africa/Cairo",
+    "EAT": "Africa/Addis_Ababa",
+    "IST": "Asia/Kolkata",
+    "BST": "Europe/London",
+    "JST": "Asia/Tokyo",
+    "ACT": "Australia/ACT",
+    "SST": "Pacific/Pago_Pago",
+    "NST": "America/St_Johns",
+    "HST": "America/Adak",
+    "AST": "America/Puerto_Rico",
+    "PST": "US/Pacific",
+    "CST": "US/Central",
+    "CAT": "Africa/Maputo",
+    "AEST": "Australia/Sydney",
+    "PDT": "America/Los_Angeles",
+    "NZST": "Pacific/Auckland",
+}
+
+# Map of timezone offsets to timezone abbreviations
+offset_map = {
+    "-1200": "IDLW",
+    "-1100": "NUT",
+    "-1000": "HST",
+    "-0930": "MART",
+    "-0900": "AKST",
+    "-0800": "PST",
+    "-0700": "MST",
+    "-0600": "CST",
+    "-0500": "EST",
+    "-0430": "VET",
+    "-0400": "AST",
+    "-0330": "NST",
+    "-0300": "BRT",
+    "-0200": "GST",
+    "-0100": "AZOT",
+    "-0000": "GMT",
+    "+0000": "GMT",
+    "+0100": "CET",
+    "+0200": "EET",
+    "+0300": "MSK",
+    "+0400": "GST",
+    "+0500": "PKT",
+    "+0545": "NPT",
+    "+0600": "BST",
+    "+0630": "MMT",
+    "+0700": "ICT",
+    "+0800": "AWST",
+    "+0845": "ACWST",
+    "+0900": "JST",
+    "+0930": "ACST",
+    "+1000": "AEST",
+    "+1030": "ACST",
+    "+1100": "AEDT",
+    "+1200": "NZST",
+    "+1245": "CHAST",
+    "+1300": "NZDT",
+    "+1400": "LINT",
+}
+
+
+EASTERN = pytz.timezone("US/Eastern")
+EASTERN_UTC_TRANSITIONS = EASTERN._utc_transition_times
+EASTERN_UTC_OFFSETS = [info[0] for info in EASTERN._transition_info]
+
+ONE_DAY = datetime.timedelta(days=1)
+
+
+class Zone(object):
+    """A pytz timezone with its transitions precomputed in local time
+
+    Local times that fall in exactly one UTC offset interval are converted
+    with two bisects, ambiguous and non-existent local times and dates at
+    the edges of the datetime range go through pytz localize() so the
+    result always matches pytz.
+
+    Args:
+        tzinfo (pytz.tzinfo.BaseTzInfo): The timezone
+
+    Attributes:
+        tzinfo (pytz.tzinfo.BaseTzInfo): The timezone
+    """
+
+    __slots__ = (
+        "tzinfo",
+        "utc_offset",
+        "utc_transitions",
+        "transition_info",
+        "local_starts",
+        "local_ends",
+        "utc_offsets",
+    )
+
+    def __init__(self, tzinfo):
+        self.tzinfo = tzinfo
+        self.utc_offset = None
+        self.local_starts = None
+        utc_transitions = getattr(tzinfo, "_utc_transition_times", None)
+        if utc_transitions is None:
+            self.utc_offset = tzinfo.utcoffset(datetime.datetime(2000, 1, 1))
+            return
+
+        transition_info = tzinfo._transition_info
+        utc_offsets = [info[0] for info in transition_info]
+        local_starts = [datetime.datetime.min]
+        local_ends = []
+        for i in range(1, len(utc_transitions)):
+            local_starts.append(utc_transitions[i] + utc_offsets[i])
+            local_ends.append(utc_transitions[i] + utc_offsets[i - 1])
+        local_ends.append(datetime.datetime.max)
+
+        # Only adjacent intervals may overlap, otherwise leave it to pytz
+        for i in range(1, len(local_starts)):
+            if local_starts[i] < local_starts[i - 1] or local_ends[i] < local_ends[i - 1]:
+                return
+            if i > 1 and local_ends[i - 2] > local_starts[i]:
+                return
+
+        self.utc_transitions = utc_transitions
+        self.transition_info = transition_info
+        self.utc_offsets = utc_offsets
+        self.local_starts = local_starts
+        self.local_ends = local_ends
+
+    def to_utc(self, local):
+        """Returns the naive UTC time for a naive local time, or None when
+        pytz has to decide"""
+        if local.year <= 1 or local.year >= 9999:
+            return None
+        if self.utc_offset is not None:
+            return local - self.utc_offset
+        if self.local_starts is None:
+            return None
+
+        i = bisect_right(self.local_starts, local) - 1
+        if local >= self.local_ends[i] or (i > 0 and local < self.local_ends[i - 1]):
+            # Non-existent or ambiguous local time
+            return None
+        # localize() only considers the transitions one day either side
+        info = self.transition_info[i]
+        before = max(0, bisect_right(self.utc_transitions, local - ONE_DAY) - 1)
+        after = max(0, bisect_right(self.utc_transitions, local + ONE_DAY) - 1)
+        if info != self.transition_info[before] and info != self.transition_info[after]:
+            return None
+        return local - self.utc_offsets[i]
+
+    def to_eastern(self, local):
+        """Converts a naive local time to a naive US/Eastern time, the same
+        as localize(local).astimezone(US/Eastern)"""
+        utc = self.to_utc(local)
+        if utc is None:
+            localized = self.tzinfo.localize(local)
+            return localized.astimezone(EASTERN).replace(tzinfo=None)
+        i = max(0, bisect_right(EASTERN_UTC_TRANSITIONS, utc) - 1)
+        return utc + EASTERN_UTC_OFFSETS[i]
+
+
+@functools.lru_cache(maxsize=512)
+def resolve_timezone(name):
+    """Returns the Zone for an IANA name, an abbreviation from
+    common_timezones or an offset from offset_map
+
+    Raises:
+        pytz.UnknownTimeZoneError: The name can not be resolved
+    """
+    name = offset_map.get(name, name)
+    if name in pytz_timezone_list:
+        return Zone(pytz.timezone(name))
+    return Zone(pytz.timezone(common_timezones.get(name)))
@@ -0,0 +1,163 @@
+"""Fetching and parsing feeds from asyncio without blocking the event loop
+
+    from concurrent.futures import ProcessPoolExecutor
+    from pypodcastparser.crawl import crawl
+
+    async for result in crawl(urls, concurrency=200, executor=ProcessPoolExecutor()):
+        ...  # a FetchResult, result.podcast is None on 304 or error
+
+Requests are sent by a FeedClient from a pool of at most download_threads
+threads and feeds are parsed in the given executor, the event loop only
+schedules them. At most concurrency feeds are being fetched or parsed at a
+time and no new url is read until the consumer takes a result, so memory
+stays bounded however many urls there are.
+"""
+import asyncio
+import concurrent.futures
+
+from pypodcastparser.Podcast import Podcast
+from pypodcastparser.fetch import FeedClient, FetchResult, error_result
+
+
+# Default size of the thread pool crawl sends requests from
+DOWNLOAD_THREADS = 32
+
+
+def parse_podcast(feed_content, options):
+    """Parses a feed in an executor
+
+    The source is not retained unless asked for, so the Podcast is small to
+    send back from a worker process.
+    """
+    options = dict(options)
+    options.setdefault("retain_source", False)
+    return Podcast(feed_content, **options)
+
+
+async def parse_feed_async(url_or_bytes, executor=None, client=None, **options):
+    """Fetches and parses a feed without blocking the event loop
+
+    Args:
+        url_or_bytes (str or bytes): Feed url, or the rss string itself
+        executor (concurrent.futures.Executor): Where to parse, the event
+        loop's default thread pool if None. A ProcessPoolExecutor keeps
+        parsing from competing with the loop for the GIL.
+        client (FeedClient): Client to fetch urls with, its validators are
+        used and updated. A new client is used for this call if None.
+        **options: Keyword arguments for Podcast
+
+    Returns:
+        The Podcast, None when the server answered 304
+
+    Raises:
+        requests.RequestException: The request failed
+        InvalidPodcastFeed: The feed could not be parsed
+    """
+    loop = asyncio.get_running_loop()
+    if not isinstance(url_or_bytes, str):
+        return await loop.run_in_executor(executor, parse_podcast, url_or_bytes, options)
+
+    url = url_or_bytes
+    own_client = client is None
+    if own_client:
+        client = FeedClient()
+    try:
+        status, content, validator = await loop.run_in_executor(None, client.download, url)
+        podcast = None
+        if content is not None:
+            podcast = await loop.run_in_executor(executor, parse_podcast, content, options)
+        client.remember(url, validator)
+        return podcast
+    finally:
+        if own_client:
+            client.close()
+
+
+async def _iterate(urls):
+    if hasattr(urls, "__aiter__"):
+        async for url in urls:
+            yield url
+    else:
+        for url in urls:
+            yield url
+
+
+async def crawl(
+    urls,
+    concurrency=64,
+    executor=None,
+    client=None,
+    download_threads=DOWNLOAD_THREADS,
+    **options,
+):
+    """Fetches and parses many feeds, yielding each as soon as it is done
+
+    Args:
+        urls (iterable or async iterable): Feed urls
+        concurrency (int): Feeds being fetched or parsed at a time
+        executor (concurrent.futures.Executor): Where to parse, see
+        parse_feed_async
+        client (FeedClient): Client to fetch with, its per host limit
+        applies. A new client is used for this crawl if None.
+        download_threads (int): Threads sending requests, at most
+        concurrency of them are started. Requests waiting for their host's
+        limit hold a thread, so more threads than hosts times max_per_host
+        only help when urls of few hosts are crawled.
+        **options: Keyword arguments for Podcast
+
+    Yields:
+        A FetchResult per url in the order they complete. Failures are
+        returned in its error field instead of being raised.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if download_threads < 1:
+        raise ValueError("download_threads must be at least 1")
+    loop = asyncio.get_running_loop()
+    own_client = client is None
+    if own_client:
+        client = FeedClient()
+    downloads = concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(concurrency, download_threads)
+    )
+
+    async def crawl_one(url):
+        try:
+            status, content, validator = await loop.run_in_executor(
+                downloads, client.download, url
+            )
+            podcast = None
+            if content is not None:
+                podcast = await loop.run_in_executor(
+                    executor, parse_podcast, content, options
+                )
+            client.remember(url, validator)
+            return FetchResult(url, status, podcast, validator, None)
+        except Exception as e:
+            return error_result(url, e, client.validators.get(url))
+
+    pending = set()
+    remaining = _iterate(urls)
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    url = await remaining.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                else:
+                    pending.add(asyncio.ensure_future(crawl_one(url)))
+            if not pending:
+                return
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        downloads.shutdown(wait=False)
+        if own_client:
+            client.close()
@@ -0,0 +1,202 @@
+"""Conditional fetching of feeds over pooled keep-alive connections
+
+    from pypodcastparser.fetch import FeedClient
+
+    client = FeedClient(max_per_host=4)
+    result = client.fetch("https://example.com/feed.rss")
+    if result.podcast is not None:
+        ...  # 200, result.podcast is the parsed feed
+
+The validator (ETag and Last-Modified) of each url is remembered by the
+client and sent back as If-None-Match / If-Modified-Since, a 304 response
+is not parsed at all.
+"""
+import collections
+import concurrent.futures
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from pypodcastparser.Podcast import Podcast
+
+
+Validator = collections.namedtuple("Validator", ["etag", "last_modified"])
+Validator.__doc__ = """ETag and Last-Modified response headers of a feed"""
+
+FetchResult = collections.namedtuple(
+    "FetchResult", ["url", "status", "podcast", "validator", "error"]
+)
+FetchResult.__doc__ = """Result of fetching one feed
+
+Attributes:
+    url (str): The requested url
+    status (int): HTTP status, None when the request failed
+    podcast (Podcast): The parsed feed, None on 304 or error
+    validator (Validator): Validator to send with the next request
+    error (Exception): What went wrong in fetch_many or crawl, None otherwise
+"""
+
+
+def response_validator(response, previous=None):
+    """Returns the Validator of a response, keeping the previous values the
+    response does not repeat"""
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if previous is not None:
+        etag = etag or previous.etag
+        last_modified = last_modified or previous.last_modified
+    if etag is None and last_modified is None:
+        return None
+    return Validator(etag, last_modified)
+
+
+def error_result(url, error, validator=None):
+    """Returns the FetchResult reporting a failed fetch"""
+    status = None
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+    return FetchResult(url, status, None, validator, error)
+
+
+class FeedClient(object):
+    """Fetches and parses feeds, skipping the parse when they did not change
+
+    Args:
+        max_per_host (int): Requests in flight to one host at a time
+        timeout (float): Seconds to wait for a response
+        session (requests.Session): Session to send the requests with, one
+        with a connection pool sized for max_per_host is created if None
+        parser (callable): Called with the body of a 200 response, e.g.
+        ParseCache(...).parse. Defaults to Podcast.
+        **options: Keyword arguments passed to parser
+
+    Attributes:
+        validators (dict): url -> Validator of its last response
+    """
+
+    def __init__(
+        self, max_per_host=4, timeout=30, session=None, parser=Podcast, **options
+    ):
+        if max_per_host < 1:
+            raise ValueError("max_per_host must be at least 1")
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=max_per_host)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+        self.parser = parser
+        self.options = options
+        self.validators = {}
+        self._host_limits = {}
+        self._lock = threading.Lock()
+
+    def host_limit(self, url):
+        """Returns the semaphore bounding the requests to the host of url"""
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            limit = self._host_limits.get(host)
+            if limit is None:
+                limit = threading.BoundedSemaphore(self.max_per_host)
+                self._host_limits[host] = limit
+            return limit
+
+    def download(self, url, validator=None):
+        """Sends a conditional request for a feed without parsing it
+
+        Args:
+            url (str): Feed url
+            validator (Validator): Validator of the previous response,
+            defaults to the one the client remembered for url
+
+        Returns:
+            (status, content, validator), content is None for 304. The
+            validator is not remembered, see remember.
+
+        Raises:
+            requests.RequestException: The request failed or the response
+            status is not 200 or 304
+        """
+        if validator is None:
+            validator = self.validators.get(url)
+        headers = {}
+        if validator is not None:
+            if validator.etag:
+                headers["If-None-Match"] = validator.etag
+            if validator.last_modified:
+                headers["If-Modified-Since"] = validator.last_modified
+
+        with self.host_limit(url):
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            content = response.content
+
+        if response.status_code == 304:
+            return 304, None, response_validator(response, validator)
+        response.raise_for_status()
+        return response.status_code, content, response_validator(response)
+
+    def remember(self, url, validator):
+        """Stores the validator to send with the next request for url"""
+        if validator is None:
+            self.validators.pop(url, None)
+        else:
+            self.validators[url] = validator
+
+    def fetch(self, url, validator=None):
+        """Fetches and parses one feed
+
+        Args:
+            url (str): Feed url
+            validator (Validator): Validator of the previous response,
+            defaults to the one the client remembered for url
+
+        Returns:
+            A FetchResult, its podcast is None when the server answered 304
+
+        Raises:
+            requests.RequestException: The request failed or the response
+            status is not 200 or 304
+            InvalidPodcastFeed: The feed could not be parsed
+        """
+        status, content, new_validator = self.download(url, validator)
+        podcast = None
+        if content is not None:
+            podcast = self.parser(content, **self.options)
+        self.remember(url, new_validator)
+        return FetchResult(url, status, podcast, new_validator, None)
+
+    def fetch_many(self, urls, workers=16):
+        """Fetches feeds from a pool of threads
+
+        Failures are returned in the error field of their FetchResult
+        instead of being raised.
+
+        Args:
+            urls (iterable): Feed urls
+            workers (int): Number of threads, the per host limit still applies
+
+        Yields:
+            A FetchResult per url, in the order of urls
+        """
+
+        def fetch(url):
+            try:
+                return self.fetch(url)
+            except Exception as e:
+                return error_result(url, e, self.validators.get(url))
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(fetch, urls)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
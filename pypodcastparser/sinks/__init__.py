@@ -0,0 +1 @@
+"""Stores that parsed Podcast objects are written to in bulk"""
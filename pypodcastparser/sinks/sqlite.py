@@ -0,0 +1,307 @@
+"""Bulk loading of parsed feeds into SQLite
+
+    from pypodcastparser.sinks.sqlite import SqliteSink
+
+    with SqliteSink("podcasts.db") as sink:
+        sink.write(Podcast(feed_content, engine="iterparse"), key=feed_url)
+
+Each feed is written in one transaction with executemany. Episodes are
+upserted by (show, guid) and every episode row stores a fingerprint of its
+values, episodes whose fingerprint did not change are not written again.
+Episodes that disappear from a feed are kept.
+"""
+import collections
+import operator
+import sqlite3
+
+from pypodcastparser.FeedState import fingerprint, item_key
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shows (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    title TEXT,
+    subtitle TEXT,
+    description TEXT,
+    summary TEXT,
+    link TEXT,
+    language TEXT,
+    copyright TEXT,
+    image_url TEXT,
+    itunes_author_name TEXT,
+    itunes_block INTEGER,
+    itunes_complete TEXT,
+    itunes_explicit TEXT,
+    itunes_image TEXT,
+    itunes_new_feed_url TEXT,
+    itunes_type TEXT,
+    owner_name TEXT,
+    owner_email TEXT,
+    last_build_date TEXT,
+    published_date TEXT,
+    time_published INTEGER,
+    interactive INTEGER
+);
+CREATE TABLE IF NOT EXISTS categories (
+    show_id INTEGER NOT NULL REFERENCES shows (id),
+    category TEXT NOT NULL,
+    PRIMARY KEY (show_id, category)
+);
+CREATE TABLE IF NOT EXISTS keywords (
+    show_id INTEGER NOT NULL REFERENCES shows (id),
+    keyword TEXT NOT NULL,
+    PRIMARY KEY (show_id, keyword)
+);
+CREATE TABLE IF NOT EXISTS episodes (
+    id INTEGER PRIMARY KEY,
+    show_id INTEGER NOT NULL REFERENCES shows (id),
+    guid TEXT NOT NULL,
+    fingerprint BLOB NOT NULL,
+    title TEXT,
+    author TEXT,
+    description TEXT,
+    content_encoded TEXT,
+    enclosure_url TEXT,
+    enclosure_type TEXT,
+    enclosure_length INTEGER,
+    itunes_author_name TEXT,
+    itunes_block INTEGER,
+    itunes_duration INTEGER,
+    itunes_episode TEXT,
+    itunes_episode_type TEXT,
+    itunes_explicit INTEGER,
+    itunes_image TEXT,
+    itunes_order TEXT,
+    itunes_season TEXT,
+    itunes_subtitle TEXT,
+    itunes_summary TEXT,
+    published_date TEXT,
+    time_published INTEGER,
+    interactive INTEGER,
+    UNIQUE (show_id, guid)
+);
+CREATE TABLE IF NOT EXISTS transcripts (
+    show_id INTEGER NOT NULL,
+    guid TEXT NOT NULL,
+    url TEXT,
+    type TEXT,
+    language TEXT,
+    rel TEXT,
+    FOREIGN KEY (show_id, guid) REFERENCES episodes (show_id, guid)
+);
+CREATE INDEX IF NOT EXISTS transcripts_episode ON transcripts (show_id, guid);
+"""
+
+SHOW_COLUMNS = (
+    "title",
+    "subtitle",
+    "description",
+    "summary",
+    "link",
+    "language",
+    "copyright",
+    "image_url",
+    "itunes_author_name",
+    "itunes_block",
+    "itunes_complete",
+    "itunes_explicit",
+    "itunes_image",
+    "itunes_new_feed_url",
+    "itunes_type",
+    "owner_name",
+    "owner_email",
+    "last_build_date",
+    "published_date",
+    "time_published",
+    "interactive",
+)
+
+EPISODE_COLUMNS = (
+    "title",
+    "author",
+    "description",
+    "content_encoded",
+    "enclosure_url",
+    "enclosure_type",
+    "enclosure_length",
+    "itunes_author_name",
+    "itunes_block",
+    "itunes_duration",
+    "itunes_episode",
+    "itunes_episode_type",
+    "itunes_explicit",
+    "itunes_image",
+    "itunes_order",
+    "itunes_season",
+    "itunes_subtitle",
+    "itunes_summary",
+    "published_date",
+    "time_published",
+    "interactive",
+)
+
+TRANSCRIPT_KEYS = ("url", "type", "language", "rel")
+
+
+def upsert(table, conflict, columns):
+    """Returns the INSERT ... ON CONFLICT DO UPDATE statement of a table"""
+    insert_columns = conflict + columns
+    updates = ", ".join(f"{c} = excluded.{c}" for c in columns)
+    return (
+        f"INSERT INTO {table} ({', '.join(insert_columns)}) "
+        f"VALUES ({', '.join('?' * len(insert_columns))}) "
+        f"ON CONFLICT ({', '.join(conflict)}) DO UPDATE SET {updates}"
+    )
+
+
+SHOW_UPSERT = upsert("shows", ("key",), SHOW_COLUMNS)
+EPISODE_UPSERT = upsert("episodes", ("show_id", "guid"), ("fingerprint",) + EPISODE_COLUMNS)
+
+
+def sql_value(value):
+    """Returns value as a type sqlite3 stores, e.g. datetimes as text"""
+    if value is None or type(value) in (str, int, float, bool):
+        return value
+    return str(value)
+
+
+WriteResult = collections.namedtuple(
+    "WriteResult", ["show_id", "inserted", "updated", "unchanged"]
+)
+WriteResult.__doc__ = """Result of writing one feed
+
+Attributes:
+    show_id (int): Row id of the show
+    inserted (int): Episodes that were not stored before
+    updated (int): Stored episodes whose values changed
+    unchanged (int): Stored episodes that were skipped
+"""
+
+
+class SqliteSink(object):
+    """Writes parsed feeds into a normalized SQLite schema
+
+    Tables are shows, categories, keywords, episodes and transcripts. The
+    schema is created if it does not exist.
+
+    Args:
+        database (str or sqlite3.Connection): Path of the database file, or
+        an open connection. A connection opened from a path is put in WAL
+        mode and closed by close.
+    """
+
+    def __init__(self, database):
+        if isinstance(database, sqlite3.Connection):
+            self.connection = database
+            self.own_connection = False
+        else:
+            self.connection = sqlite3.connect(database)
+            self.own_connection = True
+            self.connection.execute("PRAGMA journal_mode = WAL")
+            self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def write(self, podcast, key=None):
+        """Writes a feed and its episodes in one transaction
+
+        Args:
+            podcast (Podcast): The parsed feed
+            key (str): Identifies the show, e.g. its feed url. Defaults to
+            the podcast's link.
+
+        Returns:
+            A WriteResult
+
+        Raises:
+            ValueError: There is no key and the podcast has no link
+        """
+        if key is None:
+            key = podcast.link
+        if key is None:
+            raise ValueError("A show key is needed for a podcast without a link")
+
+        connection = self.connection
+        with connection:
+            show_values = map(sql_value, operator.attrgetter(*SHOW_COLUMNS)(podcast))
+            connection.execute(SHOW_UPSERT, (str(key), *show_values))
+            (show_id,) = connection.execute(
+                "SELECT id FROM shows WHERE key = ?", (str(key),)
+            ).fetchone()
+            self._write_terms(show_id, "categories", "category", podcast.itunes_categories)
+            self._write_terms(show_id, "keywords", "keyword", podcast.itunes_keywords)
+            return self._write_episodes(show_id, podcast.items)
+
+    def write_many(self, podcasts):
+        """Writes (key, podcast) pairs, one transaction per feed
+
+        Yields:
+            A WriteResult per podcast
+        """
+        for key, podcast in podcasts:
+            yield self.write(podcast, key)
+
+    def _write_terms(self, show_id, table, column, terms):
+        self.connection.execute(f"DELETE FROM {table} WHERE show_id = ?", (show_id,))
+        self.connection.executemany(
+            f"INSERT OR IGNORE INTO {table} (show_id, {column}) VALUES (?, ?)",
+            [(show_id, str(term)) for term in terms],
+        )
+
+    def _write_episodes(self, show_id, items):
+        connection = self.connection
+        stored = dict(
+            connection.execute(
+                "SELECT guid, fingerprint FROM episodes WHERE show_id = ?", (show_id,)
+            )
+        )
+        values_of = operator.attrgetter(*EPISODE_COLUMNS)
+        transcript_values = operator.itemgetter(*TRANSCRIPT_KEYS)
+        episodes = []
+        transcripts = []
+        written = set()
+        inserted = updated = unchanged = 0
+        for item in items:
+            values = tuple(map(sql_value, values_of(item)))
+            item_transcripts = [
+                tuple(map(sql_value, transcript_values(t))) for t in item.transcriptionList
+            ]
+            row_fingerprint = fingerprint(repr((values, item_transcripts)).encode("utf-8"))
+            guid = item_key(item.guid, row_fingerprint)
+            if guid in written:
+                # Duplicated item on invalid feeds, the first one wins
+                continue
+            written.add(guid)
+            previous = stored.get(guid)
+            if previous == row_fingerprint:
+                unchanged += 1
+                continue
+            if previous is None:
+                inserted += 1
+            else:
+                updated += 1
+            episodes.append((show_id, guid, row_fingerprint, *values))
+            transcripts.extend((show_id, guid, *t) for t in item_transcripts)
+
+        connection.executemany(EPISODE_UPSERT, episodes)
+        if updated:
+            connection.executemany(
+                "DELETE FROM transcripts WHERE show_id = ? AND guid = ?",
+                [(show_id, guid) for show_id, guid, *_ in episodes if guid in stored],
+            )
+        connection.executemany(
+            "INSERT INTO transcripts (show_id, guid, url, type, language, rel) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            transcripts,
+        )
+        return WriteResult(show_id, inserted, updated, unchanged)
+
+    def close(self):
+        if self.own_connection:
+            self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
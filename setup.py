@@ -31,6 +31,12 @@ setup(
         "beautifulsoup4",
         "lxml",
     ],
+    extras_require={
+        "arrow": ["pyarrow"],
+        "fetch": ["requests"],
+        "numpy": ["numpy"],
+        "zstd": ["zstandard"],
+    },
     keywords=["podcast", "parser", "rss", "feed"],
     packages=find_packages(exclude=["contrib", "docs", "tests"]),
 )
@@ -1,9 +1,41 @@
 # -*- coding: utf-8 -*-
+import collections
+import concurrent.futures
 import datetime
+import gzip
+import http.server
+import io
+import json
+import logging
 import os
+import pickle
+import random
+import tempfile
+import threading
+import time
 import unittest
+import unittest.mock
 import pytz
+import requests
+from pypodcastparser import Batch
+from pypodcastparser import Cache
+from pypodcastparser import Columns
+from pypodcastparser import crawl
+from pypodcastparser import DateBatch
+from pypodcastparser import Error
+from pypodcastparser import Diagnostics
+from pypodcastparser import Dispatch
+from pypodcastparser import Duration
+from pypodcastparser import FeedState
+from pypodcastparser import Item
+from pypodcastparser import fetch
 from pypodcastparser import Podcast
+from pypodcastparser import Prolog
+from pypodcastparser import Source
+from pypodcastparser import Stats
+from pypodcastparser.sinks import sqlite
+from pypodcastparser import PubDate
+from pypodcastparser import Timezone
 
 # py.test test_pypodcastparser.py
 
@@ -530,8 +562,8 @@ class TestItunesEpisodes(unittest.TestCase):
         self.assertEqual(self.podcast.items[1].interactive, True)
 
     def test_episode_meta_data_interactive(self):
-        self.assertEqual(self.podcast.items[0].itunes_duration, "2785")
-        self.assertEqual(self.podcast.items[1].itunes_duration, "2785")
+        self.assertEqual(self.podcast.items[0].itunes_duration, 2785)
+        self.assertEqual(self.podcast.items[1].itunes_duration, 2785)
 
     def test_episode_meta_data_content_encoded(self):
         self.assertEqual(self.podcast.items[0].content_encoded, "test")
@@ -654,5 +686,1526 @@ class TestInvalidEpisodeDates(unittest.TestCase):
         )
 
 
+class TestIterparseEngine(unittest.TestCase):
+    def setUp(self):
+        test_dir = os.path.dirname(__file__)
+        self.test_feeds_dir = os.path.join(test_dir, "test_feeds")
+
+    def parse(self, file_name, engine):
+        with open(os.path.join(self.test_feeds_dir, file_name), "rb") as feed_file:
+            feed_content = feed_file.read()
+        try:
+            podcast = Podcast.Podcast(feed_content, engine=engine)
+        except Podcast.InvalidPodcastFeed as e:
+            return str(e)
+        source = ("soup", "items", "feed_content", "retain_source")
+        show = {k: getattr(podcast, k) for k in podcast.__slots__ if k not in source}
+        # Unparseable item dates default to the current time, skip them
+        items = [
+            {
+                k: getattr(item, k)
+                for k in item.__slots__
+                if k not in ("soup", "published_date")
+            }
+            for item in podcast.items
+        ]
+        return show, items
+
+    def test_engines_match_on_all_feeds(self):
+        for file_name in sorted(os.listdir(self.test_feeds_dir)):
+            with self.subTest(feed=file_name):
+                self.assertEqual(
+                    self.parse(file_name, "soup"), self.parse(file_name, "iterparse")
+                )
+
+    def test_no_soup_is_built(self):
+        with open(os.path.join(self.test_feeds_dir, "basic_podcast.rss"), "rb") as f:
+            podcast = Podcast.Podcast(f.read(), engine="iterparse")
+        self.assertIsNone(podcast.soup)
+        self.assertEqual(podcast.title, "basic title")
+        self.assertEqual(len(podcast.items), 2)
+
+    def test_missing_channel(self):
+        with self.assertRaises(Podcast.InvalidPodcastFeed):
+            Podcast.Podcast(b"<rss></rss>", engine="iterparse")
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            Podcast.Podcast(b"<rss></rss>", engine="regex")
+
+
+class TestLazyItems(unittest.TestCase):
+    def setUp(self):
+        test_dir = os.path.dirname(__file__)
+        test_feeds_dir = os.path.join(test_dir, "test_feeds")
+        basic_podcast_path = os.path.join(test_feeds_dir, "episode_parsing.rss")
+        with open(basic_podcast_path, "rb") as basic_podcast_file:
+            self.basic_podcast = basic_podcast_file.read()
+        self.podcast = Podcast.Podcast(self.basic_podcast)
+
+    def test_len_does_not_parse_items(self):
+        for engine in Podcast.Podcast.ENGINES:
+            lazy_podcast = Podcast.Podcast(self.basic_podcast, engine=engine, lazy=True)
+            self.assertEqual(len(lazy_podcast.items), len(self.podcast.items))
+            self.assertEqual(lazy_podcast.items.materialized_count, 0)
+            self.assertEqual(lazy_podcast.title, self.podcast.title)
+
+    def test_items_are_parsed_on_access_and_cached(self):
+        for engine in Podcast.Podcast.ENGINES:
+            lazy_podcast = Podcast.Podcast(self.basic_podcast, engine=engine, lazy=True)
+            first = lazy_podcast.items[0]
+            self.assertEqual(lazy_podcast.items.materialized_count, 1)
+            self.assertIs(lazy_podcast.items[0], first)
+            self.assertEqual(first.guid, self.podcast.items[0].guid)
+            self.assertEqual(
+                first.podcast_transcript, self.podcast.items[0].podcast_transcript
+            )
+            self.assertEqual(lazy_podcast.items[-1].guid, self.podcast.items[-1].guid)
+
+    def test_iteration_matches_eager_items(self):
+        lazy_podcast = Podcast.Podcast(self.basic_podcast, lazy=True)
+        self.assertEqual(
+            [item.to_dict() for item in lazy_podcast.items],
+            [item.to_dict() for item in self.podcast.items],
+        )
+        self.assertEqual(
+            [item.guid for item in lazy_podcast.items[1:3]],
+            [item.guid for item in self.podcast.items[1:3]],
+        )
+
+    def test_index_out_of_range(self):
+        lazy_podcast = Podcast.Podcast(self.basic_podcast, lazy=True)
+        with self.assertRaises(IndexError):
+            lazy_podcast.items[len(self.podcast.items)]
+
+
+class TestItemLimits(unittest.TestCase):
+    def setUp(self):
+        self.feed = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:itunes="http://www.itunes.com/dtds/podcast-1.0.dtd">
+    <channel>
+        <item><guid>guid 3</guid><title>third</title></item>
+        <item><guid>guid 2</guid><title>second</title></item>
+        <item><guid>guid 1</guid><title>first</title></item>
+        <title>show title after items</title>
+        <itunes:author>show author after items</itunes:author>
+    </channel>
+</rss>"""
+
+    def test_max_items(self):
+        for engine in Podcast.Podcast.ENGINES:
+            podcast = Podcast.Podcast(self.feed, engine=engine, max_items=2)
+            self.assertEqual([item.guid for item in podcast.items], ["guid 3", "guid 2"])
+            self.assertTrue(podcast.items_truncated)
+            self.assertEqual(podcast.title, "show title after items")
+            self.assertEqual(podcast.itunes_author_name, "show author after items")
+
+    def test_max_items_larger_than_feed(self):
+        podcast = Podcast.Podcast(self.feed, max_items=10)
+        self.assertEqual(len(podcast.items), 3)
+        self.assertFalse(podcast.items_truncated)
+
+    def test_stop_at_guid(self):
+        for engine in Podcast.Podcast.ENGINES:
+            podcast = Podcast.Podcast(self.feed, engine=engine, stop_at_guid="guid 1")
+            self.assertEqual([item.guid for item in podcast.items], ["guid 3", "guid 2"])
+            self.assertTrue(podcast.items_truncated)
+            self.assertEqual(podcast.title, "show title after items")
+
+    def test_stop_at_first_guid(self):
+        podcast = Podcast.Podcast(self.feed, stop_at_guid="guid 3")
+        self.assertEqual(len(podcast.items), 0)
+        self.assertTrue(podcast.items_truncated)
+
+    def test_lazy_max_items(self):
+        podcast = Podcast.Podcast(self.feed, lazy=True, max_items=1)
+        self.assertEqual(len(podcast.items), 1)
+        self.assertEqual(podcast.items[0].title, "third")
+
+    def test_filtered_channel_items_do_not_fall_back(self):
+        for engine in Podcast.Podcast.ENGINES:
+            with self.subTest(engine=engine):
+                calls = collections.Counter()
+
+                def reject(guid, tag):
+                    calls[guid] += 1
+                    return False
+
+                podcast = Podcast.Podcast(self.feed, engine=engine, item_filter=reject)
+                self.assertEqual(len(podcast.items), 0)
+                self.assertEqual(calls, {"guid 3": 1, "guid 2": 1, "guid 1": 1})
+
+    def test_fallback_items_limit(self):
+        feed = b"""<rss><channel><title>t</title></channel>
+            <item><guid>a</guid></item><item><guid>b</guid></item></rss>"""
+        for engine in Podcast.Podcast.ENGINES:
+            with self.subTest(engine=engine):
+                podcast = Podcast.Podcast(feed, engine=engine, max_items=1)
+                self.assertEqual([item.guid for item in podcast.items], ["a"])
+                self.assertTrue(podcast.items_truncated)
+
+    def test_fallback_items_filter_and_limit(self):
+        feed = b"""<rss><channel><title>t</title></channel>
+            <item><guid>a</guid></item><item><guid>b</guid></item>
+            <item><guid>c</guid></item></rss>"""
+        for engine in Podcast.Podcast.ENGINES:
+            with self.subTest(engine=engine):
+                podcast = Podcast.Podcast(
+                    feed,
+                    engine=engine,
+                    max_items=2,
+                    item_filter=lambda guid, tag: guid != "a",
+                )
+                self.assertEqual([item.guid for item in podcast.items], ["b", "c"])
+                self.assertFalse(podcast.items_truncated)
+
+                podcast = Podcast.Podcast(feed, engine=engine, max_items=3)
+                self.assertEqual(len(podcast.items), 3)
+                self.assertFalse(podcast.items_truncated)
+
+
+class TestPubDate(unittest.TestCase):
+    def test_fast_path_matches_tolerant_parser(self):
+        dates = [
+            "Mon, 30 May 2022 04:05:03 GMT",
+            "Mon, 30 May 2022 04:05:03 PST",
+            "Mon, 22 May 2023 14:00:00 +1000",
+            "Thu, 06 Jul 2023 01:00:00 PDT",
+            "Tue, 24 Jan 2023 02:40:00 +0000",
+            "Wed, 5 Apr 2023 10:00 UTC",
+            "Sun, 05 Nov 2023 01:30:00 -0800",
+        ]
+        for date in dates:
+            with self.subTest(date=date):
+                self.assertIsNotNone(PubDate.FAST_DATE_RE.fullmatch(date))
+                self.assertEqual(
+                    PubDate.parse_published_date(date),
+                    PubDate.parse_published_date_tolerant(date),
+                )
+
+    def test_eastern_dates_are_not_converted(self):
+        self.assertEqual(
+            PubDate.parse_published_date("Tue, 24 Jan 2023 02:40:00 -0500"),
+            datetime.datetime(2023, 1, 24, 2, 40),
+        )
+        self.assertEqual(
+            PubDate.parse_published_date("Fri, 21 Mar 2008 09:51:00 EDT"),
+            datetime.datetime(2008, 3, 21, 9, 51),
+        )
+
+    def test_conversion_to_eastern(self):
+        self.assertEqual(
+            PubDate.parse_published_date("Mon, 30 May 2022 04:05:03 GMT"),
+            "2022-05-30 00:05:03",
+        )
+        self.assertEqual(
+            PubDate.parse_published_date("Thu, 06 Jul 2023 01:00:00 PDT"),
+            "2023-07-06 04:00:00",
+        )
+
+    def test_malformed_dates(self):
+        self.assertEqual(
+            PubDate.parse_published_date("Mon, 19 Jul 2021 16:14:29 +0000 EST"),
+            datetime.datetime(2021, 7, 19, 16, 14, 29),
+        )
+        for date in ["  Mon30 May 2022/nn /n", "Mon, 31 Feb 2022 04:05:03 GMT", "XYZ"]:
+            with self.subTest(date=date):
+                with self.assertRaises(Exception):
+                    PubDate.parse_published_date(date)
+
+
+class TestTimezone(unittest.TestCase):
+    def test_resolve_names(self):
+        self.assertEqual(Timezone.resolve_timezone("PST").tzinfo.zone, "US/Pacific")
+        self.assertEqual(Timezone.resolve_timezone("-0800").tzinfo.zone, "US/Pacific")
+        self.assertEqual(Timezone.resolve_timezone("GMT").tzinfo.zone, "GMT")
+        self.assertEqual(
+            Timezone.resolve_timezone("Europe/Paris").tzinfo.zone, "Europe/Paris"
+        )
+        with self.assertRaises(pytz.UnknownTimeZoneError):
+            Timezone.resolve_timezone("XYZ")
+
+    def test_resolution_is_cached(self):
+        self.assertIs(Timezone.resolve_timezone("AEST"), Timezone.resolve_timezone("AEST"))
+
+    def test_to_eastern_matches_pytz(self):
+        eastern = pytz.timezone("US/Eastern")
+        start = datetime.datetime(2023, 3, 10)
+        for name in ["PST", "AEST", "CET", "NZDT", "GMT", "MST"]:
+            zone = Timezone.resolve_timezone(name)
+            for hours in range(0, 24 * 250, 31):
+                local = start + datetime.timedelta(hours=hours, minutes=30)
+                with self.subTest(zone=name, local=local):
+                    expected = zone.tzinfo.localize(local).astimezone(eastern)
+                    self.assertEqual(
+                        zone.to_eastern(local), expected.replace(tzinfo=None)
+                    )
+
+    def test_ambiguous_and_missing_times_use_pytz(self):
+        zone = Timezone.resolve_timezone("US/Pacific")
+        self.assertIsNone(zone.to_utc(datetime.datetime(2023, 11, 5, 1, 30)))
+        self.assertIsNone(zone.to_utc(datetime.datetime(2023, 3, 12, 2, 30)))
+        self.assertEqual(
+            zone.to_eastern(datetime.datetime(2023, 11, 5, 1, 30)),
+            datetime.datetime(2023, 11, 5, 4, 30),
+        )
+
+
+class TestRetainSource(unittest.TestCase):
+    def setUp(self):
+        test_dir = os.path.dirname(__file__)
+        test_feeds_dir = os.path.join(test_dir, "test_feeds")
+        basic_podcast_path = os.path.join(test_feeds_dir, "basic_podcast.rss")
+        with open(basic_podcast_path, "rb") as basic_podcast_file:
+            self.basic_podcast = basic_podcast_file.read()
+
+    def test_soup_engine_retains_source_by_default(self):
+        podcast = Podcast.Podcast(self.basic_podcast)
+        self.assertIs(podcast.feed_content, self.basic_podcast)
+        self.assertIsNotNone(podcast.soup)
+        self.assertIsNotNone(podcast.items[0].soup)
+
+    def test_iterparse_engine_releases_source_by_default(self):
+        podcast = Podcast.Podcast(self.basic_podcast, engine="iterparse")
+        self.assertIsNone(podcast.feed_content)
+        self.assertIsNone(podcast.items[0].soup)
+        self.assertEqual(podcast.items[0].guid, "basic item guid")
+
+    def test_release_source(self):
+        for engine in Podcast.Podcast.ENGINES:
+            podcast = Podcast.Podcast(
+                self.basic_podcast, engine=engine, retain_source=False
+            )
+            self.assertIsNone(podcast.feed_content)
+            self.assertIsNone(podcast.soup)
+            self.assertTrue(all(item.soup is None for item in podcast.items))
+            self.assertEqual(podcast.title, "basic title")
+            # NavigableStrings would keep the tree alive through their parents
+            self.assertIs(type(podcast.title), str)
+            self.assertIs(type(podcast.items[0].title), str)
+
+    def test_lazy_items_release_tags_once_parsed(self):
+        podcast = Podcast.Podcast(self.basic_podcast, lazy=True, retain_source=False)
+        self.assertIsNone(podcast.soup)
+        self.assertIsNone(podcast.items[1].soup)
+        self.assertEqual(podcast.items[1].guid, "another basic item guid")
+
+
+class TestSlots(unittest.TestCase):
+    def setUp(self):
+        test_dir = os.path.dirname(__file__)
+        self.test_feeds_dir = os.path.join(test_dir, "test_feeds")
+        basic_podcast_path = os.path.join(self.test_feeds_dir, "basic_podcast.rss")
+        with open(basic_podcast_path, "rb") as basic_podcast_file:
+            self.basic_podcast = basic_podcast_file.read()
+
+    def test_no_instance_dict(self):
+        podcast = Podcast.Podcast(self.basic_podcast)
+        self.assertFalse(hasattr(podcast, "__dict__"))
+        self.assertFalse(hasattr(podcast.items[0], "__dict__"))
+
+    def test_pickle_round_trip(self):
+        podcast = Podcast.Podcast(self.basic_podcast, retain_source=False)
+        copy = pickle.loads(pickle.dumps(podcast))
+        self.assertEqual(copy.to_dict(), podcast.to_dict())
+
+    def test_transcription_list(self):
+        path = os.path.join(self.test_feeds_dir, "episode_parsing.rss")
+        with open(path, "rb") as feed_file:
+            podcast = Podcast.Podcast(feed_file.read())
+        item = podcast.items[0]
+        self.assertIs(item.transcriptionList, item.podcast_transcript)
+        basic_item = Podcast.Podcast(self.basic_podcast).items[0]
+        self.assertEqual(basic_item.transcriptionList, [])
+
+    def test_show_is_interactive_tag(self):
+        feed = (
+            b'<?xml version="1.0"?><rss><channel><title>t</title>'
+            b"<is_interactive>yes</is_interactive></channel></rss>"
+        )
+        podcast = Podcast.Podcast(feed)
+        self.assertTrue(podcast.is_interactive)
+
+
+class TestTagDispatch(unittest.TestCase):
+    feed = (
+        b'<?xml version="1.0"?>'
+        b'<rss xmlns:it="http://www.itunes.com/dtds/podcast-1.0.dtd"'
+        b' xmlns:itunes="http://www.itunes.com/DTDs/Podcast-1.0.dtd">'
+        b"<channel><title>t</title><title>duplicate</title>"
+        b"<generator>g</generator>"
+        b"<it:author>show author</it:author>"
+        b'<it:category text="Arts"><it:category text="Design"/></it:category>'
+        b"<it:owner><it:name>owner</it:name></it:owner>"
+        b"<item><guid>1</guid><itunes:duration>01:00</itunes:duration>"
+        b"<it:episode>3</it:episode><it:episode>4</it:episode></item>"
+        b"</channel></rss>"
+    )
+
+    def test_non_standard_itunes_prefix(self):
+        for engine in Podcast.Podcast.ENGINES:
+            with self.subTest(engine=engine):
+                podcast = Podcast.Podcast(self.feed, engine=engine)
+                self.assertEqual(podcast.itunes_author_name, "show author")
+                self.assertEqual(podcast.itunes_categories, ["Arts", "Design"])
+                self.assertEqual(podcast.owner_name, "owner")
+                self.assertEqual(podcast.items[0].itunes_episode, "3")
+
+    def test_namespace_uri_variant(self):
+        for engine in Podcast.Podcast.ENGINES:
+            with self.subTest(engine=engine):
+                podcast = Podcast.Podcast(self.feed, engine=engine)
+                self.assertEqual(podcast.items[0].itunes_duration, 60)
+
+    def test_first_duplicate_wins(self):
+        self.assertEqual(Podcast.Podcast(self.feed).title, "t")
+
+    def test_register(self):
+        class GeneratorPodcast(Podcast.Podcast):
+            def set_generator(self, tag):
+                self.generator = tag.string
+
+            tag_methods = Podcast.Podcast.tag_methods.copy()
+            tag_methods.register(None, "generator", set_generator)
+
+        self.assertEqual(GeneratorPodcast(self.feed).generator, "g")
+        self.assertNotIn((None, "generator"), Podcast.Podcast.tag_methods.handlers)
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        test_dir = os.path.dirname(__file__)
+        test_feeds_dir = os.path.join(test_dir, "test_feeds")
+        self.feeds = []
+        # Feeds whose item dates all parse, so results are stable
+        file_names = (
+            "basic_podcast.rss",
+            "itunes_block_podcast.rss",
+            "ihr_interactive_podcast.rss",
+        )
+        for file_name in file_names:
+            with open(os.path.join(test_feeds_dir, file_name), "rb") as feed_file:
+                self.feeds.append(feed_file.read())
+        self.feeds.append(b"<rss></rss>")
+        self.expected = [Batch.parse_feed(feed) for feed in self.feeds[:3]]
+
+    def check(self, results):
+        results = dict(results)
+        self.assertEqual(sorted(results), [0, 1, 2, 3])
+        for index, expected in enumerate(self.expected):
+            self.assertEqual(results[index], expected)
+        self.assertIsInstance(results[3], Podcast.InvalidPodcastFeed)
+
+    def test_parse_feed(self):
+        basic = Batch.parse_feed(self.feeds[0])
+        self.assertEqual(basic, Podcast.Podcast(self.feeds[0]).to_dict())
+        self.assertIsInstance(
+            Batch.parse_feed(self.feeds[3]), Podcast.InvalidPodcastFeed
+        )
+
+    def test_in_process(self):
+        results = list(Batch.parse_many(self.feeds, workers=0))
+        self.assertEqual([index for index, _ in results], [0, 1, 2, 3])
+        self.check(results)
+
+    def test_ordered(self):
+        results = list(Batch.parse_many(iter(self.feeds), workers=2))
+        self.assertEqual([index for index, _ in results], [0, 1, 2, 3])
+        self.check(results)
+
+    def test_unordered_chunks(self):
+        results = Batch.parse_many(self.feeds, workers=2, chunksize=3, ordered=False)
+        self.check(results)
+
+    def test_invalid_chunksize(self):
+        with self.assertRaises(ValueError):
+            list(Batch.parse_many(self.feeds, chunksize=0))
+
+
+class TestJson(unittest.TestCase):
+    def setUp(self):
+        test_dir = os.path.dirname(__file__)
+        self.test_feeds_dir = os.path.join(test_dir, "test_feeds")
+
+    def test_matches_json_dumps(self):
+        for file_name in sorted(os.listdir(self.test_feeds_dir)):
+            with open(os.path.join(self.test_feeds_dir, file_name), "rb") as feed_file:
+                feed_content = feed_file.read()
+            for engine in Podcast.Podcast.ENGINES:
+                with self.subTest(feed=file_name, engine=engine):
+                    try:
+                        podcast = Podcast.Podcast(feed_content, engine=engine)
+                    except Podcast.InvalidPodcastFeed:
+                        continue
+                    self.assertEqual(
+                        podcast.to_json(default=str),
+                        json.dumps(podcast.to_dict(), default=str),
+                    )
+                    for item in podcast.items:
+                        self.assertEqual(
+                            item.to_json(default=str),
+                            json.dumps(item.to_dict(), default=str),
+                        )
+
+    def test_write_json(self):
+        with open(os.path.join(self.test_feeds_dir, "basic_podcast.rss"), "rb") as f:
+            podcast = Podcast.Podcast(f.read())
+        fp = io.StringIO()
+        podcast.write_json(fp, default=str)
+        self.assertEqual(fp.getvalue(), json.dumps(podcast.to_dict(), default=str))
+
+    def test_no_items(self):
+        podcast = Podcast.Podcast(
+            b'<?xml version="1.0"?><rss><channel><title>t</title></channel></rss>'
+        )
+        self.assertEqual(podcast.to_json(), json.dumps(podcast.to_dict()))
+
+    def test_unserializable_value(self):
+        podcast = Podcast.Podcast(
+            b'<?xml version="1.0"?><rss><channel><item>'
+            b"<pubDate>Fri, 21 Mar 2008 09:51:00 EDT</pubDate>"
+            b"</item></channel></rss>"
+        )
+        # Eastern dates are kept as datetime objects
+        with self.assertRaises(TypeError):
+            podcast.to_json()
+        self.assertEqual(
+            podcast.to_json(default=str), json.dumps(podcast.to_dict(), default=str)
+        )
+
+
+class TestParseIncremental(unittest.TestCase):
+    item = (
+        "<item><guid>{0}</guid><title>{1}</title>"
+        "<pubDate>Mon, 0{0} May 2022 04:05:03 GMT</pubDate></item>\n"
+    )
+
+    def feed(self, *items, description="show"):
+        return (
+            '<?xml version="1.0"?><rss><channel><title>t</title>'
+            + "".join(self.item.format(*item) for item in items)
+            + f"<description>{description}</description></channel></rss>"
+        ).encode()
+
+    def test_first_parse_adds_every_item(self):
+        result = Podcast.Podcast.parse_incremental(self.feed((1, "a"), (2, "b")))
+        self.assertEqual([item.guid for item in result.added], ["1", "2"])
+        self.assertEqual(result.changed, [])
+        self.assertEqual(result.removed, [])
+        self.assertEqual(result.podcast.description, "show")
+        self.assertEqual(sorted(result.state.guids), ["1", "2"])
+        self.assertEqual(
+            result.state.newest_time_published, result.added[1].time_published
+        )
+
+    def test_unchanged_content(self):
+        feed = self.feed((1, "a"))
+        state = Podcast.Podcast.parse_incremental(feed).state
+        result = Podcast.Podcast.parse_incremental(feed, state)
+        self.assertIsNone(result.podcast)
+        self.assertIs(result.state, state)
+
+    def test_added_changed_removed(self):
+        state = Podcast.Podcast.parse_incremental(
+            self.feed((1, "a"), (2, "b"), (3, "c"))
+        ).state
+        result = Podcast.Podcast.parse_incremental(
+            self.feed((4, "d"), (1, "a"), (2, "B"), description="new"), state
+        )
+        self.assertEqual([item.guid for item in result.added], ["4"])
+        self.assertEqual([item.title for item in result.changed], ["B"])
+        self.assertEqual(result.removed, ["3"])
+        self.assertEqual(result.podcast.title, "t")
+        self.assertEqual(result.podcast.description, "new")
+        self.assertEqual(len(result.podcast.items), 2)
+        self.assertEqual(sorted(result.state.guids), ["1", "2", "4"])
+
+        again = Podcast.Podcast.parse_incremental(
+            self.feed((4, "d"), (1, "a"), (2, "B"), description="newer"),
+            result.state,
+        )
+        self.assertEqual((again.added, again.changed, again.removed), ([], [], []))
+
+    def test_cdata_in_items(self):
+        state = Podcast.Podcast.parse_incremental(self.feed((1, "a"), (2, "b"))).state
+        feed = self.feed((1, "a"), (2, "B"), (3, "<![CDATA[</item>]]>"))
+        self.assertEqual(len(FeedState.item_spans(feed)), 3)
+        result = Podcast.Podcast.parse_incremental(feed, state)
+        self.assertEqual([item.guid for item in result.added], ["3"])
+        self.assertEqual([item.title for item in result.changed], ["B"])
+        self.assertEqual(result.removed, [])
+
+    def test_item_markup_in_channel_description(self):
+        def feed(*items):
+            return (
+                '<?xml version="1.0"?><rss><channel><title>t</title>'
+                "<description><![CDATA[a <item> list]]></description>"
+                "<!-- <item> -->"
+                + "".join(self.item.format(*item) for item in items)
+                + "</channel></rss>"
+            ).encode()
+
+        self.assertEqual(len(FeedState.item_spans(feed((1, "a"), (2, "b")))), 2)
+        state = Podcast.Podcast.parse_incremental(feed((1, "a"), (2, "b"))).state
+        result = Podcast.Podcast.parse_incremental(feed((3, "c"), (1, "a"), (2, "b")), state)
+        self.assertEqual([item.guid for item in result.added], ["3"])
+        self.assertEqual((result.changed, result.removed), ([], []))
+        self.assertEqual(result.podcast.description, "a <item> list")
+
+        result = Podcast.Podcast.parse_incremental(feed((3, "c"), (1, "a"), (2, "B")), result.state)
+        self.assertEqual(result.added, [])
+        self.assertEqual([item.title for item in result.changed], ["B"])
+
+    def test_items_that_can_not_be_delimited(self):
+        nested = "<![CDATA[x]]></title><item><title>n</title></item><title>"
+        feed = self.feed((1, nested), (2, "b"))
+        self.assertIsNone(FeedState.item_spans(feed))
+        state = Podcast.Podcast.parse_incremental(feed).state
+        self.assertEqual(sorted(state.guids), ["1", "2"])
+        self.assertEqual(state.raw_fingerprints, {})
+        result = Podcast.Podcast.parse_incremental(self.feed((1, nested), (3, "c")), state)
+        self.assertEqual([item.guid for item in result.added], ["3"])
+        self.assertEqual(result.removed, ["2"])
+
+    def test_switching_between_cut_and_full_parse(self):
+        nested = "<![CDATA[x]]></title><item><title>n</title></item><title>"
+        delimited = self.feed((1, "a"), (2, "b"))
+        undelimited = self.feed((1, "a"), (2, "B"), (3, nested))
+        state = Podcast.Podcast.parse_incremental(delimited).state
+        self.assertEqual(sorted(state.raw_fingerprints), ["1", "2"])
+
+        result = Podcast.Podcast.parse_incremental(undelimited, state)
+        self.assertEqual([item.guid for item in result.added], ["3"])
+        self.assertEqual([item.title for item in result.changed], ["B"])
+        self.assertEqual(result.removed, [])
+
+        result = Podcast.Podcast.parse_incremental(delimited, result.state)
+        self.assertEqual(result.added, [])
+        self.assertEqual([item.title for item in result.changed], ["b"])
+        self.assertEqual(result.removed, ["3"])
+
+        again = Podcast.Podcast.parse_incremental(self.feed((1, "a"), (2, "B")), result.state)
+        self.assertEqual([item.title for item in again.changed], ["B"])
+
+    def test_state_round_trip(self):
+        state = Podcast.Podcast.parse_incremental(self.feed((1, "a"))).state
+        restored = FeedState.FeedState.from_dict(json.loads(json.dumps(state.to_dict())))
+        self.assertEqual(restored, state)
+        self.assertEqual(restored.raw_fingerprints, state.raw_fingerprints)
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        test_dir = os.path.dirname(__file__)
+        test_feeds_dir = os.path.join(test_dir, "test_feeds")
+        basic_podcast_path = os.path.join(test_feeds_dir, "basic_podcast.rss")
+        with open(basic_podcast_path, "rb") as basic_podcast_file:
+            self.basic_podcast = basic_podcast_file.read()
+
+    def assertSamePodcast(self, first, second):
+        self.assertEqual(first.to_dict(), second.to_dict())
+        self.assertEqual(
+            [item.published_date_string for item in first.items],
+            [item.published_date_string for item in second.items],
+        )
+
+    def test_memory_hit(self):
+        cache = Cache.ParseCache()
+        first = cache.parse(self.basic_podcast)
+        second = cache.parse(self.basic_podcast)
+        self.assertIsNot(first, second)
+        self.assertSamePodcast(first, second)
+        self.assertIsNone(second.soup)
+        self.assertEqual(cache.stats, {"hits": 1, "misses": 1, "evictions": 0})
+
+    def test_options_are_part_of_the_key(self):
+        cache = Cache.ParseCache()
+        cache.parse(self.basic_podcast)
+        limited = cache.parse(self.basic_podcast, max_items=1)
+        self.assertEqual(len(limited.items), 1)
+        self.assertEqual(cache.misses, 2)
+        self.assertNotEqual(
+            Cache.cache_key(self.basic_podcast),
+            Cache.cache_key(self.basic_podcast, engine="iterparse"),
+        )
+
+    def test_eviction(self):
+        size = len(pickle.dumps(Podcast.Podcast(self.basic_podcast, retain_source=False)))
+        cache = Cache.ParseCache(Cache.MemoryBackend(max_bytes=int(size * 1.5)))
+        cache.parse(self.basic_podcast)
+        cache.parse(self.basic_podcast, max_items=1)
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(len(cache.backend), 1)
+        cache.parse(self.basic_podcast)
+        self.assertEqual(cache.stats, {"hits": 0, "misses": 3, "evictions": 2})
+
+    def test_disk_backend(self):
+        with tempfile.TemporaryDirectory() as directory:
+            first = Cache.ParseCache(Cache.DiskBackend(directory))
+            podcast = first.parse(self.basic_podcast)
+            second = Cache.ParseCache(Cache.DiskBackend(directory))
+            self.assertSamePodcast(second.parse(self.basic_podcast), podcast)
+            self.assertEqual(second.hits, 1)
+            self.assertEqual(len(second.backend), 1)
+            second.backend.clear()
+            self.assertEqual(len(second.backend), 0)
+
+    def test_invalid_feed_is_not_cached(self):
+        cache = Cache.ParseCache()
+        for _ in range(2):
+            with self.assertRaises(Podcast.InvalidPodcastFeed):
+                cache.parse(b"<rss></rss>")
+        self.assertEqual(cache.misses, 2)
+
+    def test_uncacheable_options(self):
+        cache = Cache.ParseCache()
+        with self.assertRaises(ValueError):
+            cache.parse(self.basic_podcast, lazy=True)
+        with self.assertRaises(ValueError):
+            cache.parse(self.basic_podcast, retain_source=True)
+
+
+class FeedHandler(http.server.BaseHTTPRequestHandler):
+    """Serves basic_podcast.rss with an ETag, 304 when it matches"""
+
+    etag = '"basic-1"'
+    delay = 0
+    lock = threading.Lock()
+    active = 0
+    max_active = 0
+    requests = []
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+            cls.requests.append((self.path, self.headers.get("If-None-Match")))
+        try:
+            time.sleep(cls.delay)
+            if self.path == "/missing":
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            elif self.headers.get("If-None-Match") == cls.etag:
+                self.send_response(304)
+                self.send_header("ETag", cls.etag)
+                self.end_headers()
+            else:
+                self.send_response(200)
+                self.send_header("ETag", cls.etag)
+                self.send_header("Content-Length", str(len(cls.body)))
+                self.end_headers()
+                self.wfile.write(cls.body)
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+class FeedServerMixin(object):
+    @classmethod
+    def setUpClass(cls):
+        test_dir = os.path.dirname(__file__)
+        path = os.path.join(test_dir, "test_feeds", "basic_podcast.rss")
+        with open(path, "rb") as feed_file:
+            FeedHandler.body = feed_file.read()
+        cls.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), FeedHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.url = "http://127.0.0.1:{}".format(cls.server.server_address[1])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        FeedHandler.delay = 0
+        FeedHandler.max_active = 0
+        FeedHandler.requests = []
+
+
+class TestFetch(FeedServerMixin, unittest.TestCase):
+
+    def test_conditional_fetch(self):
+        with fetch.FeedClient() as client:
+            first = client.fetch(self.url + "/feed")
+            self.assertEqual(first.status, 200)
+            self.assertEqual(first.podcast.title, "basic title")
+            self.assertEqual(first.validator, fetch.Validator('"basic-1"', None))
+
+            second = client.fetch(self.url + "/feed")
+            self.assertEqual(second.status, 304)
+            self.assertIsNone(second.podcast)
+        self.assertEqual(
+            FeedHandler.requests, [("/feed", None), ("/feed", '"basic-1"')]
+        )
+
+    def test_explicit_validator(self):
+        with fetch.FeedClient() as client:
+            stale = fetch.Validator('"basic-0"', None)
+            self.assertEqual(client.fetch(self.url + "/feed", stale).status, 200)
+
+    def test_error_status(self):
+        with fetch.FeedClient() as client:
+            with self.assertRaises(requests.HTTPError):
+                client.fetch(self.url + "/missing")
+            results = list(client.fetch_many([self.url + "/missing", self.url + "/a"]))
+        self.assertEqual(results[0].status, 404)
+        self.assertIsInstance(results[0].error, requests.HTTPError)
+        self.assertEqual(results[1].podcast.title, "basic title")
+
+    def test_per_host_limit(self):
+        FeedHandler.delay = 0.05
+        urls = [f"{self.url}/feed{i}" for i in range(8)]
+        with fetch.FeedClient(max_per_host=2) as client:
+            results = list(client.fetch_many(urls, workers=8))
+        self.assertEqual([r.url for r in results], urls)
+        self.assertTrue(all(r.status == 200 for r in results))
+        self.assertLessEqual(FeedHandler.max_active, 2)
+
+
+class TestCrawl(FeedServerMixin, unittest.IsolatedAsyncioTestCase):
+    async def test_parse_feed_async_bytes(self):
+        podcast = await crawl.parse_feed_async(FeedHandler.body)
+        self.assertEqual(podcast.title, "basic title")
+        self.assertIsNone(podcast.soup)
+
+    async def test_parse_feed_async_url(self):
+        client = fetch.FeedClient()
+        with concurrent.futures.ThreadPoolExecutor(1) as executor:
+            podcast = await crawl.parse_feed_async(
+                self.url + "/feed", executor=executor, client=client
+            )
+            self.assertEqual(podcast.title, "basic title")
+            self.assertIsNone(
+                await crawl.parse_feed_async(self.url + "/feed", client=client)
+            )
+        client.close()
+
+    async def test_crawl(self):
+        FeedHandler.delay = 0.02
+        urls = [f"{self.url}/feed{i}" for i in range(10)] + [self.url + "/missing"]
+        results = [result async for result in crawl.crawl(urls, concurrency=3)]
+        self.assertEqual(sorted(r.url for r in results), sorted(urls))
+        by_url = {r.url: r for r in results}
+        self.assertEqual(by_url[self.url + "/missing"].status, 404)
+        self.assertEqual(by_url[self.url + "/feed0"].podcast.title, "basic title")
+        self.assertLessEqual(FeedHandler.max_active, 3)
+
+    async def test_download_threads(self):
+        FeedHandler.delay = 0.02
+        urls = [f"{self.url}/feed{i}" for i in range(8)]
+        results = [
+            result
+            async for result in crawl.crawl(urls, concurrency=8, download_threads=2)
+        ]
+        self.assertEqual(sorted(r.url for r in results), sorted(urls))
+        self.assertTrue(all(r.status == 200 for r in results))
+        self.assertLessEqual(FeedHandler.max_active, 2)
+        with self.assertRaises(ValueError):
+            await crawl.crawl(urls, download_threads=0).__anext__()
+
+    async def test_backpressure(self):
+        read = []
+
+        def urls():
+            for i in range(100):
+                read.append(i)
+                yield f"{self.url}/feed{i}"
+
+        results = crawl.crawl(urls(), concurrency=4)
+        first = await results.__anext__()
+        self.assertEqual(first.status, 200)
+        self.assertLessEqual(len(read), 5)
+        await results.aclose()
+
+
+class TestFieldProjection(unittest.TestCase):
+    def setUp(self):
+        test_dir = os.path.dirname(__file__)
+        test_feeds_dir = os.path.join(test_dir, "test_feeds")
+        with open(os.path.join(test_feeds_dir, "basic_podcast.rss"), "rb") as feed_file:
+            self.basic_podcast = feed_file.read()
+        with open(os.path.join(test_feeds_dir, "episode_parsing.rss"), "rb") as feed_file:
+            self.transcript_podcast = feed_file.read()
+
+    def test_item_fields(self):
+        fields = {"guid", "enclosure_url", "published_date"}
+        for engine in Podcast.Podcast.ENGINES:
+            for lazy in (False, True):
+                with self.subTest(engine=engine, lazy=lazy):
+                    full = Podcast.Podcast(self.basic_podcast, engine=engine)
+                    projected = Podcast.Podcast(
+                        self.basic_podcast, engine=engine, lazy=lazy, item_fields=fields
+                    )
+                    self.assertEqual(projected.title, full.title)
+                    self.assertEqual(len(projected.items), len(full.items))
+                    for item, full_item in zip(projected.items, full.items):
+                        self.assertEqual(item.guid, full_item.guid)
+                        self.assertEqual(item.enclosure_url, full_item.enclosure_url)
+                        self.assertEqual(item.enclosure_type, full_item.enclosure_type)
+                        self.assertEqual(item.published_date, full_item.published_date)
+                        self.assertEqual(item.time_published, full_item.time_published)
+                        self.assertIsNone(item.title)
+                        self.assertIsNone(item.description)
+
+    def test_skipped_handlers_are_not_called(self):
+        podcast = Podcast.Podcast(
+            self.transcript_podcast, engine="iterparse", item_fields=["title"]
+        )
+        full = Podcast.Podcast(self.transcript_podcast, engine="iterparse")
+        self.assertTrue(any(item.podcast_transcript for item in full.items))
+        for item in podcast.items:
+            self.assertIsNone(item.podcast_transcript)
+            self.assertIsNone(item.published_date)
+            self.assertIsNotNone(item.title)
+
+    def test_podcast_fields(self):
+        for engine in Podcast.Podcast.ENGINES:
+            with self.subTest(engine=engine):
+                podcast = Podcast.Podcast(
+                    self.basic_podcast, engine=engine, fields=["title", "owner_email"]
+                )
+                self.assertEqual(podcast.title, "basic title")
+                self.assertEqual(podcast.owner_email, "basic itunes owner email")
+                self.assertEqual(podcast.owner_name, "basic itunes owner name")
+                self.assertIsNone(podcast.link)
+                self.assertIsNone(podcast.description)
+                self.assertEqual(podcast.items, [])
+
+    def test_unknown_field(self):
+        with self.assertRaises(ValueError):
+            Podcast.Podcast(self.basic_podcast, fields=["soup"])
+        with self.assertRaises(ValueError):
+            Podcast.Podcast(self.basic_podcast, item_fields=["nope"])
+
+    def test_projection_is_cached(self):
+        registry = Item.Item.tag_methods
+        self.assertIs(registry.project(["guid"]), registry.project(("guid",)))
+        self.assertEqual(
+            set(registry.project(["description"]).handlers),
+            {(None, "description"), (Dispatch.CONTENT, "encoded")},
+        )
+
+
+class TestColumns(unittest.TestCase):
+    def setUp(self):
+        test_dir = os.path.dirname(__file__)
+        test_feeds_dir = os.path.join(test_dir, "test_feeds")
+        with open(os.path.join(test_feeds_dir, "basic_podcast.rss"), "rb") as feed_file:
+            self.basic_podcast = Podcast.Podcast(feed_file.read())
+        with open(os.path.join(test_feeds_dir, "episode_parsing.rss"), "rb") as feed_file:
+            self.episode_podcast = Podcast.Podcast(feed_file.read(), engine="iterparse")
+
+    def test_to_columns(self):
+        columns = self.episode_podcast.to_columns().to_pydict()
+        items = self.episode_podcast.items
+        self.assertEqual(list(columns), list(Columns.EpisodeColumns.COLUMNS))
+        self.assertEqual(columns["podcast_index"], [0] * len(items))
+        self.assertEqual(columns["guid"], [item.guid for item in items])
+        self.assertEqual(columns["enclosure_type"], [item.enclosure_type for item in items])
+        self.assertEqual(
+            columns["enclosure_length"], [item.enclosure_length for item in items]
+        )
+        self.assertEqual(
+            columns["time_published"], [item.time_published for item in items]
+        )
+
+    def test_typed_columns(self):
+        columns = Columns.EpisodeColumns(["itunes_duration", "itunes_episode_type"])
+        column = columns.columns["itunes_duration"]
+        column.extend([3723, "2785", "1:02", None, 2 ** 64])
+        self.assertEqual(column.values.typecode, "q")
+        self.assertEqual(column.to_pylist(), [3723, 2785, None, None, None])
+        self.assertEqual(column.null_count, 3)
+
+        column = columns.columns["itunes_episode_type"]
+        column.extend(["full", "trailer", None, "full"])
+        self.assertEqual(column.dictionary, ["full", "trailer"])
+        self.assertEqual(column.to_pylist(), ["full", "trailer", None, "full"])
+
+    def test_append_many(self):
+        columns = Columns.EpisodeColumns(["podcast_index", "title"])
+        columns.append(self.basic_podcast).append(self.episode_podcast)
+        self.assertEqual(columns.podcast_count, 2)
+        self.assertEqual(len(columns), 2 + len(self.episode_podcast.items))
+        self.assertEqual(
+            columns.to_pydict()["podcast_index"],
+            [0, 0] + [1] * len(self.episode_podcast.items),
+        )
+
+    def test_unknown_column(self):
+        with self.assertRaises(ValueError):
+            self.basic_podcast.to_columns(["nope"])
+
+    @unittest.skipIf(Columns.pyarrow is None, "pyarrow is not installed")
+    def test_to_arrow(self):
+        columns = self.episode_podcast.to_columns()
+        batch = columns.to_arrow()
+        self.assertEqual(batch.num_rows, len(self.episode_podcast.items))
+        self.assertEqual(batch.to_pydict(), columns.to_pydict())
+
+    @unittest.skipIf(Columns.pyarrow is None, "pyarrow is not installed")
+    def test_append_after_to_arrow(self):
+        columns = self.basic_podcast.to_columns()
+        batch = columns.to_arrow()
+        columns.append(self.episode_podcast)
+        self.assertEqual(batch.num_rows, 2)
+        lengths = {name: len(column) for name, column in columns.columns.items()}
+        self.assertEqual(set(lengths.values()), {2 + len(self.episode_podcast.items)})
+        self.assertEqual(columns.to_arrow().to_pydict(), columns.to_pydict())
+
+    @unittest.skipIf(Columns.pyarrow is not None, "pyarrow is installed")
+    def test_to_arrow_without_pyarrow(self):
+        with self.assertRaises(ImportError):
+            self.basic_podcast.to_columns().to_arrow()
+
+
+class TestSqliteSink(unittest.TestCase):
+    def setUp(self):
+        test_dir = os.path.dirname(__file__)
+        test_feeds_dir = os.path.join(test_dir, "test_feeds")
+        with open(os.path.join(test_feeds_dir, "basic_podcast.rss"), "rb") as feed_file:
+            self.basic_podcast = feed_file.read()
+        with open(os.path.join(test_feeds_dir, "episode_parsing.rss"), "rb") as feed_file:
+            self.episode_podcast = feed_file.read()
+        self.sink = sqlite.SqliteSink(":memory:")
+        self.addCleanup(self.sink.close)
+
+    def query(self, sql, *parameters):
+        return self.sink.connection.execute(sql, parameters).fetchall()
+
+    def test_write(self):
+        podcast = Podcast.Podcast(self.basic_podcast)
+        result = self.sink.write(podcast)
+        self.assertEqual(result, sqlite.WriteResult(result.show_id, 2, 0, 0))
+        self.assertEqual(
+            self.query("SELECT key, title FROM shows"),
+            [("https://github.com/iheartradio/pyPodcastParser", "basic title")],
+        )
+        self.assertEqual(
+            sorted(self.query("SELECT category FROM categories")),
+            [("Business News",), ("Health",), ("News",)],
+        )
+        self.assertEqual(
+            sorted(self.query("SELECT keyword FROM keywords")), [("Python",), ("Testing",)]
+        )
+        self.assertEqual(
+            self.query("SELECT guid, title, time_published FROM episodes ORDER BY id"),
+            [(item.guid, item.title, item.time_published) for item in podcast.items],
+        )
+
+    def test_unchanged_episodes_are_skipped(self):
+        self.sink.write(Podcast.Podcast(self.basic_podcast))
+        result = self.sink.write(Podcast.Podcast(self.basic_podcast, engine="iterparse"))
+        self.assertEqual((result.inserted, result.updated, result.unchanged), (0, 0, 2))
+
+        changed = self.basic_podcast.replace(
+            b"<title>basic item title</title>", b"<title>new title</title>"
+        )
+        result = self.sink.write(Podcast.Podcast(changed))
+        self.assertEqual((result.inserted, result.updated, result.unchanged), (0, 1, 1))
+        self.assertEqual(
+            self.query("SELECT title FROM episodes WHERE guid = ?", "basic item guid"),
+            [("new title",)],
+        )
+        self.assertEqual(self.query("SELECT count(*) FROM shows"), [(1,)])
+
+    def test_transcripts(self):
+        podcast = Podcast.Podcast(self.episode_podcast, engine="iterparse")
+        result = self.sink.write(podcast, key="episodes")
+        # The feed repeats one guid, the first item wins
+        self.assertEqual(result.inserted, 1)
+        self.assertEqual(
+            self.query("SELECT url, type FROM transcripts"),
+            [(t["url"], t["type"]) for t in podcast.items[0].transcriptionList],
+        )
+        self.sink.write(podcast, key="episodes")
+        self.assertEqual(self.query("SELECT count(*) FROM transcripts"), [(2,)])
+
+    def test_missing_key(self):
+        podcast = Podcast.Podcast(self.basic_podcast, fields=["title", "items"])
+        with self.assertRaises(ValueError):
+            self.sink.write(podcast)
+
+
+@unittest.skipIf(DateBatch.numpy is None, "numpy is not installed")
+class TestDateBatch(unittest.TestCase):
+    def assertAgreesWithItems(self, date_strings):
+        dates = DateBatch.normalize_published_dates(date_strings)
+        numpy = DateBatch.numpy
+        for index, date_string in enumerate(date_strings):
+            with self.subTest(date_string=date_string):
+                item = Item.Item.__new__(Item.Item)
+                item.published_date_string = date_string
+                item.set_time_published()
+                if item.time_published is None:
+                    self.assertFalse(dates.utc_valid[index])
+                else:
+                    self.assertEqual(
+                        dates.utc[index], numpy.datetime64(item.time_published, "s")
+                    )
+                try:
+                    published_date = PubDate.parse_published_date(date_string)
+                except Exception:
+                    self.assertFalse(dates.eastern_valid[index])
+                else:
+                    self.assertEqual(
+                        dates.eastern[index], numpy.datetime64(published_date, "s")
+                    )
+
+    def test_agrees_with_items(self):
+        self.assertAgreesWithItems(
+            [
+                "Mon, 30 May 2022 04:05:03 GMT",
+                "Mon, 30 May 2022 04:05:03 +0000",
+                "Mon, 3 May 2022 04:05:03 EST",
+                "Sun, 13 Mar 2022 02:30:00 PST",
+                "Sun, 06 Nov 2022 01:30:00 -0800",
+                "Sun, 06 Nov 2022 01:30:00 PDT",
+                "Tue, 01 Jan 2019 00:00:00 +0530",
+                "Tue, 01 Jan 2019 00:00:00 XYZ",
+                "Tue, 01 Jan 2019 00:00:00 UT",
+                "Tue, 01 Jan 2019 00:00 GMT",
+                "Tue, 30 Feb 2019 00:00:00 GMT",
+                "Tue, 01 Jan 0099 00:00:00 GMT",
+                "01 Jan 2019 00:00:00 GMT",
+                "Tue, 01 Jan 2019 00:00:00 GMT junk",
+                "garbage",
+                "",
+            ]
+        )
+
+    def test_generated_dates(self):
+        rng = random.Random(0)
+        zones = list(Timezone.offset_map) + list(Timezone.common_timezones) + ["EDT", "UT"]
+        date_strings = [
+            "{}, {:02d} {} {} {:02d}:{:02d}:{:02d} {}".format(
+                rng.choice(["Mon", "Sun"]),
+                rng.randint(1, 31),
+                rng.choice(["Mar", "Nov", "Jun"]),
+                rng.choice([1950, 2007, 2022]),
+                rng.choice([0, 1, 2, 3, 23]),
+                rng.randint(0, 59),
+                rng.randint(0, 59),
+                rng.choice(zones),
+            )
+            for _ in range(300)
+        ]
+        self.assertAgreesWithItems(date_strings)
+
+    def test_missing_dates(self):
+        dates = DateBatch.normalize_published_dates([None, "Mon, 30 May 2022 04:05:03 GMT"])
+        self.assertEqual(dates.utc_valid.tolist(), [False, True])
+        self.assertEqual(dates.eastern_valid.tolist(), [False, True])
+        self.assertTrue(DateBatch.numpy.isnat(dates.utc[0]))
+        self.assertEqual(len(DateBatch.normalize_published_dates([]).utc), 0)
+
+
+class TestDuration(unittest.TestCase):
+    def test_parse_duration(self):
+        cases = {
+            "2785": 2785,
+            " 2785 ": 2785,
+            "2785.5": 2785,
+            "46:25": 2785,
+            "0:46:25": 2785,
+            "01:02:03.250": 3723,
+            "75:30": 4530,
+            "PT46M25S": 2785,
+            "pt1h2m": 3720,
+            "PT1.5S": 1,
+            "P1DT1H": 90000,
+            "PT": None,
+            "P": None,
+            "1:2:3:4": None,
+            "-5": None,
+            "abc": None,
+            "": None,
+            "\u00b2": None,
+            None: None,
+        }
+        for value, expected in cases.items():
+            with self.subTest(value=value):
+                self.assertEqual(Duration.parse_duration(value), expected)
+
+    @unittest.skipIf(DateBatch.numpy is None, "numpy is not installed")
+    def test_parse_durations(self):
+        values = ["2785", "46:25", None, "nope", str(2 ** 64)]
+        parsed = Duration.parse_durations(values)
+        self.assertEqual(parsed.dtype, DateBatch.numpy.int64)
+        self.assertEqual(parsed.tolist(), [2785, 2785, -1, -1, -1])
+
+        out = DateBatch.numpy.zeros(6, dtype=DateBatch.numpy.int64)
+        self.assertIs(Duration.parse_durations(values, out=out, missing=0), out)
+        self.assertEqual(out.tolist(), [2785, 2785, 0, 0, 0, 0])
+
+
+class TestParseStats(unittest.TestCase):
+    def setUp(self):
+        test_dir = os.path.dirname(__file__)
+        basic_podcast_path = os.path.join(test_dir, "test_feeds", "basic_podcast.rss")
+        with open(basic_podcast_path, "rb") as basic_podcast_file:
+            self.basic_podcast = basic_podcast_file.read()
+
+    def test_records_phases_and_setters(self):
+        for engine in Podcast.Podcast.ENGINES:
+            with self.subTest(engine=engine):
+                stats = Stats.ParseStats()
+                podcast = Podcast.Podcast(self.basic_podcast, engine=engine, stats=stats)
+                self.assertEqual(stats.feeds, 1)
+                self.assertEqual(stats.items, len(podcast.items))
+                self.assertEqual(set(stats.to_dict()["phases"]), set(Stats.ParseStats.PHASES))
+                self.assertGreater(stats.phase_seconds["channel"], 0)
+                self.assertEqual(stats.setter_calls["Podcast.set_title"], 1)
+                self.assertEqual(stats.setter_calls["Podcast.add_item"], len(podcast.items))
+                self.assertEqual(stats.setter_calls["Item.set_guid"], len(podcast.items))
+                self.assertEqual(
+                    stats.setter_calls["Item.set_time_published"], len(podcast.items)
+                )
+                self.assertEqual(
+                    stats.phase_seconds["items"], stats.setter_seconds["Podcast.add_item"]
+                )
+                self.assertIsNone(podcast._stats)
+
+    def test_lazy_items_are_recorded_when_read(self):
+        stats = Stats.ParseStats()
+        podcast = Podcast.Podcast(self.basic_podcast, lazy=True, stats=stats)
+        self.assertEqual(stats.items, 0)
+        list(podcast.items)
+        self.assertEqual(stats.items, len(podcast.items))
+        self.assertEqual(stats.setter_calls["Item.set_guid"], len(podcast.items))
+
+    def test_merge(self):
+        first = Stats.ParseStats()
+        second = Stats.ParseStats()
+        Podcast.Podcast(self.basic_podcast, stats=first)
+        Podcast.Podcast(self.basic_podcast, engine="iterparse", stats=second)
+        Podcast.Podcast(self.basic_podcast, engine="iterparse", stats=second)
+
+        total = sum([first, second], Stats.ParseStats())
+        self.assertEqual(total.feeds, 3)
+        self.assertEqual(total.setter_calls["Podcast.set_title"], 3)
+        self.assertAlmostEqual(
+            total.phase_seconds["tree"],
+            first.phase_seconds["tree"] + second.phase_seconds["tree"],
+        )
+        self.assertEqual(first.feeds, 1)
+
+        self.assertIs(first.merge(second), first)
+        self.assertEqual(first.to_dict()["setters"], total.to_dict()["setters"])
+        self.assertEqual(pickle.loads(pickle.dumps(total)).to_dict(), total.to_dict())
+
+    def test_cache_records_misses(self):
+        stats = Stats.ParseStats()
+        cache = Cache.ParseCache()
+        cache.parse(self.basic_podcast, stats=stats)
+        cache.parse(self.basic_podcast, stats=stats)
+        self.assertEqual(stats.feeds, 1)
+        self.assertEqual(cache.hits, 1)
+
+
+class TestDateDiagnostics(unittest.TestCase):
+    DATES = [
+        ("Fri, 21 Mar 2008 09:51:00 GMT", PubDate.FAST),
+        ("Mon, 19 Jul 2021 16:14:29 +0000 EST", PubDate.TOLERANT),
+        ("Fri, 21 Mar 2008 09:51:00", PubDate.DEFAULT_TIMEZONE),
+        ("Fri, 21 Mar 201208 09:50:00 EDT", PubDate.NOW),
+        ("", PubDate.MISSING),
+    ]
+
+    def setUp(self):
+        items = "".join(
+            f"<item><guid>{i}</guid><pubDate>{date}</pubDate></item>"
+            for i, (date, _) in enumerate(self.DATES)
+        )
+        self.feed = (
+            "<rss><channel><title>Dates</title><link>https://example.com</link>"
+            f"{items}<item><guid>no-date</guid></item></channel></rss>"
+        ).encode("utf-8")
+
+    def test_outcomes(self):
+        for engine in Podcast.Podcast.ENGINES:
+            with self.subTest(engine=engine):
+                podcast = Podcast.Podcast(self.feed, engine=engine)
+                self.assertEqual(
+                    [item.published_date_outcome for item in podcast.items],
+                    [outcome for _, outcome in self.DATES] + [None],
+                )
+                self.assertEqual(
+                    Diagnostics.published_date_outcomes(podcast.items),
+                    {outcome: 1 for _, outcome in self.DATES},
+                )
+
+    def test_one_summary_per_podcast(self):
+        with self.assertLogs("pypodcastparser.dates", "INFO") as logs:
+            Podcast.Podcast(self.feed)
+        (record,) = logs.records
+        self.assertEqual(record.feed, "https://example.com")
+        self.assertEqual(
+            record.published_date_outcomes, {outcome: 1 for _, outcome in self.DATES}
+        )
+
+    def test_samples(self):
+        with self.assertLogs("pypodcastparser.dates", "DEBUG") as logs:
+            Podcast.Podcast(self.feed)
+        sampled = {record.args[0] for record in logs.records[1:]}
+        self.assertEqual(sampled, {date or None for date, _ in self.DATES[1:]})
+
+    def test_disabled(self):
+        logger = logging.getLogger("pypodcastparser.dates")
+        logger.setLevel(logging.WARNING)
+        self.addCleanup(logger.setLevel, logging.NOTSET)
+        with unittest.mock.patch.object(Diagnostics, "published_date_outcomes") as outcomes:
+            Podcast.Podcast(self.feed)
+        outcomes.assert_not_called()
+
+
+class TestNonStrict(unittest.TestCase):
+    def setUp(self):
+        test_dir = os.path.dirname(__file__)
+        test_feeds_dir = os.path.join(test_dir, "test_feeds")
+        with open(os.path.join(test_feeds_dir, "invalid_show_dates.rss"), "rb") as f:
+            self.invalid_show_dates = f.read()
+        with open(os.path.join(test_feeds_dir, "basic_podcast.rss"), "rb") as f:
+            self.basic_podcast = f.read()
+
+    def test_show_level_error(self):
+        with self.assertRaises(Podcast.InvalidPodcastFeed):
+            Podcast.Podcast(self.invalid_show_dates)
+        for engine in Podcast.Podcast.ENGINES:
+            with self.subTest(engine=engine):
+                podcast = Podcast.Podcast(
+                    self.invalid_show_dates, engine=engine, strict=False
+                )
+                (error,) = podcast.errors
+                self.assertIsInstance(error, Error.ParseError)
+                self.assertEqual(error.field, "published_date")
+                self.assertIsNone(error.item_index)
+                self.assertEqual(error.raw_value, '"2022-2022-2202-020202"')
+                self.assertIs(type(error.raw_value), str)
+                self.assertIn("show level pubDate", error.reason)
+                self.assertIsNone(podcast.published_date)
+                self.assertIsNone(podcast.published_date_string)
+                self.assertIsNone(podcast.to_dict()["published_date"])
+                self.assertEqual(len(podcast.items), 2)
+                self.assertIsNotNone(podcast.title)
+
+    def test_item_level_error(self):
+        def fail(value):
+            raise ValueError("bad duration")
+
+        with unittest.mock.patch.object(Item, "parse_duration", fail):
+            with self.assertRaises(ValueError):
+                Podcast.Podcast(self.basic_podcast)
+            podcast = Podcast.Podcast(self.basic_podcast, strict=False)
+            lazy = Podcast.Podcast(self.basic_podcast, strict=False, lazy=True)
+            self.assertEqual(lazy.errors, [])
+            lazy.items[1]
+
+        self.assertEqual(
+            [(e.field, e.item_index, e.reason) for e in podcast.errors],
+            [("itunes_duration", 0, "bad duration"), ("itunes_duration", 1, "bad duration")],
+        )
+        self.assertEqual(podcast.errors[0].raw_value, "1:05")
+        self.assertEqual([e.item_index for e in lazy.errors], [1])
+        self.assertEqual(podcast.items[0].guid, "basic item guid")
+
+    def test_stats_and_errors(self):
+        stats = Stats.ParseStats()
+        podcast = Podcast.Podcast(self.invalid_show_dates, strict=False, stats=stats)
+        self.assertEqual(len(podcast.errors), 1)
+        self.assertEqual(stats.setter_calls["Podcast.set_published_date"], 1)
+        self.assertEqual(stats.items, len(podcast.items))
+
+    def test_date_setter_errors(self):
+        feed = (
+            b'<?xml version="1.0"?><rss><channel><title>t</title>'
+            b"<pubDate>Mon, 01 May 2023 04:05:03 GMT</pubDate>"
+            b"<item><guid>1</guid><pubDate>Mon, 01 May 99999999999 04:05:03 GMT</pubDate></item>"
+            b"<item><guid>2</guid><pubDate>Mon, 01 May 2023 04:05:03 GMT</pubDate></item>"
+            b"</channel></rss>"
+        )
+        podcast = Podcast.Podcast(feed, strict=False)
+        self.assertEqual([item.guid for item in podcast.items], ["1", "2"])
+        (error,) = podcast.errors
+        self.assertEqual((error.field, error.item_index), ("time_published", 0))
+        self.assertEqual(error.raw_value, "Mon, 01 May 99999999999 04:05:03 GMT")
+
+        item_datetime = unittest.mock.Mock(datetime=datetime.datetime)
+        item_datetime.date.fromtimestamp.side_effect = OverflowError("out of range")
+        with unittest.mock.patch.object(Item, "datetime", item_datetime):
+            podcast = Podcast.Podcast(feed, strict=False)
+        self.assertEqual([item.guid for item in podcast.items], ["1", "2"])
+        self.assertEqual(
+            [(e.field, e.item_index, e.raw_value) for e in podcast.errors],
+            [
+                ("time_published", 0, "Mon, 01 May 99999999999 04:05:03 GMT"),
+                ("date_time", 1, "Mon, 01 May 2023 04:05:03 GMT"),
+            ],
+        )
+        self.assertIsNone(podcast.items[1].date_time)
+        self.assertIsNotNone(podcast.items[1].time_published)
+
+    def test_setter_fields_are_slots(self):
+        for cls in (Podcast.Podcast, Item.Item):
+            setters = [method for _, method in cls.tag_methods.handlers.values()]
+            setters += [cls.set_time_published, cls.set_dates_published]
+            for method in setters:
+                for field in Dispatch.handler_fields(method):
+                    with self.subTest(setter=method.__qualname__, field=field):
+                        self.assertIn(field, cls.__slots__)
+
+    def test_strict_has_no_errors(self):
+        podcast = Podcast.Podcast(self.basic_podcast)
+        self.assertTrue(podcast.strict)
+        self.assertEqual(podcast.errors, [])
+
+
+class TestPrologRecovery(unittest.TestCase):
+    def setUp(self):
+        test_dir = os.path.dirname(__file__)
+        test_feeds_dir = os.path.join(test_dir, "test_feeds")
+        basic_podcast_path = os.path.join(test_feeds_dir, "basic_podcast.rss")
+        with open(basic_podcast_path, "rb") as basic_podcast_file:
+            self.basic_podcast = (
+                b'<?xml version="1.0" encoding="UTF-8"?>\n' + basic_podcast_file.read()
+            )
+        Prolog.reset_recovery_counts()
+
+    def test_find_document_start(self):
+        body = b'<?xml version="1.0"?><rss/>'
+        cases = [
+            (body, 0, None),
+            (b"\xef\xbb\xbf" + body, 3, "bom"),
+            (b"\xef\xbb\xbf \r\n" + body, 6, "whitespace"),
+            (b"HTTP/1.1 200 OK\r\nContent-Type: text/xml\r\n\r\n" + body, 43, "junk"),
+            (b"junk<rss/>", 4, "junk"),
+            (b"  <rss/>", 0, None),
+            (b"junk<rss><![CDATA[<?xml]]></rss>", 4, "junk"),
+            (b"junk<!DOCTYPE rss><rss/>", 4, "junk"),
+            (b"<!DOCTYPE rss><rss/>", 0, None),
+            (b"junk<rss><![CDATA[<!DOCTYPE]]></rss>", 4, "junk"),
+        ]
+        for content, offset, reason in cases:
+            with self.subTest(content=content):
+                self.assertEqual(Prolog.find_document_start(content), (offset, reason))
+
+    def test_engines_recover(self):
+        prefixes = [b"\xef\xbb\xbf\n", b"HTTP/1.1 200 OK\r\n\r\n"]
+        for prefix in prefixes:
+            for engine in Podcast.Podcast.ENGINES:
+                with self.subTest(prefix=prefix, engine=engine):
+                    podcast = Podcast.Podcast(prefix + self.basic_podcast, engine=engine)
+                    self.assertEqual(podcast.title, "basic title")
+                    self.assertEqual(len(podcast.items), 2)
+        self.assertEqual(
+            Prolog.recovery_counts(), {"bom": 0, "whitespace": 2, "junk": 2}
+        )
+
+    def test_doctype_entities_are_kept(self):
+        feed = (
+            b'HTTP/1.1 200 OK\r\n\r\n<!DOCTYPE rss [<!ENTITY show "Entity Show">]>'
+            b"<rss><channel><title>&show;</title></channel></rss>"
+        )
+        # BeautifulSoup's lxml-xml builder drops internal DTD subsets even
+        # without junk before them, only iterparse resolves the entities
+        podcast = Podcast.Podcast(feed, engine="iterparse")
+        self.assertEqual(podcast.prolog_recovery, "junk")
+        self.assertEqual(podcast.title, "Entity Show")
+
+    def test_well_formed_prolog_is_not_counted(self):
+        podcast = Podcast.Podcast(self.basic_podcast)
+        self.assertIsNone(podcast.prolog_recovery)
+        self.assertEqual(sum(Prolog.recovery_counts().values()), 0)
+
+    def test_buffer_reader(self):
+        reader = Prolog.BufferReader(b"junk<rss/>", 4)
+        self.assertEqual(reader.read(3), b"<rs")
+        self.assertEqual(reader.read(), b"s/>")
+        self.assertEqual(reader.read(10), b"")
+
+
+class TestFromFile(unittest.TestCase):
+    def setUp(self):
+        test_dir = os.path.dirname(__file__)
+        basic_podcast_path = os.path.join(test_dir, "test_feeds", "basic_podcast.rss")
+        with open(basic_podcast_path, "rb") as basic_podcast_file:
+            self.basic_podcast = basic_podcast_file.read()
+        self.expected = Podcast.Podcast(self.basic_podcast).to_dict()
+
+    def write(self, content):
+        feed_file = tempfile.NamedTemporaryFile(suffix=".rss", delete=False)
+        with feed_file:
+            feed_file.write(content)
+        self.addCleanup(os.unlink, feed_file.name)
+        return feed_file.name
+
+    def test_from_fileobj(self):
+        for engine in Podcast.Podcast.ENGINES:
+            with self.subTest(engine=engine):
+                podcast = Podcast.Podcast.from_fileobj(
+                    io.BytesIO(self.basic_podcast), engine=engine
+                )
+                self.assertEqual(podcast.to_dict(), self.expected)
+
+    def test_from_file(self):
+        path = self.write(self.basic_podcast)
+        for engine in Podcast.Podcast.ENGINES:
+            for memory_map in (False, True):
+                with self.subTest(engine=engine, memory_map=memory_map):
+                    podcast = Podcast.Podcast.from_file(
+                        path, memory_map=memory_map, engine=engine, retain_source=False
+                    )
+                    self.assertEqual(podcast.to_dict(), self.expected)
+
+    def test_gzip(self):
+        content = b"HTTP/1.1 200 OK\r\n\r\n<?xml version='1.0'?>" + self.basic_podcast
+        path = self.write(gzip.compress(content))
+        for engine in Podcast.Podcast.ENGINES:
+            for memory_map in (False, True):
+                with self.subTest(engine=engine, memory_map=memory_map):
+                    podcast = Podcast.Podcast.from_file(
+                        path, memory_map=memory_map, engine=engine
+                    )
+                    self.assertEqual(podcast.to_dict(), self.expected)
+                    self.assertEqual(podcast.prolog_recovery, "junk")
+
+    @unittest.skipIf(Source.zstd is None, "compression.zstd is not available")
+    def test_zstd(self):
+        compressed = Source.zstd.compress(self.basic_podcast)
+        podcast = Podcast.Podcast.from_file(self.write(compressed), engine="iterparse")
+        self.assertEqual(podcast.to_dict(), self.expected)
+
+    @unittest.skipIf(Source.zstandard is None, "zstandard is not installed")
+    def test_zstandard(self):
+        compressed = Source.zstandard.ZstdCompressor().compress(self.basic_podcast)
+        # Decompress with zstandard even where compression.zstd exists
+        with unittest.mock.patch.object(Source, "zstd", None):
+            podcast = Podcast.Podcast.from_file(self.write(compressed), engine="iterparse")
+        self.assertEqual(podcast.to_dict(), self.expected)
+
+    def test_zstd_unavailable(self):
+        compressed = b"\x28\xb5\x2f\xfd" + bytes(16)
+        with unittest.mock.patch.object(Source, "zstd", None):
+            with unittest.mock.patch.object(Source, "zstandard", None):
+                with self.assertRaises(ValueError):
+                    Source.decompressed(io.BytesIO(compressed))
+
+    def test_empty_file(self):
+        with self.assertRaises(Podcast.InvalidPodcastFeed):
+            Podcast.Podcast.from_file(self.write(b""), memory_map=True, engine="iterparse")
+
+    def test_streamed_source_can_not_be_retained(self):
+        with self.assertRaises(ValueError):
+            Podcast.Podcast(
+                io.BytesIO(self.basic_podcast), engine="iterparse", retain_source=True
+            )
+
+
 if __name__ == "__main__":
     unittest.main()